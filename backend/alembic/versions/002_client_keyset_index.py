@@ -0,0 +1,23 @@
+"""Add composite index for client keyset pagination
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-04-20 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serve ORDER BY name, id and (name, id) > (:name, :id) from one index scan
+    op.create_index('ix_clients_name_id', 'clients', ['name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_clients_name_id', table_name='clients')
@@ -0,0 +1,49 @@
+"""Add trigram indexes for fuzzy name search
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-04-22 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Index name, table and column of each trigram index
+TRIGRAM_INDEXES = [
+    ('ix_clients_name_trgm', 'clients', 'name'),
+    ('ix_sites_name_trgm', 'sites', 'name'),
+    ('ix_assets_name_trgm', 'assets', 'name'),
+    ('ix_assets_hostname_trgm', 'assets', 'hostname'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # GIN trigram indexes serve ILIKE '%term%' and similarity operators
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column_name: 'gin_trgm_ops'}
+        )
+
+    # Contacts are searched by full name (app.models.contact.full_name_expression)
+    op.execute(
+        "CREATE INDEX ix_contacts_full_name_trgm ON contacts "
+        "USING gin ((first_name || ' ' || last_name) gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    op.execute('DROP INDEX IF EXISTS ix_contacts_full_name_trgm')
+    for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,29 @@
+"""Add content hash columns for bulk upserts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-04-25 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# Tables upserted by external ID
+TABLES = ['clients', 'sites', 'contacts', 'assets']
+
+
+def upgrade():
+    # Hash of the last upserted content, used to skip unchanged rows
+    for table_name in TABLES:
+        op.add_column(table_name, sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    for table_name in reversed(TABLES):
+        op.drop_column(table_name, 'content_hash')
@@ -0,0 +1,36 @@
+"""Add asset lookup indexes on hostname, MAC and IP address
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-04-28 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Index name and indexed expression of each lookup index
+EXPRESSION_INDEXES = [
+    ('ix_assets_hostname_short', "split_part(lower(hostname), '.', 1)"),
+    ('ix_assets_mac_address_lower', 'lower(mac_address)'),
+]
+
+
+def upgrade():
+    # Hostnames are matched on their lowercased short name and MAC
+    # addresses case-insensitively
+    for index_name, expression in EXPRESSION_INDEXES:
+        op.create_index(index_name, 'assets', [sa.text(expression)], unique=False)
+
+    op.create_index('ix_assets_ip_address', 'assets', ['ip_address'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_assets_ip_address', table_name='assets')
+    for index_name, _ in reversed(EXPRESSION_INDEXES):
+        op.drop_index(index_name, table_name='assets')
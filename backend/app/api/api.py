@@ -7,7 +7,7 @@ This module imports and includes all API route modules.
 from fastapi import APIRouter
 
 # Import endpoint modules
-from .endpoints import auth, clients
+from .endpoints import auth, bulk, clients, contacts
 
 # Create main API router
 api_router = APIRouter(prefix="/api/v1")
@@ -17,3 +17,7 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 
 # Include MSP-specific routers
 api_router.include_router(clients.router, prefix="/clients", tags=["Clients"])
+api_router.include_router(contacts.router, prefix="/contacts", tags=["Contacts"])
+
+# Include bulk upsert router for syncs from external systems
+api_router.include_router(bulk.router, prefix="/bulk", tags=["Bulk"])
@@ -0,0 +1,125 @@
+"""
+Bulk upsert API endpoints.
+"""
+
+import logging
+from dataclasses import asdict
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.auth import User, has_role
+from app.schemas.bulk import AssetUpsert, BulkUpsertResponse, ClientUpsert, ContactUpsert, SiteUpsert
+from app.services.bulk_upsert import bulk_upsert_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Maximum number of rows per request
+MAX_BULK_ROWS = 10000
+
+def _rows(items: List) -> List[dict]:
+    """
+    Convert request items to upsert rows.
+    
+    Args:
+        items: Validated items
+        
+    Returns:
+        Column values of each item
+        
+    Raises:
+        HTTPException: If the request has too many rows
+    """
+    if len(items) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per request")
+    return [item.dict() for item in items]
+
+async def _upsert(upsert, items: List) -> BulkUpsertResponse:
+    """
+    Upsert request items with a bulk upsert service method.
+    
+    Args:
+        upsert: Bulk upsert service method
+        items: Validated items
+        
+    Returns:
+        Created, updated, unchanged and skipped counts
+        
+    Raises:
+        HTTPException: If the request has too many rows or rows the table cannot hold
+    """
+    try:
+        result = await upsert(_rows(items))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return BulkUpsertResponse(**asdict(result))
+
+@router.post("/clients", response_model=BulkUpsertResponse)
+async def bulk_upsert_clients(
+    clients: List[ClientUpsert],
+    current_user: User = Depends(has_role(["admin"]))
+) -> BulkUpsertResponse:
+    """
+    Create or update clients by external ID.
+    
+    Args:
+        clients: Clients to upsert
+        current_user: Current user with admin role
+        
+    Returns:
+        Created, updated, unchanged and skipped counts
+    """
+    return await _upsert(bulk_upsert_service.upsert_clients, clients)
+
+@router.post("/sites", response_model=BulkUpsertResponse)
+async def bulk_upsert_sites(
+    sites: List[SiteUpsert],
+    current_user: User = Depends(has_role(["admin"]))
+) -> BulkUpsertResponse:
+    """
+    Create or update sites by external ID.
+    
+    Args:
+        sites: Sites to upsert, referencing clients by external ID
+        current_user: Current user with admin role
+        
+    Returns:
+        Created, updated, unchanged and skipped counts
+    """
+    return await _upsert(bulk_upsert_service.upsert_sites, sites)
+
+@router.post("/contacts", response_model=BulkUpsertResponse)
+async def bulk_upsert_contacts(
+    contacts: List[ContactUpsert],
+    current_user: User = Depends(has_role(["admin"]))
+) -> BulkUpsertResponse:
+    """
+    Create or update contacts by external ID.
+    
+    Args:
+        contacts: Contacts to upsert, referencing clients by external ID
+        current_user: Current user with admin role
+        
+    Returns:
+        Created, updated, unchanged and skipped counts
+    """
+    return await _upsert(bulk_upsert_service.upsert_contacts, contacts)
+
+@router.post("/assets", response_model=BulkUpsertResponse)
+async def bulk_upsert_assets(
+    assets: List[AssetUpsert],
+    current_user: User = Depends(has_role(["admin"]))
+) -> BulkUpsertResponse:
+    """
+    Create or update assets by external ID.
+    
+    Args:
+        assets: Assets to upsert, referencing sites by external ID
+        current_user: Current user with admin role
+        
+    Returns:
+        Created, updated, unchanged and skipped counts
+    """
+    return await _upsert(bulk_upsert_service.upsert_assets, assets)
@@ -2,61 +2,179 @@
 Client API endpoints.
 """
 
+import base64
+import json
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.db.base_class import get_db
 from app.models.client import Client
-from app.schemas.client import ClientCreate, ClientResponse, ClientUpdate
+from app.schemas.client import ClientCreate, ClientPage, ClientResponse, ClientSearchResult, ClientUpdate
 from app.core.auth import User, get_current_active_user, has_role
+from app.services.client_mapping import client_mapping_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ClientResponse])
+# Minimum word similarity for a search match; lower than the pg_trgm
+# default so partially typed and misspelled names still match
+SEARCH_SIMILARITY_THRESHOLD = 0.3
+
+def encode_cursor(name: str, client_id: int) -> str:
+    """
+    Encode the position after a client as an opaque cursor.
+    
+    Args:
+        name: Client name
+        client_id: Client ID
+        
+    Returns:
+        URL-safe cursor
+    """
+    payload = json.dumps([name, client_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor returned by encode_cursor.
+    
+    Args:
+        cursor: Cursor
+        
+    Returns:
+        Tuple of (name, client ID)
+        
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    try:
+        name, client_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(name), int(client_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def estimate_row_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """
+    Estimate the number of rows in a table from planner statistics.
+    
+    Args:
+        db: Database session
+        table_name: Table name
+        
+    Returns:
+        Estimated row count, or None if the table has not been analyzed
+    """
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
+
+@router.get("/", response_model=ClientPage)
 async def get_clients(
     db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     name: Optional[str] = None,
     is_active: Optional[bool] = None,
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user)
-) -> List[ClientResponse]:
+) -> ClientPage:
     """
-    Get all clients.
+    Get a page of clients ordered by name.
     
     Args:
         db: Database session
-        skip: Number of records to skip
+        cursor: Cursor from the previous page's next_cursor
         limit: Maximum number of records to return
         name: Filter by name
         is_active: Filter by active status
+        include_total: Include an estimated total of unfiltered clients
         current_user: Current user
         
     Returns:
-        List of clients
+        Page of clients
     """
     query = select(Client)
     
-    # Apply filters
+    # Apply filters (the name match is served by the trigram index)
     if name:
         query = query.filter(Client.name.ilike(f"%{name}%"))
     if is_active is not None:
         query = query.filter(Client.is_active == is_active)
     
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    # Continue after the last client of the previous page
+    if cursor:
+        last_name, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Client.name, Client.id) > tuple_(last_name, last_id))
+    
+    # Fetch one extra row to know whether there is a next page
+    query = query.order_by(Client.name, Client.id).limit(limit + 1)
     
     # Execute query
     result = await db.execute(query)
     clients = result.scalars().all()
     
-    return clients
+    next_cursor = None
+    if len(clients) > limit:
+        clients = clients[:limit]
+        next_cursor = encode_cursor(clients[-1].name, clients[-1].id)
+    
+    # Planner statistics avoid a COUNT(*) over the whole table
+    estimated_total = None
+    if include_total and not name and is_active is None:
+        estimated_total = await estimate_row_count(db, Client.__tablename__)
+    
+    return ClientPage(items=clients, next_cursor=next_cursor, estimated_total=estimated_total)
+
+@router.get("/search", response_model=List[ClientSearchResult])
+async def search_clients(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[ClientSearchResult]:
+    """
+    Search clients by name, tolerating typos and partial input.
+    
+    Matches are found through the trigram index on client names and ranked
+    by how closely the search term matches a word sequence in the name.
+    
+    Args:
+        q: Search term
+        limit: Maximum number of matches to return
+        is_active: Filter by active status
+        db: Database session
+        current_user: Current user
+        
+    Returns:
+        Matching clients, best match first
+    """
+    term = q.strip()
+    score = func.word_similarity(term, Client.name).label("score")
+    
+    # The %> operator uses the trigram index and this threshold
+    await db.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {SEARCH_SIMILARITY_THRESHOLD}"))
+    
+    query = (
+        select(Client.id, Client.name, Client.external_id, Client.is_active, score)
+        .filter(Client.name.op("%>")(term))
+        .order_by(score.desc(), Client.name, Client.id)
+        .limit(limit)
+    )
+    if is_active is not None:
+        query = query.filter(Client.is_active == is_active)
+    
+    result = await db.execute(query)
+    return [ClientSearchResult(**row._mapping) for row in result]
 
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
@@ -145,6 +263,9 @@ async def update_client(
     await db.commit()
     await db.refresh(db_client)
     
+    # Make providers pick up the new mappings
+    client_mapping_service.invalidate(client_id)
+    
     return db_client
 
 @router.delete("/{client_id}", response_model=ClientResponse)
@@ -175,4 +296,6 @@ async def delete_client(
     await db.delete(db_client)
     await db.commit()
     
+    client_mapping_service.invalidate(client_id)
+    
     return db_client
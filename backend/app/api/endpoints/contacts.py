@@ -0,0 +1,73 @@
+"""
+Contact API endpoints.
+"""
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.base_class import get_db
+from app.models.contact import Contact, full_name_expression
+from app.schemas.contact import ContactSearchResult
+from app.core.auth import User, get_current_active_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Minimum word similarity for a search match, as for client search
+SEARCH_SIMILARITY_THRESHOLD = 0.3
+
+@router.get("/search", response_model=List[ContactSearchResult])
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    client_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> List[ContactSearchResult]:
+    """
+    Search contacts by full name, tolerating typos and partial input.
+
+    Matches are found through the trigram index on contact full names and
+    ranked by how closely the search term matches a word sequence in the name.
+
+    Args:
+        q: Search term
+        limit: Maximum number of matches to return
+        client_id: Filter by client
+        is_active: Filter by active status
+        db: Database session
+        current_user: Current user
+
+    Returns:
+        Matching contacts, best match first
+    """
+    term = q.strip()
+    full_name = full_name_expression()
+    score = func.word_similarity(term, full_name).label("score")
+
+    # The %> operator uses the trigram index and this threshold
+    await db.execute(text(f"SET LOCAL pg_trgm.word_similarity_threshold = {SEARCH_SIMILARITY_THRESHOLD}"))
+
+    query = (
+        select(
+            Contact.id, Contact.client_id, Contact.first_name, Contact.last_name,
+            Contact.title, Contact.email, Contact.is_active, score
+        )
+        .filter(full_name.op("%>")(term))
+        .order_by(score.desc(), Contact.last_name, Contact.first_name, Contact.id)
+        .limit(limit)
+    )
+    if client_id is not None:
+        query = query.filter(Contact.client_id == client_id)
+    if is_active is not None:
+        query = query.filter(Contact.is_active == is_active)
+
+    result = await db.execute(query)
+    return [ContactSearchResult(**row._mapping) for row in result]
@@ -34,6 +34,12 @@ class Settings(BaseSettings):
     # Redis configuration
     REDIS_URL: str = os.environ.get("REDIS_URL", "redis://redis:6379/0")
     
+    # Alert ingestion configuration ("redis" for Redis Streams, "memory" for local development)
+    INGESTION_BACKEND: str = os.environ.get("INGESTION_BACKEND", "redis")
+    INGESTION_CONSUMER_NAME: str = os.environ.get("INGESTION_CONSUMER_NAME", os.environ.get("HOSTNAME", ""))
+    # Seconds an unchanged alert is suppressed after it was last seen
+    ALERT_DEDUP_TTL_SECONDS: int = int(os.environ.get("ALERT_DEDUP_TTL_SECONDS", "3600"))
+    
     # JWT configuration
     JWT_SECRET_KEY: str = os.environ.get(
         "JWT_SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"
@@ -50,6 +56,44 @@ class Settings(BaseSettings):
     # Alert Engine configuration
     ALERT_ENGINE_URL: str = os.environ.get("ALERT_ENGINE_URL", "http://alert-engine:8080")
     
+    # Webhook configuration (shared secrets used to verify signatures)
+    CONNECTWISE_WEBHOOK_SECRET: str = os.environ.get("CONNECTWISE_WEBHOOK_SECRET", "")
+    SENTINELONE_WEBHOOK_SECRET: str = os.environ.get("SENTINELONE_WEBHOOK_SECRET", "")
+    VEEAM_WEBHOOK_SECRET: str = os.environ.get("VEEAM_WEBHOOK_SECRET", "")
+    
+    # ConnectWise Manage sync configuration
+    CONNECTWISE_SYNC_ENABLED: bool = os.environ.get("CONNECTWISE_SYNC_ENABLED", "false").lower() == "true"
+    CONNECTWISE_SYNC_INTERVAL_SECONDS: int = int(os.environ.get("CONNECTWISE_SYNC_INTERVAL_SECONDS", "900"))
+    CONNECTWISE_COMPANY_ID: str = os.environ.get("CONNECTWISE_COMPANY_ID", "")
+    CONNECTWISE_PUBLIC_KEY: str = os.environ.get("CONNECTWISE_PUBLIC_KEY", "")
+    CONNECTWISE_PRIVATE_KEY: str = os.environ.get("CONNECTWISE_PRIVATE_KEY", "")
+    CONNECTWISE_CLIENT_ID: str = os.environ.get("CONNECTWISE_CLIENT_ID", "")
+    CONNECTWISE_BASE_URL: str = os.environ.get("CONNECTWISE_BASE_URL", "")
+    
+    # SentinelOne asset sync configuration
+    SENTINELONE_SYNC_ENABLED: bool = os.environ.get("SENTINELONE_SYNC_ENABLED", "false").lower() == "true"
+    SENTINELONE_SYNC_INTERVAL_SECONDS: int = int(os.environ.get("SENTINELONE_SYNC_INTERVAL_SECONDS", "900"))
+    SENTINELONE_API_TOKEN: str = os.environ.get("SENTINELONE_API_TOKEN", "")
+    SENTINELONE_ACCOUNT_ID: str = os.environ.get("SENTINELONE_ACCOUNT_ID", "")
+    SENTINELONE_BASE_URL: str = os.environ.get("SENTINELONE_BASE_URL", "")
+    
+    # Veeam credentials used for alert polling and workflow steps
+    VEEAM_USERNAME: str = os.environ.get("VEEAM_USERNAME", "")
+    VEEAM_PASSWORD: str = os.environ.get("VEEAM_PASSWORD", "")
+    VEEAM_BASE_URL: str = os.environ.get("VEEAM_BASE_URL", "")
+    
+    # Alert polling configuration (a fallback for alerts not delivered by webhook)
+    ALERT_POLL_ENABLED: bool = os.environ.get("ALERT_POLL_ENABLED", "false").lower() == "true"
+    ALERT_POLL_INTERVAL_SECONDS: int = int(os.environ.get("ALERT_POLL_INTERVAL_SECONDS", "60"))
+    
+    # Workflow execution configuration (concurrent workflow runs per alert batch)
+    WORKFLOW_RUN_CONCURRENCY: int = int(os.environ.get("WORKFLOW_RUN_CONCURRENCY", "10"))
+    
+    # Workflow configuration (directory of YAML workflows, reloaded on change)
+    WORKFLOWS_DIR: str = os.environ.get(
+        "WORKFLOWS_DIR", os.path.join(os.path.dirname(__file__), "..", "..", "..", "workflows")
+    )
+    
     # Vault configuration
     VAULT_ADDR: str = os.environ.get("VAULT_ADDR", "http://vault:8200")
     VAULT_TOKEN: str = os.environ.get("VAULT_TOKEN", "mspalwayson-dev-token")
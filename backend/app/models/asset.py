@@ -2,7 +2,7 @@
 Asset model for MSPAlwaysOn.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -26,6 +26,13 @@ class Asset(Base):
     """
     
     __tablename__ = "assets"
+    __table_args__ = (
+        # Fuzzy name and hostname search
+        Index("ix_assets_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_assets_hostname_trgm", "hostname", postgresql_using="gin", postgresql_ops={"hostname": "gin_trgm_ops"}),
+        # Alert-to-asset lookups by IP address
+        Index("ix_assets_ip_address", "ip_address"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -54,6 +61,7 @@ class Asset(Base):
     
     # Metadata
     metadata = Column(JSON, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # Hash of the last upserted content
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -65,3 +73,7 @@ class Asset(Base):
     
     def __repr__(self):
         return f"<Asset {self.name} (Site: {self.site_id})>"
+
+# Alert-to-asset lookups by lowercased short hostname and case-insensitive MAC address
+Index("ix_assets_hostname_short", func.split_part(func.lower(Asset.hostname), ".", 1))
+Index("ix_assets_mac_address_lower", func.lower(Asset.mac_address))
@@ -2,7 +2,7 @@
 Client/Company model for MSPAlwaysOn.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Table
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,6 +17,12 @@ class Client(Base):
     """
     
     __tablename__ = "clients"
+    __table_args__ = (
+        # Keyset pagination on (name, id)
+        Index("ix_clients_name_id", "name", "id"),
+        # Fuzzy name search
+        Index("ix_clients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -37,6 +43,7 @@ class Client(Base):
     
     # Metadata
     metadata = Column(JSON, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # Hash of the last upserted content
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -2,7 +2,7 @@
 Contact model for MSPAlwaysOn.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -35,6 +35,7 @@ class Contact(Base):
     
     # Metadata
     metadata = Column(JSON, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # Hash of the last upserted content
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -50,3 +51,23 @@ class Contact(Base):
     
     def __repr__(self):
         return f"<Contact {self.full_name} (Client: {self.client_id})>"
+
+def full_name_expression():
+    """
+    Get the SQL expression of a contact's full name.
+
+    The separator is inlined rather than bound, so queries match the
+    expression of the full name trigram index.
+
+    Returns:
+        first_name || ' ' || last_name
+    """
+    return Contact.first_name + literal_column("' '") + Contact.last_name
+
+# Fuzzy full name search
+Index(
+    "ix_contacts_full_name_trgm",
+    full_name_expression().label("full_name"),
+    postgresql_using="gin",
+    postgresql_ops={"full_name": "gin_trgm_ops"}
+)
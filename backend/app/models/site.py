@@ -2,7 +2,7 @@
 Site model for MSPAlwaysOn.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -16,6 +16,10 @@ class Site(Base):
     """
     
     __tablename__ = "sites"
+    __table_args__ = (
+        # Fuzzy name search
+        Index("ix_sites_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -36,6 +40,7 @@ class Site(Base):
     
     # Metadata
     metadata = Column(JSON, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # Hash of the last upserted content
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,69 @@
+"""
+Bulk upsert schemas.
+"""
+
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+
+from app.models.asset import AssetType
+from app.schemas.client import ClientBase
+
+class ClientUpsert(ClientBase):
+    """Client upsert schema."""
+    external_id: str
+
+class SiteUpsert(BaseModel):
+    """Site upsert schema."""
+    external_id: str
+    client_external_id: str
+    name: str
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    postal_code: Optional[str] = None
+    country: Optional[str] = None
+    phone: Optional[str] = None
+    is_active: bool = True
+    is_primary: bool = False
+    metadata: Optional[Dict[str, Any]] = None
+
+class ContactUpsert(BaseModel):
+    """Contact upsert schema."""
+    external_id: str
+    client_external_id: str
+    first_name: str
+    last_name: str
+    title: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    mobile: Optional[str] = None
+    is_active: bool = True
+    is_primary: bool = False
+    metadata: Optional[Dict[str, Any]] = None
+
+class AssetUpsert(BaseModel):
+    """Asset upsert schema."""
+    external_id: str
+    site_external_id: str
+    name: str
+    external_system: Optional[str] = None
+    asset_type: AssetType = AssetType.OTHER
+    manufacturer: Optional[str] = None
+    model: Optional[str] = None
+    serial_number: Optional[str] = None
+    hostname: Optional[str] = None
+    ip_address: Optional[str] = None
+    mac_address: Optional[str] = None
+    os_type: Optional[str] = None
+    os_version: Optional[str] = None
+    is_active: bool = True
+    is_monitored: bool = True
+    metadata: Optional[Dict[str, Any]] = None
+
+class BulkUpsertResponse(BaseModel):
+    """Bulk upsert result schema."""
+    created: int
+    updated: int
+    unchanged: int
+    skipped: int
+    errors: List[str] = []
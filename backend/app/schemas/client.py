@@ -2,7 +2,7 @@
 Client schemas.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -49,3 +49,17 @@ class ClientResponse(ClientBase):
     class Config:
         """Pydantic config."""
         orm_mode = True
+
+class ClientPage(BaseModel):
+    """Page of clients with a cursor for the next page."""
+    items: List[ClientResponse]
+    next_cursor: Optional[str] = None
+    estimated_total: Optional[int] = None
+
+class ClientSearchResult(BaseModel):
+    """Client search match ranked by similarity."""
+    id: int
+    name: str
+    external_id: Optional[str] = None
+    is_active: bool = True
+    score: float
@@ -0,0 +1,17 @@
+"""
+Contact schemas.
+"""
+
+from typing import Optional
+from pydantic import BaseModel
+
+class ContactSearchResult(BaseModel):
+    """Contact search match ranked by similarity."""
+    id: int
+    client_id: int
+    first_name: str
+    last_name: str
+    title: Optional[str] = None
+    email: Optional[str] = None
+    is_active: bool = True
+    score: float
@@ -0,0 +1,295 @@
+"""
+Bulk upsert service for MSPAlwaysOn.
+
+This module writes clients, sites, contacts and assets from external
+systems in chunked ``INSERT ... ON CONFLICT (external_id) DO UPDATE``
+statements. Each row carries a hash of its content, and conflicting rows
+are only updated when the hash differs, so re-syncing unchanged data
+writes nothing. Metadata is merged into the existing metadata rather than
+replacing it.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import JSON, cast, literal_column, text
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.db.base_class import async_session
+from app.models.asset import Asset
+from app.models.client import Client
+from app.models.contact import Contact
+from app.models.site import Site
+from app.services.client_mapping import client_mapping_service
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMETERS = 32767
+
+# Columns never written from upsert rows
+PROTECTED_COLUMNS = {"id", "external_id", "content_hash", "created_at", "updated_at"}
+
+@dataclass
+class BulkUpsertResult:
+    """Counts of an upsert."""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def merge(self, other: "BulkUpsertResult"):
+        """Add the counts of another result."""
+        self.created += other.created
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.skipped += other.skipped
+        self.errors.extend(other.errors)
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """
+    Hash the content of a row.
+
+    Args:
+        row: Column values
+
+    Returns:
+        SHA-256 hex digest of the values
+    """
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+
+class BulkUpsertService:
+    """
+    Service upserting rows keyed by external ID.
+
+    Rows in a chunk are written in one statement per distinct set of
+    columns, and each chunk is committed on its own so a large sync makes
+    progress even if a later chunk fails.
+    """
+
+    def __init__(self, session_factory=async_session, chunk_size: int = 1000):
+        """
+        Initialize the bulk upsert service.
+
+        Args:
+            session_factory: Factory for database sessions
+            chunk_size: Maximum number of rows per statement
+        """
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+
+    async def upsert(self, model, rows: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert rows of a model by external ID.
+
+        Args:
+            model: Model class with a unique external_id column
+            rows: Column values; each row needs an external_id
+
+        Returns:
+            Counts of created, updated, unchanged and skipped rows
+
+        Raises:
+            ValueError: If a row has a column the model does not have
+        """
+        columns = set(model.__table__.c.keys())
+        result = BulkUpsertResult()
+
+        # A statement cannot update the same row twice; the last row wins
+        unique_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            unknown = set(row) - columns
+            if unknown:
+                raise ValueError(f"Unknown {model.__tablename__} columns: {', '.join(sorted(unknown))}")
+            if not row.get("external_id"):
+                result.skipped += 1
+                result.errors.append(f"{model.__tablename__} row without external_id")
+                continue
+            unique_rows[str(row["external_id"])] = {
+                **{key: value for key, value in row.items() if key not in PROTECTED_COLUMNS},
+                "external_id": str(row["external_id"]),
+            }
+
+        # Rows with the same columns share a statement
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in unique_rows.values():
+            row["content_hash"] = content_hash(row)
+            groups.setdefault(frozenset(row), []).append(row)
+
+        for row_columns, group in groups.items():
+            chunk_size = max(1, min(self.chunk_size, MAX_BIND_PARAMETERS // len(row_columns)))
+            for start in range(0, len(group), chunk_size):
+                result.merge(await self._upsert_chunk(model, row_columns, group[start:start + chunk_size]))
+
+        return result
+
+    async def _upsert_chunk(self, model, row_columns: Iterable[str], chunk: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert one chunk of rows with the same columns.
+
+        Args:
+            model: Model class
+            row_columns: Columns present in every row
+            chunk: Rows to write
+
+        Returns:
+            Counts of the chunk
+        """
+        table = model.__table__
+        statement = insert(table).values(chunk)
+        updates = {column: statement.excluded[column] for column in row_columns if column != "external_id"}
+        updates["updated_at"] = func.now()
+
+        # Merge metadata so keys written by other services (e.g. IT Glue mappings) survive
+        if "metadata" in updates:
+            updates["metadata"] = cast(
+                func.coalesce(cast(table.c.metadata, JSONB), text("'{}'::jsonb"))
+                .op("||")(func.coalesce(cast(statement.excluded.metadata, JSONB), text("'{}'::jsonb"))),
+                JSON
+            )
+
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.external_id],
+            set_=updates,
+            where=table.c.content_hash.is_distinct_from(statement.excluded.content_hash)
+        ).returning(
+            table.c.id,
+            # xmax is 0 for rows inserted by this statement
+            literal_column("(xmax = 0)").label("inserted")
+        )
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(statement)).all()
+            await session.commit()
+
+        created = sum(1 for row in rows if row.inserted)
+        if model is Client:
+            for row in rows:
+                client_mapping_service.invalidate(row.id)
+
+        # Conflicting rows with an unchanged hash are not returned
+        return BulkUpsertResult(created=created, updated=len(rows) - created, unchanged=len(chunk) - len(rows))
+
+    async def resolve_external_ids(self, model, external_ids: Set[str]) -> Dict[str, int]:
+        """
+        Map external IDs of a model to local IDs.
+
+        Args:
+            model: Model class with an external_id column
+            external_ids: External IDs to resolve
+
+        Returns:
+            Local ID by external ID, for the IDs that exist
+        """
+        if not external_ids:
+            return {}
+
+        table = model.__table__
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(table.c.external_id, table.c.id).where(table.c.external_id.in_(list(external_ids)))
+            )
+            return {external_id: local_id for external_id, local_id in result}
+
+    async def _upsert_with_parent(
+        self,
+        model,
+        rows: List[Dict[str, Any]],
+        parent_model,
+        parent_key: str,
+        parent_column: str
+    ) -> BulkUpsertResult:
+        """
+        Upsert rows whose parent is referenced by external ID.
+
+        Args:
+            model: Model class to upsert
+            rows: Rows holding the parent's external ID under parent_key
+            parent_model: Parent model class
+            parent_key: Row key of the parent's external ID
+            parent_column: Foreign key column of the parent's local ID
+
+        Returns:
+            Counts; rows whose parent does not exist are skipped
+        """
+        parent_ids = await self.resolve_external_ids(
+            parent_model, {str(row[parent_key]) for row in rows if row.get(parent_key)}
+        )
+
+        resolved = []
+        skipped = BulkUpsertResult()
+        for row in rows:
+            row = dict(row)
+            parent_external_id = row.pop(parent_key, None)
+            if parent_external_id is not None:
+                parent_id = parent_ids.get(str(parent_external_id))
+                if parent_id is None:
+                    skipped.skipped += 1
+                    skipped.errors.append(
+                        f"{model.__tablename__} {row.get('external_id')}: unknown {parent_model.__tablename__} {parent_external_id}"
+                    )
+                    continue
+                row[parent_column] = parent_id
+            resolved.append(row)
+
+        result = await self.upsert(model, resolved)
+        result.merge(skipped)
+        return result
+
+    async def upsert_clients(self, rows: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert clients by external ID.
+
+        Args:
+            rows: Client column values
+
+        Returns:
+            Upsert counts
+        """
+        return await self.upsert(Client, rows)
+
+    async def upsert_sites(self, rows: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert sites by external ID.
+
+        Args:
+            rows: Site column values, with client_external_id instead of client_id
+
+        Returns:
+            Upsert counts
+        """
+        return await self._upsert_with_parent(Site, rows, Client, "client_external_id", "client_id")
+
+    async def upsert_contacts(self, rows: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert contacts by external ID.
+
+        Args:
+            rows: Contact column values, with client_external_id instead of client_id
+
+        Returns:
+            Upsert counts
+        """
+        return await self._upsert_with_parent(Contact, rows, Client, "client_external_id", "client_id")
+
+    async def upsert_assets(self, rows: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert assets by external ID.
+
+        Args:
+            rows: Asset column values, with site_external_id instead of site_id
+
+        Returns:
+            Upsert counts
+        """
+        return await self._upsert_with_parent(Asset, rows, Site, "site_external_id", "site_id")
+
+# Singleton instance
+bulk_upsert_service = BulkUpsertService()
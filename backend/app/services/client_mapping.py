@@ -0,0 +1,259 @@
+"""
+Client mapping service for MSPAlwaysOn.
+
+This module keeps an in-memory snapshot of clients and their external
+system mappings, so providers can resolve client IDs without opening a
+database session per lookup.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import JSON, cast, func, literal, or_, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.future import select
+
+from app.db.base_class import async_session
+from app.models.client import Client
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ClientMapping:
+    """Snapshot of a client and its external system mappings."""
+
+    id: int
+    name: str
+    external_id: Optional[str] = None
+    external_system: Optional[str] = None
+    is_active: bool = True
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    updated_at: Optional[datetime] = None
+
+class ClientMappingService:
+    """
+    In-memory client mapping service.
+
+    All clients are loaded in one batched query on first use. Afterwards the
+    snapshot is refreshed incrementally, loading only clients changed since
+    the newest change already seen, with a periodic full reload to drop
+    deleted clients. Each load uses its own short-lived session.
+    """
+
+    def __init__(
+        self,
+        session_factory=async_session,
+        refresh_interval: float = 60,
+        full_reload_interval: float = 3600,
+        miss_refresh_interval: float = 5
+    ):
+        """
+        Initialize the client mapping service.
+
+        Args:
+            session_factory: Factory for database sessions
+            refresh_interval: Seconds between incremental refreshes
+            full_reload_interval: Seconds between full reloads
+            miss_refresh_interval: Minimum seconds between refreshes triggered by lookup misses
+        """
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.miss_refresh_interval = miss_refresh_interval
+
+        self._clients: Dict[int, ClientMapping] = {}
+        self._by_external_id: Dict[Tuple[str, str], ClientMapping] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[float] = None
+        self._reloaded_at: Optional[float] = None
+        self._stale_ids: Set[int] = set()
+        self._lock = asyncio.Lock()
+
+    async def get_client(self, client_id: Any) -> Optional[ClientMapping]:
+        """
+        Get a client by ID.
+
+        Args:
+            client_id: MSPAlwaysOn client ID
+
+        Returns:
+            Client mapping, or None if the client does not exist
+        """
+        await self._ensure_fresh()
+
+        try:
+            client_id = int(client_id)
+        except (TypeError, ValueError):
+            return None
+
+        client = self._clients.get(client_id)
+        if client is None and self._can_refresh_on_miss():
+            # The client may have been created since the last refresh
+            await self.refresh()
+            client = self._clients.get(client_id)
+
+        return client
+
+    async def get_by_external_id(self, external_system: str, external_id: Any) -> Optional[ClientMapping]:
+        """
+        Get a client by its ID in an external system.
+
+        Args:
+            external_system: Name of the external system (e.g. "connectwise")
+            external_id: ID of the client in the external system
+
+        Returns:
+            Client mapping, or None if no client is mapped to the external ID
+        """
+        await self._ensure_fresh()
+
+        key = (external_system, str(external_id))
+        client = self._by_external_id.get(key)
+        if client is None and self._can_refresh_on_miss():
+            await self.refresh()
+            client = self._by_external_id.get(key)
+
+        return client
+
+    async def refresh(self, full: bool = False):
+        """
+        Refresh the snapshot from the database.
+
+        Args:
+            full: Reload all clients instead of only the changed ones
+        """
+        requested_at = time.monotonic()
+
+        async with self._lock:
+            # Another caller refreshed while we were waiting for the lock
+            if self._refreshed_at is not None and self._refreshed_at >= requested_at:
+                if not full or (self._reloaded_at is not None and self._reloaded_at >= requested_at):
+                    return
+
+            full = full or self._reloaded_at is None
+            changed_at = func.coalesce(Client.updated_at, Client.created_at)
+
+            query = select(Client)
+            if not full and self._watermark is not None:
+                query = query.where(or_(changed_at > self._watermark, Client.id.in_(self._stale_ids)))
+            stale_ids, self._stale_ids = self._stale_ids, set()
+
+            async with self.session_factory() as session:
+                result = await session.execute(query)
+                clients = result.scalars().all()
+
+            snapshot = {} if full else dict(self._clients)
+            for client_id in stale_ids:
+                # Invalidated clients that no longer exist are dropped
+                snapshot.pop(client_id, None)
+            watermark = None if full else self._watermark
+
+            for client in clients:
+                mapping = self._to_mapping(client)
+                snapshot[mapping.id] = mapping
+
+                client_changed_at = client.updated_at or client.created_at
+                if client_changed_at and (watermark is None or client_changed_at > watermark):
+                    watermark = client_changed_at
+
+            self._clients = snapshot
+            self._by_external_id = {
+                (client.external_system, client.external_id): client
+                for client in snapshot.values()
+                if client.external_system and client.external_id
+            }
+            self._watermark = watermark
+            self._refreshed_at = time.monotonic()
+            if full:
+                self._reloaded_at = self._refreshed_at
+
+            logger.debug(f"Client mapping refreshed ({'full' if full else 'incremental'}, {len(clients)} clients loaded)")
+
+    async def update_metadata(self, client_id: Any, updates: Dict[str, Any]) -> bool:
+        """
+        Merge values into a client's metadata and persist them.
+
+        The values are merged in a single UPDATE with jsonb ``||``, so
+        concurrent updates of other keys are not lost.
+
+        Args:
+            client_id: MSPAlwaysOn client ID
+            updates: Metadata keys and values to set
+
+        Returns:
+            True if the client was updated, False if it does not exist
+        """
+        table = Client.__table__
+        merged = (
+            func.coalesce(cast(table.c.metadata, JSONB), text("'{}'::jsonb"))
+            .op("||")(literal(updates, JSONB))
+        )
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(table)
+                .where(table.c.id == int(client_id))
+                .values({table.c.metadata: cast(merged, JSON)})
+                .returning(table.c.id)
+            )
+            updated = result.first() is not None
+            await session.commit()
+
+        if not updated:
+            return False
+
+        self.invalidate(client_id)
+        return True
+
+    def invalidate(self, client_id: Optional[Any] = None):
+        """
+        Invalidate the snapshot.
+
+        Args:
+            client_id: Client to reload on the next refresh, or None to force a full reload
+        """
+        if client_id is None:
+            self._reloaded_at = None
+        else:
+            self._stale_ids.add(int(client_id))
+            self._refreshed_at = 0.0
+
+    async def _ensure_fresh(self):
+        """Refresh the snapshot when it is older than the refresh interval."""
+        now = time.monotonic()
+
+        if self._reloaded_at is None or now - self._reloaded_at > self.full_reload_interval:
+            await self.refresh(full=True)
+        elif now - self._refreshed_at > self.refresh_interval:
+            await self.refresh()
+
+    def _can_refresh_on_miss(self) -> bool:
+        """Check whether a lookup miss may trigger a refresh."""
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.miss_refresh_interval
+
+    def _to_mapping(self, client: Client) -> ClientMapping:
+        """
+        Convert a client model to a mapping snapshot.
+
+        Args:
+            client: Client model
+
+        Returns:
+            Client mapping
+        """
+        return ClientMapping(
+            id=client.id,
+            name=client.name,
+            external_id=client.external_id,
+            external_system=client.external_system,
+            is_active=client.is_active if client.is_active is not None else True,
+            metadata=dict(client.metadata or {}),
+            updated_at=client.updated_at or client.created_at
+        )
+
+# Singleton instance
+client_mapping_service = ClientMappingService()
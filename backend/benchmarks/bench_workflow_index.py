@@ -0,0 +1,102 @@
+"""
+Benchmark of workflow trigger matching.
+
+Generates 1,000 workflows and compares matching alerts through the compiled
+trigger index with evaluating every workflow's filters.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_workflow_index
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import yaml
+
+from keep_integration.workflows.loader import WorkflowLoader, _get_field
+
+WORKFLOW_COUNT = 1000
+ALERT_COUNT = 10000
+
+SOURCES = ["sentinelone", "veeam", "connectwise-manage", "itglue"]
+SEVERITIES = ["info", "warning", "high", "critical"]
+COMPANIES = [f"Client {i}" for i in range(200)]
+
+def write_workflows(directory: str):
+    """Write generated workflow files to a directory."""
+    random.seed(1)
+    for i in range(WORKFLOW_COUNT):
+        filters = [
+            {"key": "source", "value": random.choice(SOURCES)},
+            {"key": "severity", "value": random.choice(SEVERITIES)},
+        ]
+        if i % 2:
+            filters.append({"key": "labels.company", "value": random.choice(COMPANIES)})
+
+        workflow = {
+            "workflow": {
+                "id": f"workflow-{i}",
+                "name": f"Workflow {i}",
+                "triggers": [{"type": "alert", "filters": filters}],
+                "actions": [],
+            }
+        }
+        with open(os.path.join(directory, f"workflow_{i}.yml"), "w") as f:
+            yaml.safe_dump(workflow, f)
+
+def generate_alerts():
+    """Generate random alerts."""
+    return [
+        {
+            "source": random.choice(SOURCES),
+            "severity": random.choice(SEVERITIES),
+            "labels": {"company": random.choice(COMPANIES)},
+        }
+        for _ in range(ALERT_COUNT)
+    ]
+
+def linear_match(workflows, alert):
+    """Match an alert by evaluating every workflow's filters."""
+    matched = []
+    for workflow in workflows:
+        for trigger in workflow.triggers:
+            if all(
+                str(trigger_filter["value"]) in (_get_field(alert, trigger_filter["key"]) or [])
+                for trigger_filter in trigger.get("filters", [])
+            ):
+                matched.append(workflow)
+                break
+    return matched
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        write_workflows(directory)
+        loader = WorkflowLoader(directory)
+
+        start = time.perf_counter()
+        loader.reload()
+        print(f"Loaded {len(loader.workflows)} workflows in {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        loader.reload()
+        print(f"Checked for changes in {time.perf_counter() - start:.4f}s")
+
+        alerts = generate_alerts()
+        workflows = list(loader.workflows.values())
+
+        start = time.perf_counter()
+        indexed = [loader.match(alert) for alert in alerts]
+        indexed_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        linear = [linear_match(workflows, alert) for alert in alerts]
+        linear_time = time.perf_counter() - start
+
+        assert [{w.id for w in m} for m in indexed] == [{w.id for w in m} for m in linear]
+        print(f"Indexed: {indexed_time / ALERT_COUNT * 1e6:.1f}us per alert")
+        print(f"Linear:  {linear_time / ALERT_COUNT * 1e6:.1f}us per alert")
+
+if __name__ == "__main__":
+    main()
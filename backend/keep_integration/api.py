@@ -5,52 +5,44 @@ This module provides integration with Keep.dev's API components,
 adapting them to work with MSP-specific data models and workflows.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Dict, List, Any
 
+from keep_integration.correlation import correlation_engine
+from keep_integration.dedup import alert_deduplicator
+from keep_integration.registry import registry
+from keep_integration.webhooks import webhook_router
+
 # Create router for Keep.dev integration
 keep_api_router = APIRouter(prefix="/api/v1/keep")
 
+# Webhook receivers for push-based alerts
+keep_api_router.include_router(webhook_router)
+
 # Example endpoint
 @keep_api_router.get("/status", tags=["Keep Integration"])
 async def keep_status():
     """Check the status of the Keep.dev integration."""
     return {"status": "operational", "integration": "active"}
 
+@keep_api_router.get("/alerts/dedup", tags=["Keep Integration"])
+async def alert_dedup_stats():
+    """Get counters of emitted and suppressed duplicate alerts."""
+    return alert_deduplicator.stats()
+
+@keep_api_router.get("/alerts/incidents", tags=["Keep Integration"])
+async def list_incidents():
+    """List open incidents of correlated alerts, most recent first."""
+    return {"incidents": [incident.to_dict() for incident in reversed(correlation_engine.incidents.values())]}
+
 # Provider endpoints
 @keep_api_router.get("/providers", tags=["Keep Integration"])
-async def list_providers():
+async def list_providers(request: Request):
     """List all available providers."""
-    # This is a placeholder - in the actual implementation,
-    # we would query Keep's provider registry
-    return {
-        "providers": [
-            {
-                "type": "connectwise-manage",
-                "display_name": "ConnectWise Manage",
-                "category": ["Ticketing", "PSA"],
-                "description": "ConnectWise Manage is a business management platform for MSPs."
-            }
-        ]
-    }
+    return registry.respond(registry.providers, request)
 
 # Workflow endpoints
 @keep_api_router.get("/workflows", tags=["Keep Integration"])
-async def list_workflows():
-    """List all available workflows."""
-    # This is a placeholder - in the actual implementation,
-    # we would query Keep's workflow registry
-    return {
-        "workflows": [
-            {
-                "id": "connectwise-ticket-creation",
-                "name": "ConnectWise Ticket Creation",
-                "description": "Creates a ticket in ConnectWise Manage for critical alerts"
-            },
-            {
-                "id": "security-incident-response",
-                "name": "Security Incident Response",
-                "description": "Automated response to security incidents from SentinelOne"
-            }
-        ]
-    }
+async def list_workflows(request: Request):
+    """List all loaded workflows."""
+    return registry.respond(registry.workflows, request)
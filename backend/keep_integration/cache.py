@@ -0,0 +1,91 @@
+"""
+In-process caches for MSP providers.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+# Sentinel distinguishing a cache miss from a cached None
+MISSING = object()
+
+class LRUCache:
+    """
+    Least-recently-used cache with per-entry expiry.
+
+    Entries expire after ``ttl`` seconds, or after ``negative_ttl`` seconds
+    when stored as negative results, so lookups that found nothing are
+    retried sooner than positive ones.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, negative_ttl: float = 300):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds before a positive entry expires
+            negative_ttl: Seconds before a negative entry expires
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get an entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING if there is no live entry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, negative: bool = False):
+        """
+        Store an entry, evicting the least recently used one when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            negative: Whether the value records that nothing was found
+        """
+        ttl = self.negative_ttl if negative else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> Optional[Any]:
+        """
+        Remove an entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The removed value, or None if there was no entry
+        """
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
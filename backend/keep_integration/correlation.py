@@ -0,0 +1,526 @@
+"""
+Cross-source alert correlation for MSPAlwaysOn.
+
+This module groups alerts from ConnectWise Manage, SentinelOne and Veeam
+into incidents when they concern the same client and host within a
+sliding time window. Host names, addresses and company names from the
+alerts are normalized against the Asset and Client tables, and incidents are found
+through hash indexes keyed on (client, host), so each alert costs a few
+dictionary lookups regardless of how many incidents are open.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.db.base_class import async_session
+from app.models.asset import Asset
+from app.models.client import Client
+from app.models.site import Site
+from keep_integration.cache import MISSING, LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Severities from least to most severe
+SEVERITY_ORDER = ["info", "low", "warning", "high", "critical"]
+
+# Legal suffixes ignored when matching company names
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "plc", "gmbh", "pty"}
+
+def normalize_hostname(hostname: Optional[str]) -> Optional[str]:
+    """
+    Normalize a hostname for matching.
+
+    Args:
+        hostname: Hostname, possibly fully qualified
+
+    Returns:
+        Lowercase short hostname, or None for empty and unknown values
+    """
+    if not hostname:
+        return None
+    hostname = hostname.strip().lower().split(".")[0]
+    return hostname if hostname and hostname != "unknown" else None
+
+def short_hostname_expression():
+    """
+    Get the SQL expression matching normalize_hostname, backed by the short hostname index.
+
+    Returns:
+        Lowercase hostname up to the first dot
+    """
+    return func.split_part(func.lower(Asset.hostname), ".", 1)
+
+def normalize_address(address: Optional[str]) -> Optional[str]:
+    """
+    Normalize an IP or MAC address for matching.
+
+    Args:
+        address: IP or MAC address
+
+    Returns:
+        Lowercase address, or None for empty and unknown values
+    """
+    if not address:
+        return None
+    address = address.strip().lower()
+    return address if address and address != "unknown" else None
+
+def normalize_company(name: Optional[str]) -> Optional[str]:
+    """
+    Normalize a company name for matching.
+
+    Args:
+        name: Company name
+
+    Returns:
+        Lowercase name without punctuation and legal suffixes, or None for empty and unknown values
+    """
+    if not name:
+        return None
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    normalized = " ".join(words)
+    return normalized if normalized and normalized != "unknown" else None
+
+class AssetDirectory:
+    """
+    Snapshot of hostnames, addresses and client names used to resolve alert entities.
+
+    Hostnames and IP/MAC addresses map to (client ID, asset ID) and
+    normalized client names map to client IDs. The snapshot is reloaded in
+    one query every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, session_factory=async_session, refresh_interval: float = 300):
+        """
+        Initialize the asset directory.
+
+        Args:
+            session_factory: Factory for database sessions
+            refresh_interval: Seconds between reloads
+        """
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.hosts: Dict[str, Tuple[int, int]] = {}
+        self.addresses: Dict[str, Tuple[int, int]] = {}
+        self.clients: Dict[str, int] = {}
+        self.external_clients: Dict[Tuple[str, str], int] = {}
+        self._job_cache = LRUCache(maxsize=10000, ttl=refresh_interval)
+        self._missed_assets = LRUCache(maxsize=10000, ttl=refresh_interval, negative_ttl=refresh_interval)
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        """Reload the snapshot if it is older than the refresh interval."""
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep correlating with the previous snapshot
+                logger.error(f"Error loading asset directory: {e}")
+                self._loaded_at = time.monotonic()
+
+    async def refresh(self):
+        """Load hostnames, addresses, client names and client external IDs from the database."""
+        async with self.session_factory() as session:
+            clients = await session.execute(
+                select(Client.id, Client.name, Client.external_system, Client.external_id)
+            )
+            assets = await session.execute(
+                select(Asset.id, Asset.name, Asset.hostname, Asset.ip_address, Asset.mac_address, Site.client_id)
+                .join(Site, Asset.site_id == Site.id)
+            )
+
+            client_index = {}
+            external_index = {}
+            for client_id, name, external_system, external_id in clients:
+                normalized = normalize_company(name)
+                if normalized:
+                    client_index[normalized] = client_id
+                if external_system and external_id:
+                    external_index[(external_system, external_id)] = client_id
+
+            host_index = {}
+            address_index = {}
+            for asset_id, name, hostname, ip_address, mac_address, client_id in assets:
+                for value in (hostname, name):
+                    normalized = normalize_hostname(value)
+                    if normalized:
+                        host_index.setdefault(normalized, (client_id, asset_id))
+                for value in (ip_address, mac_address):
+                    normalized = normalize_address(value)
+                    if normalized:
+                        address_index.setdefault(normalized, (client_id, asset_id))
+
+        self.set_entries(host_index, client_index, external_index, address_index)
+
+    def set_entries(
+        self,
+        hosts: Dict[str, Tuple[int, int]],
+        clients: Dict[str, int],
+        external_clients: Optional[Dict[Tuple[str, str], int]] = None,
+        addresses: Optional[Dict[str, Tuple[int, int]]] = None
+    ):
+        """
+        Replace the snapshot.
+
+        Args:
+            hosts: Normalized hostname to (client ID, asset ID)
+            clients: Normalized client name to client ID
+            external_clients: (external system, external ID) to client ID
+            addresses: Normalized IP or MAC address to (client ID, asset ID)
+        """
+        self.hosts = hosts
+        self.clients = clients
+        self.external_clients = external_clients or {}
+        self.addresses = addresses or {}
+        self._job_cache.clear()
+        self._missed_assets.clear()
+        self._loaded_at = time.monotonic()
+
+    async def resolve_hosts(self, hostnames: List[str], addresses: Optional[List[str]] = None):
+        """
+        Look up hosts missing from the snapshot, e.g. assets synced since the last reload.
+
+        Misses are looked up in one query on the short hostname, IP address
+        and MAC address indexes, and remembered until the next reload unless
+        the query fails.
+
+        Args:
+            hostnames: Hostnames as reported by alerts
+            addresses: IP or MAC addresses as reported by alerts
+        """
+        missing_hosts = {
+            normalized for normalized in map(normalize_hostname, hostnames)
+            if normalized and normalized not in self.hosts
+            and self._missed_assets.get(("host", normalized)) is MISSING
+        }
+        missing_addresses = {
+            normalized for normalized in map(normalize_address, addresses or [])
+            if normalized and normalized not in self.addresses
+            and self._missed_assets.get(("address", normalized)) is MISSING
+        }
+        if not missing_hosts and not missing_addresses:
+            return
+
+        conditions = []
+        if missing_hosts:
+            conditions.append(short_hostname_expression().in_(sorted(missing_hosts)))
+        if missing_addresses:
+            conditions.append(Asset.ip_address.in_(sorted(missing_addresses)))
+            conditions.append(func.lower(Asset.mac_address).in_(sorted(missing_addresses)))
+
+        try:
+            async with self.session_factory() as session:
+                assets = await session.execute(
+                    select(Asset.id, Asset.hostname, Asset.ip_address, Asset.mac_address, Site.client_id)
+                    .join(Site, Asset.site_id == Site.id)
+                    .where(or_(*conditions))
+                )
+                for asset_id, hostname, ip_address, mac_address, client_id in assets:
+                    normalized = normalize_hostname(hostname)
+                    if normalized:
+                        self.hosts.setdefault(normalized, (client_id, asset_id))
+                    for address in filter(None, map(normalize_address, (ip_address, mac_address))):
+                        self.addresses.setdefault(address, (client_id, asset_id))
+        except Exception as e:
+            # Not remembered as misses, so the next batch retries the lookup
+            logger.error(f"Error looking up hosts: {e}")
+            return
+
+        for normalized in missing_hosts - set(self.hosts):
+            self._missed_assets.set(("host", normalized), True, negative=True)
+        for normalized in missing_addresses - set(self.addresses):
+            self._missed_assets.set(("address", normalized), True, negative=True)
+
+    def resolve_job(self, job_name: str) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+        """
+        Resolve a Veeam job name to a client and host.
+
+        Job names usually embed the client and/or protected host, e.g.
+        "Acme - Daily" or "Backup FS01". Each separator-delimited segment is
+        looked up as a client name and each word as a hostname.
+
+        Args:
+            job_name: Veeam job name
+
+        Returns:
+            Tuple of (client ID, hostname, asset ID), with None for unresolved parts
+        """
+        cached = self._job_cache.get(job_name)
+        if cached is not MISSING:
+            return cached
+
+        client_id = hostname = asset_id = None
+        for segment in re.split(r"\s[-|:/]\s|[_|]", job_name):
+            normalized = normalize_company(segment)
+            if normalized in self.clients:
+                client_id = self.clients[normalized]
+                break
+
+        for word in re.split(r"[^A-Za-z0-9.-]+", job_name):
+            normalized = normalize_hostname(word)
+            if normalized in self.hosts:
+                host_client_id, asset_id = self.hosts[normalized]
+                hostname = normalized
+                client_id = client_id or host_client_id
+                break
+
+        result = (client_id, hostname, asset_id)
+        self._job_cache.set(job_name, result)
+        return result
+
+@dataclass
+class Incident:
+    """Group of correlated alerts."""
+
+    id: str
+    client_key: str
+    first_seen: float
+    last_seen: float
+    severity: str = "info"
+    hosts: Set[str] = field(default_factory=set)
+    sources: Set[str] = field(default_factory=set)
+    fingerprints: List[str] = field(default_factory=list)
+    keys: Set[Tuple[str, ...]] = field(default_factory=set)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the incident to a dictionary."""
+        return {
+            "id": self.id,
+            "client": self.client_key,
+            "severity": self.severity,
+            "hosts": sorted(self.hosts),
+            "sources": sorted(self.sources),
+            "alert_count": len(self.fingerprints),
+            "first_seen": datetime.fromtimestamp(self.first_seen).isoformat(),
+            "last_seen": datetime.fromtimestamp(self.last_seen).isoformat(),
+        }
+
+class CorrelationEngine:
+    """
+    Correlation engine grouping alerts into incidents.
+
+    An alert with a resolvable host joins the open incident for its
+    (client, host), or a host-less incident of its client; an alert without
+    a host (such as a ticket) joins the most recent open incident of its
+    client. Incidents close once no alert has
+    joined them for ``window`` seconds.
+    """
+
+    def __init__(self, directory: Optional[AssetDirectory] = None, window: float = 1800):
+        """
+        Initialize the correlation engine.
+
+        Args:
+            directory: Asset directory used to resolve hosts and clients
+            window: Seconds an incident stays open after its last alert
+        """
+        self.directory = directory or AssetDirectory()
+        self.window = window
+        self.incidents: "OrderedDict[str, Incident]" = OrderedDict()
+        self._index: Dict[Tuple[str, ...], str] = {}
+        self._clock = 0.0
+
+    async def correlate_batch(self, alerts: List[Dict[str, Any]]) -> List[Incident]:
+        """
+        Correlate a batch of alerts, annotating each with its incident ID.
+
+        Args:
+            alerts: Alerts
+
+        Returns:
+            Incident of each alert, in order
+        """
+        await self.directory.ensure_loaded()
+        labels = [alert.get("labels") or {} for alert in alerts]
+        await self.directory.resolve_hosts(
+            [alert_labels["computer_name"] for alert_labels in labels if alert_labels.get("computer_name")],
+            [
+                alert_labels[key] for alert_labels in labels for key in ("ip_address", "mac_address")
+                if alert_labels.get(key)
+            ]
+        )
+        return [self.correlate(alert) for alert in alerts]
+
+    def correlate(self, alert: Dict[str, Any]) -> Incident:
+        """
+        Correlate an alert.
+
+        Args:
+            alert: Alert
+
+        Returns:
+            The incident the alert joined or opened
+        """
+        timestamp = self._parse_timestamp(alert.get("lastReceived"))
+        self._clock = max(self._clock, timestamp)
+        self._expire()
+
+        client_key, hostname = self.resolve_entities(alert)
+        host_key = ("host", client_key, hostname) if hostname else None
+        client_index_key = ("client", client_key)
+
+        incident = self._lookup(host_key) if host_key else None
+        if incident is None:
+            # Host alerts only join client incidents not yet tied to another host
+            incident = self._lookup(client_index_key)
+            if incident is not None and host_key and incident.hosts:
+                incident = None
+
+        if incident is None:
+            incident = Incident(
+                id=str(uuid.uuid4()),
+                client_key=client_key,
+                first_seen=timestamp,
+                last_seen=timestamp
+            )
+            self.incidents[incident.id] = incident
+
+        incident.last_seen = max(incident.last_seen, timestamp)
+        incident.sources.add(alert.get("source", "unknown"))
+        if alert.get("fingerprint"):
+            incident.fingerprints.append(alert["fingerprint"])
+        if hostname:
+            incident.hosts.add(hostname)
+        if SEVERITY_ORDER.index(self._severity(alert)) > SEVERITY_ORDER.index(incident.severity):
+            incident.severity = self._severity(alert)
+
+        for key in filter(None, (host_key, client_index_key)):
+            self._index[key] = incident.id
+            incident.keys.add(key)
+        self.incidents.move_to_end(incident.id)
+
+        alert.setdefault("annotations", {})["incident_id"] = incident.id
+        return incident
+
+    def resolve_entities(self, alert: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Resolve the client and host an alert concerns.
+
+        Args:
+            alert: Alert
+
+        Returns:
+            Tuple of (client key, normalized hostname or None); the client key is
+            the client ID when resolved, otherwise the normalized company name
+        """
+        labels = alert.get("labels") or {}
+        client_id = None
+
+        # ConnectWise tickets carry the company ID of a synced client
+        company_id = (alert.get("annotations") or {}).get("company_id")
+        if alert.get("source") == "connectwise-manage" and company_id:
+            client_id = self.directory.external_clients.get(("connectwise", str(company_id)))
+
+        hostname = normalize_hostname(labels.get("computer_name"))
+        company = (
+            normalize_company(labels.get("company"))
+            or normalize_company(labels.get("site_name"))
+            or normalize_company(labels.get("account_name"))
+        )
+
+        if client_id is None and hostname and hostname in self.directory.hosts:
+            client_id = self.directory.hosts[hostname][0]
+        elif client_id is None and labels.get("job_name") and not hostname:
+            client_id, hostname, _ = self.directory.resolve_job(labels["job_name"])
+
+        # Hosts reported under another name are matched by IP or MAC address
+        if client_id is None:
+            client_id = self._resolve_address(labels)
+
+        if client_id is None and company:
+            client_id = self.directory.clients.get(company)
+
+        if client_id is not None:
+            return str(client_id), hostname
+        return company or "unknown", hostname
+
+    def _resolve_address(self, labels: Dict[str, Any]) -> Optional[int]:
+        """
+        Resolve the client of an alert by its IP or MAC address.
+
+        Args:
+            labels: Alert labels
+
+        Returns:
+            Client ID, or None if neither address is known
+        """
+        for key in ("ip_address", "mac_address"):
+            normalized = normalize_address(labels.get(key))
+            if normalized in self.directory.addresses:
+                return self.directory.addresses[normalized][0]
+        return None
+
+    def _lookup(self, key: Tuple[str, ...]) -> Optional[Incident]:
+        """
+        Find the open incident indexed under a key.
+
+        Args:
+            key: Index key
+
+        Returns:
+            The incident, or None if there is no open one
+        """
+        incident_id = self._index.get(key)
+        if incident_id is None:
+            return None
+        incident = self.incidents.get(incident_id)
+        if incident is None or self._clock - incident.last_seen > self.window:
+            return None
+        return incident
+
+    def _expire(self):
+        """Close incidents whose window has passed, oldest first."""
+        while self.incidents:
+            incident = next(iter(self.incidents.values()))
+            if self._clock - incident.last_seen <= self.window:
+                break
+            self.incidents.popitem(last=False)
+            for key in incident.keys:
+                if self._index.get(key) == incident.id:
+                    del self._index[key]
+
+    @staticmethod
+    def _severity(alert: Dict[str, Any]) -> str:
+        """Get an alert's severity, defaulting to info."""
+        severity = alert.get("severity", "info")
+        return severity if severity in SEVERITY_ORDER else "info"
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> float:
+        """
+        Parse an alert timestamp.
+
+        Args:
+            value: ISO 8601 timestamp
+
+        Returns:
+            POSIX timestamp, or the current time if it cannot be parsed
+        """
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                pass
+        return time.time()
+
+# Singleton instance
+correlation_engine = CorrelationEngine()
@@ -0,0 +1,171 @@
+"""
+Alert deduplication for MSPAlwaysOn.
+
+Providers re-emit every firing alert on each poll. This module remembers
+the last state of each alert fingerprint and only lets an alert through
+when its status, severity or labels changed, or when the fingerprint has
+not been seen within the sliding window. State is kept in memory and
+shared through Redis when it is reachable.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from keep_integration.cache import MISSING, LRUCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is optional for local development
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+class AlertDeduplicator:
+    """
+    Fingerprint-keyed alert deduplicator with a sliding window.
+
+    Each sighting of a fingerprint refreshes its window, so an alert that
+    keeps firing unchanged stays suppressed; it is emitted again once it has
+    not been seen for ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        redis_url: Optional[str] = None,
+        namespace: str = "mspalwayson:dedup",
+        maxsize: int = 100000
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            ttl: Seconds a fingerprint is remembered after it was last seen
+            redis_url: Redis connection URL, or None for an in-memory store
+            namespace: Prefix of the Redis keys
+            maxsize: Maximum number of fingerprints kept in memory
+        """
+        self.ttl = ttl
+        self.namespace = namespace
+        self._states = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        self.emitted = 0
+        self.suppressed = 0
+
+        if redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Error connecting deduplicator to Redis, using memory only: {e}")
+                self._redis = None
+
+    @staticmethod
+    def state_hash(alert: Dict[str, Any]) -> str:
+        """
+        Hash the parts of an alert whose change should be emitted.
+
+        Args:
+            alert: Alert
+
+        Returns:
+            Hash of the alert's status, severity and labels
+        """
+        state = [alert.get("status"), alert.get("severity"), alert.get("labels") or {}]
+        return hashlib.sha1(json.dumps(state, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def filter(self, alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Get the alerts that changed since their fingerprint was last seen.
+
+        The seen state is not updated; call ``record`` once the alerts have
+        been processed so a failed batch is not suppressed when replayed.
+
+        Args:
+            alerts: Alerts
+
+        Returns:
+            Alerts to emit; alerts without a fingerprint are always emitted
+        """
+        hashes = {}
+        for alert in alerts:
+            fingerprint = alert.get("fingerprint")
+            if fingerprint:
+                hashes[fingerprint] = self._states.get(fingerprint)
+
+        # Fall back to Redis for fingerprints not seen by this process
+        unknown = [fingerprint for fingerprint, value in hashes.items() if value is MISSING]
+        if unknown and self._redis is not None:
+            try:
+                values = await self._redis.mget([self._key(fingerprint) for fingerprint in unknown])
+                for fingerprint, value in zip(unknown, values):
+                    if value is not None:
+                        hashes[fingerprint] = value
+            except Exception as e:
+                logger.warning(f"Error reading alert states from Redis: {e}")
+
+        emitted = []
+        for alert in alerts:
+            fingerprint = alert.get("fingerprint")
+            if fingerprint:
+                state_hash = self.state_hash(alert)
+                if hashes[fingerprint] == state_hash:
+                    self.suppressed += 1
+                    continue
+                # Later repeats within the same batch are duplicates of this alert
+                hashes[fingerprint] = state_hash
+
+            emitted.append(alert)
+            self.emitted += 1
+
+        return emitted
+
+    async def record(self, alerts: List[Dict[str, Any]]):
+        """
+        Record alerts as seen, refreshing their window.
+
+        Args:
+            alerts: Processed alerts
+        """
+        states = {
+            alert["fingerprint"]: self.state_hash(alert)
+            for alert in alerts
+            if alert.get("fingerprint")
+        }
+
+        for fingerprint, state_hash in states.items():
+            self._states.set(fingerprint, state_hash)
+
+        if states and self._redis is not None:
+            try:
+                pipeline = self._redis.pipeline(transaction=False)
+                for fingerprint, state_hash in states.items():
+                    pipeline.set(self._key(fingerprint), state_hash, ex=int(self.ttl))
+                await pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Error persisting alert states to Redis: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get deduplication counters.
+
+        Returns:
+            Emitted and suppressed counts and the number of tracked fingerprints
+        """
+        return {
+            "emitted": self.emitted,
+            "suppressed": self.suppressed,
+            "tracked": len(self._states),
+        }
+
+    def _key(self, fingerprint: str) -> str:
+        """Get the Redis key of a fingerprint."""
+        return f"{self.namespace}:{fingerprint}"
+
+# Singleton instance
+alert_deduplicator = AlertDeduplicator(
+    ttl=settings.ALERT_DEDUP_TTL_SECONDS,
+    redis_url=settings.REDIS_URL if settings.INGESTION_BACKEND == "redis" else None
+)
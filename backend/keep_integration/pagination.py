@@ -0,0 +1,71 @@
+"""
+Pagination helpers for MSP providers.
+
+This module provides a bounded prefetch window for paged vendor APIs,
+allowing providers to stream results page by page while the next pages
+are already being fetched.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List, NamedTuple, Optional
+
+
+class PageResult(NamedTuple):
+    """A single page returned by a paged vendor API."""
+
+    items: List[Any]
+    has_more: bool
+    total_pages: Optional[int] = None
+
+
+async def prefetch_pages(
+    fetch_page: Callable[[int], Awaitable[PageResult]],
+    first_page: int = 1,
+    window: int = 4
+) -> AsyncIterator[List[Any]]:
+    """
+    Fetch pages concurrently within a bounded window and yield them in order.
+
+    The first page is fetched on its own so that vendors reporting a total
+    page count do not get speculative requests beyond the last page. After
+    that, up to ``window`` pages are kept in flight at any time.
+
+    Args:
+        fetch_page: Coroutine function fetching a single page by number
+        first_page: Number of the first page to fetch
+        window: Maximum number of pages in flight
+
+    Yields:
+        The items of each page, in page order
+    """
+    window = max(1, window)
+    next_page = first_page
+    last_page: Optional[int] = None
+    pending: Deque[asyncio.Task] = deque()
+
+    def schedule(limit: int):
+        nonlocal next_page
+        while len(pending) < limit and (last_page is None or next_page <= last_page):
+            pending.append(asyncio.ensure_future(fetch_page(next_page)))
+            next_page += 1
+
+    try:
+        schedule(1)
+        while pending:
+            page = await pending.popleft()
+
+            if page.total_pages is not None:
+                last_page = page.total_pages
+
+            if page.items:
+                yield page.items
+
+            if not page.has_more:
+                break
+
+            schedule(window)
+    finally:
+        # Drop speculative requests for pages past the end of the result set
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,92 @@
+"""
+Providers configured from the application settings.
+
+Background jobs (polling, syncs and workflow steps) run outside Keep's
+provider configuration, so they use one provider instance per type built
+from the credentials in ``Settings``.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from keep.providers.models.provider_config import ProviderConfig
+
+from app.core.config import settings
+from keep_integration.providers import MSP_PROVIDERS
+
+logger = logging.getLogger(__name__)
+
+# Provider instances by type
+_providers: Dict[str, Any] = {}
+
+def _credentials(provider_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the configured credentials of a provider type.
+
+    Args:
+        provider_type: Provider type (e.g. "sentinelone")
+
+    Returns:
+        Authentication config, or None if the provider is not configured
+    """
+    if provider_type == "connectwise-manage":
+        credentials = {
+            "company_id": settings.CONNECTWISE_COMPANY_ID,
+            "public_key": settings.CONNECTWISE_PUBLIC_KEY,
+            "private_key": settings.CONNECTWISE_PRIVATE_KEY,
+            "client_id": settings.CONNECTWISE_CLIENT_ID,
+            "base_url": settings.CONNECTWISE_BASE_URL,
+        }
+        return credentials if all(credentials.values()) else None
+
+    if provider_type == "sentinelone":
+        if not settings.SENTINELONE_API_TOKEN:
+            return None
+        credentials = {"api_token": settings.SENTINELONE_API_TOKEN, "account_id": settings.SENTINELONE_ACCOUNT_ID}
+        if settings.SENTINELONE_BASE_URL:
+            credentials["base_url"] = settings.SENTINELONE_BASE_URL
+        return credentials
+
+    if provider_type == "veeam":
+        credentials = {
+            "username": settings.VEEAM_USERNAME,
+            "password": settings.VEEAM_PASSWORD,
+            "base_url": settings.VEEAM_BASE_URL,
+        }
+        return credentials if all(credentials.values()) else None
+
+    return None
+
+def get_configured_provider(provider_type: str):
+    """
+    Get the provider of a type configured in the settings.
+
+    Args:
+        provider_type: Provider type (e.g. "sentinelone")
+
+    Returns:
+        Shared provider instance, or None if the type is unknown or not configured
+    """
+    if provider_type not in _providers:
+        credentials = _credentials(provider_type)
+        if provider_type not in MSP_PROVIDERS or credentials is None:
+            return None
+        config = ProviderConfig(provider_id=provider_type, authentication=credentials)
+        _providers[provider_type] = MSP_PROVIDERS[provider_type](provider_type, config)
+    return _providers[provider_type]
+
+def configured_provider_types() -> List[str]:
+    """Get the provider types with credentials in the settings."""
+    return [provider_type for provider_type in MSP_PROVIDERS if _credentials(provider_type) is not None]
+
+async def close_configured_providers():
+    """Close the configured providers that hold background tasks or connections."""
+    for provider_type, provider in list(_providers.items()):
+        close = getattr(provider, "close", None)
+        if close is None:
+            continue
+        try:
+            await close()
+        except Exception as e:
+            logger.error(f"Error closing {provider_type} provider: {e}")
+    _providers.clear()
@@ -5,14 +5,20 @@ This module implements a Keep.dev provider for ConnectWise Manage,
 allowing Keep to interact with ConnectWise tickets and alerts.
 """
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import asyncio
+import json
 import logging
 import httpx
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from keep.providers.base.base_provider import BaseProvider
 from keep.providers.models.provider_config import ProviderConfig
 
+from keep_integration.pagination import PageResult, prefetch_pages
+from keep_integration.state import watermark_store
+from keep_integration.transport import create_client
+
 logger = logging.getLogger(__name__)
 
 class ConnectWiseManageProviderAuthConfig:
@@ -40,9 +46,18 @@ class ConnectWiseManageProvider(BaseProvider):
     PROVIDER_DESCRIPTION = "ConnectWise Manage is a business management platform for MSPs."
     FINGERPRINT_FIELDS = ["id", "summary"]
 
+    # Incremental syncs re-read this much history before the watermark to
+    # tolerate clock skew between ConnectWise servers
+    WATERMARK_OVERLAP_SECONDS = 120
+
+    # Batch notify settings
+    BATCH_CONCURRENCY = 10
+
     def __init__(self, provider_id, config):
         super().__init__(provider_id, config)
         self.client = None
+        self._watermark = None
+        self._seen_tickets = {}
         self._init_client()
 
     def _init_client(self):
@@ -61,14 +76,14 @@ class ConnectWiseManageProvider(BaseProvider):
                 return
 
             # Initialize HTTP client with authentication headers
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
+            self.client = create_client(
+                "connectwise-manage",
+                self.base_url,
                 headers={
                     "Authorization": f"Basic {self._get_auth_header()}",
                     "ClientID": self.client_id,
                     "Content-Type": "application/json"
-                },
-                timeout=30.0
+                }
             )
             logger.info(f"ConnectWise Manage client initialized for company {self.company_id}")
         except Exception as e:
@@ -116,20 +131,9 @@ class ConnectWiseManageProvider(BaseProvider):
             }
 
             # Add conditions if provided
-            if conditions:
-                condition_strings = []
-                for condition in conditions:
-                    field = condition.get("field")
-                    operator = condition.get("operator", "equals")
-                    value = condition.get("value")
-
-                    if field and value is not None:
-                        # Map operator to ConnectWise format
-                        cw_operator = self._map_operator(operator)
-                        condition_strings.append(f"{field} {cw_operator} {self._format_value(value)}")
-
-                if condition_strings:
-                    params["conditions"] = " AND ".join(condition_strings)
+            condition_string = self._build_conditions(conditions)
+            if condition_string:
+                params["conditions"] = condition_string
 
             # Make API request
             response = await self.client.get("/service/tickets", params=params)
@@ -144,6 +148,261 @@ class ConnectWiseManageProvider(BaseProvider):
             logger.error(f"Error querying ConnectWise Manage tickets: {e}")
             return []
 
+    async def query_stream(self, query_params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all tickets matching a query from ConnectWise Manage.
+
+        Unlike query, this follows ConnectWise pagination until the last page,
+        prefetching the next pages concurrently and yielding transformed alerts
+        as each page arrives.
+
+        Args:
+            query_params: Parameters for the query
+                - conditions: List of condition dictionaries
+                - page: First page number (default: 1)
+                - page_size: Page size (default: 1000, the ConnectWise maximum)
+                - prefetch: Number of pages fetched concurrently (default: 4)
+
+        Yields:
+            Tickets matching the query, transformed to Keep alerts
+        """
+        if not self.client:
+            logger.error("ConnectWise Manage client not initialized")
+            return
+
+        params = {}
+        condition_string = self._build_conditions(query_params.get("conditions", []))
+        if condition_string:
+            params["conditions"] = condition_string
+
+        try:
+            async for tickets in self._stream_pages(
+                "/service/tickets",
+                params,
+                page=query_params.get("page", 1),
+                page_size=query_params.get("page_size", 1000),
+                prefetch=query_params.get("prefetch", 4)
+            ):
+                for ticket in tickets:
+                    yield self._transform_ticket_to_alert(ticket)
+        except Exception as e:
+            logger.error(f"Error streaming ConnectWise Manage tickets: {e}")
+
+    async def query_incremental(self, query_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Query only the tickets changed since the last incremental sync.
+
+        The provider keeps a watermark of the newest _info.lastUpdated seen and
+        adds a lastUpdated condition to the query, re-reading a short overlap
+        window to tolerate clock skew. Tickets already returned in the overlap
+        window are skipped by fingerprint unless they changed again. The
+        watermark and the fingerprints seen are only updated, and persisted,
+        once every page has been read.
+
+        Args:
+            query_params: Parameters for the query
+                - conditions: List of additional condition dictionaries
+                - page_size: Page size (default: 1000)
+                - prefetch: Number of pages fetched concurrently (default: 4)
+                - overlap_seconds: Overlap window (default: WATERMARK_OVERLAP_SECONDS)
+
+        Returns:
+            Tickets changed since the last sync, transformed to Keep alerts
+        """
+        if not self.client:
+            logger.error("ConnectWise Manage client not initialized")
+            return []
+
+        try:
+            overlap = timedelta(seconds=query_params.get("overlap_seconds", self.WATERMARK_OVERLAP_SECONDS))
+            watermark = await self._get_watermark()
+
+            conditions = list(query_params.get("conditions", []))
+            if watermark:
+                conditions.append({
+                    "field": "lastUpdated",
+                    "operator": "greater_than",
+                    "value": watermark - overlap
+                })
+
+            params = {}
+            condition_string = self._build_conditions(conditions)
+            if condition_string:
+                params["conditions"] = condition_string
+
+            alerts = []
+            newest = watermark
+            seen = dict(self._seen_tickets)
+            async for tickets in self._stream_pages(
+                "/service/tickets",
+                params,
+                page_size=query_params.get("page_size", 1000),
+                prefetch=query_params.get("prefetch", 4)
+            ):
+                for ticket in tickets:
+                    last_updated = ticket.get("_info", {}).get("lastUpdated")
+                    fingerprint = f"connectwise-manage-{ticket.get('id')}"
+
+                    # Skip tickets already returned unchanged in the overlap window
+                    if last_updated and seen.get(fingerprint) == last_updated:
+                        continue
+
+                    if last_updated:
+                        seen[fingerprint] = last_updated
+                        updated_at = self.parse_timestamp(last_updated)
+                        if updated_at and (newest is None or updated_at > newest):
+                            newest = updated_at
+
+                    alerts.append(self._transform_ticket_to_alert(ticket))
+
+            # Only fingerprints inside the overlap window can be returned again
+            if newest:
+                cutoff = newest - overlap
+                seen = {
+                    fingerprint: last_updated
+                    for fingerprint, last_updated in seen.items()
+                    if (self.parse_timestamp(last_updated) or cutoff) >= cutoff
+                }
+
+            if newest and (newest != watermark or seen != self._seen_tickets):
+                await self._set_watermark(newest, seen)
+
+            return alerts
+        except Exception as e:
+            logger.error(f"Error querying ConnectWise Manage tickets incrementally: {e}")
+            return []
+
+    async def _get_watermark(self) -> Optional[datetime]:
+        """
+        Get the incremental sync watermark for this provider.
+
+        Returns:
+            Newest lastUpdated seen, or None before the first sync
+        """
+        if self._watermark is None:
+            stored = await watermark_store.get(self._watermark_key())
+            self._watermark = self.parse_timestamp(stored) if stored else None
+
+            # Restore the fingerprints seen in the overlap window
+            stored_seen = await watermark_store.get(self._seen_key())
+            if stored_seen:
+                try:
+                    self._seen_tickets = json.loads(stored_seen)
+                except ValueError:
+                    logger.warning(f"Ignoring unreadable seen tickets for {self._watermark_key()}")
+        return self._watermark
+
+    async def _set_watermark(self, watermark: datetime, seen: Dict[str, str]):
+        """
+        Set and persist the incremental sync watermark for this provider.
+
+        Args:
+            watermark: Newest lastUpdated seen
+            seen: lastUpdated of the tickets returned in the overlap window, by fingerprint
+        """
+        # Persist the watermark first; if the seen map is lost, tickets are re-emitted rather than skipped
+        self._watermark = watermark
+        self._seen_tickets = seen
+        await watermark_store.set(self._watermark_key(), watermark.isoformat())
+        await watermark_store.set(self._seen_key(), json.dumps(seen))
+
+    def _watermark_key(self) -> str:
+        """Get the watermark store key for this provider's tickets."""
+        return f"connectwise-manage:{self.provider_id}:tickets"
+
+    def _seen_key(self) -> str:
+        """Get the watermark store key for the tickets seen in the overlap window."""
+        return f"connectwise-manage:{self.provider_id}:tickets-seen"
+
+    @staticmethod
+    def parse_timestamp(value: str) -> Optional[datetime]:
+        """
+        Parse a ConnectWise Manage timestamp.
+
+        Args:
+            value: ISO 8601 timestamp (e.g. 2023-04-12T12:34:56Z)
+
+        Returns:
+            Timezone-aware datetime, or None if the value cannot be parsed
+        """
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    async def stream(
+        self,
+        endpoint: str,
+        conditions: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 1000,
+        prefetch: int = 4
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the raw records of a ConnectWise Manage collection endpoint, page by page.
+
+        Args:
+            endpoint: Collection endpoint (e.g. /company/companies)
+            conditions: List of condition dictionaries with field, operator and value
+            page_size: Page size
+            prefetch: Number of pages fetched concurrently
+
+        Yields:
+            Lists of raw records, in page order
+
+        Raises:
+            httpx.HTTPError: If a request fails
+        """
+        params = {}
+        condition_string = self._build_conditions(conditions or [])
+        if condition_string:
+            params["conditions"] = condition_string
+
+        async for records in self._stream_pages(endpoint, params, page_size=page_size, prefetch=prefetch):
+            yield records
+
+    async def _stream_pages(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        page: int = 1,
+        page_size: int = 1000,
+        prefetch: int = 4
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the raw pages of a ConnectWise Manage collection endpoint.
+
+        Args:
+            endpoint: Collection endpoint (e.g. /service/tickets)
+            params: Query parameters other than page and pageSize
+            page: First page number
+            page_size: Page size
+            prefetch: Number of pages fetched concurrently
+
+        Yields:
+            Lists of raw records, in page order
+        """
+        async def fetch_page(page_number: int) -> PageResult:
+            response = await self.client.get(
+                endpoint,
+                params={**params, "page": page_number, "pageSize": page_size}
+            )
+            response.raise_for_status()
+
+            records = response.json()
+
+            # ConnectWise sends a Link header with rel="next" while more pages
+            # exist; fall back to the page counter when it is absent
+            if "link" in response.headers:
+                has_more = "next" in response.links
+            else:
+                has_more = len(records) >= page_size
+
+            return PageResult(items=records, has_more=has_more)
+
+        async for records in prefetch_pages(fetch_page, first_page=page, window=prefetch):
+            yield records
+
     async def notify(self, notification_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create or update a ticket in ConnectWise Manage.
@@ -167,6 +426,19 @@ class ConnectWiseManageProvider(BaseProvider):
             return {"success": False, "message": "Client not initialized"}
 
         try:
+            # Dispatch batches of operations to the batch pipeline
+            if "operations" in notification_params:
+                results = await self.notify_batch(
+                    notification_params["operations"],
+                    concurrency=notification_params.get("concurrency", self.BATCH_CONCURRENCY)
+                )
+                failed = sum(1 for result in results if not result.get("success"))
+                return {
+                    "success": failed == 0,
+                    "message": f"Processed {len(results)} operations, {failed} failed",
+                    "results": results
+                }
+
             # Check if we're creating or updating
             ticket_id = notification_params.get("ticket_id")
 
@@ -180,6 +452,59 @@ class ConnectWiseManageProvider(BaseProvider):
             logger.error(f"Error in ConnectWise Manage notify operation: {e}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
+    async def notify_batch(self, operations: List[Dict[str, Any]], concurrency: int = BATCH_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Run a batch of ticket operations in ConnectWise Manage.
+
+        Operations run concurrently over the shared HTTP client, bounded by a
+        semaphore. Requests rejected with 429 are retried by the client's
+        transport, and a failing operation does not abort the rest of the batch.
+
+        Args:
+            operations: List of operation dictionaries
+                - operation: create, update or note (default: update if
+                  ticket_id is set, otherwise create)
+                - ticket_id: ID of the ticket (for update and note)
+                - note_text: Text of the note (for note)
+                - internal: Whether the note is internal (for note)
+                - other keys as accepted by notify
+            concurrency: Maximum number of operations in flight
+
+        Returns:
+            One result per operation, in the order of the operations
+        """
+        if not self.client:
+            logger.error("ConnectWise Manage client not initialized")
+            return [{"success": False, "message": "Client not initialized"} for _ in operations]
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+            ticket_id = operation.get("ticket_id")
+            operation_type = operation.get("operation") or ("update" if ticket_id else "create")
+
+            try:
+                async with semaphore:
+                    if operation_type == "create":
+                        result = await self._create_ticket(operation)
+                    elif operation_type == "update" and ticket_id:
+                        result = await self._update_ticket(ticket_id, operation)
+                    elif operation_type == "note" and ticket_id:
+                        result = await self._add_ticket_note(
+                            ticket_id,
+                            operation.get("note_text", ""),
+                            internal=operation.get("internal", False)
+                        )
+                    else:
+                        result = {"success": False, "message": f"Unsupported operation: {operation_type} or missing ticket_id"}
+            except Exception as e:
+                logger.error(f"Error in ConnectWise Manage batch operation {index}: {e}")
+                result = {"success": False, "message": f"Error: {str(e)}"}
+
+            return {"index": index, "operation": operation_type, **result}
+
+        return list(await asyncio.gather(*(run(index, operation) for index, operation in enumerate(operations))))
+
     async def _create_ticket(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new ticket in ConnectWise Manage.
@@ -312,7 +637,8 @@ class ConnectWiseManageProvider(BaseProvider):
             "note": created_note
         }
 
-    def _transform_ticket_to_alert(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _transform_ticket_to_alert(ticket: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform a ConnectWise Manage ticket to a Keep alert format.
 
@@ -362,6 +688,29 @@ class ConnectWiseManageProvider(BaseProvider):
             "raw_data": ticket
         }
 
+    def _build_conditions(self, conditions: List[Dict[str, Any]]) -> str:
+        """
+        Build a ConnectWise Manage conditions string.
+
+        Args:
+            conditions: List of condition dictionaries with field, operator and value
+
+        Returns:
+            Conditions joined with AND, or an empty string if there are none
+        """
+        condition_strings = []
+        for condition in conditions or []:
+            field = condition.get("field")
+            operator = condition.get("operator", "equals")
+            value = condition.get("value")
+
+            if field and value is not None:
+                # Map operator to ConnectWise format
+                cw_operator = self._map_operator(operator)
+                condition_strings.append(f"{field} {cw_operator} {self._format_value(value)}")
+
+        return " AND ".join(condition_strings)
+
     def _map_operator(self, operator: str) -> str:
         """
         Map a standard operator to ConnectWise Manage format.
@@ -401,6 +750,11 @@ class ConnectWiseManageProvider(BaseProvider):
         """
         if isinstance(value, str):
             return f"'{value}'"
+        elif isinstance(value, datetime):
+            # ConnectWise expects date values in square brackets, in UTC
+            if value.tzinfo:
+                value = value.astimezone(timezone.utc)
+            return f"[{value.strftime('%Y-%m-%dT%H:%M:%SZ')}]"
         elif isinstance(value, bool):
             return str(value).lower()
         elif isinstance(value, (int, float)):
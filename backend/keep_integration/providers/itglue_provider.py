@@ -5,16 +5,22 @@ This module implements a Keep.dev provider for IT Glue,
 allowing Keep to interact with IT Glue documentation and assets.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import logging
-import httpx
 from datetime import datetime
 
 from keep.providers.base.base_provider import BaseProvider
 from keep.providers.models.provider_config import ProviderConfig
 
+from keep_integration.cache import MISSING, LRUCache
+from keep_integration.pagination import PageResult, prefetch_pages
+from keep_integration.transport import create_client
+
 logger = logging.getLogger(__name__)
 
+# Organization name search results, shared by all IT Glue provider instances
+_organization_cache = LRUCache(maxsize=4096, ttl=3600, negative_ttl=300)
+
 class ITGlueProvider(BaseProvider):
     """
     IT Glue provider for Keep.dev.
@@ -49,13 +55,13 @@ class ITGlueProvider(BaseProvider):
                 return
 
             # Initialize HTTP client with authentication headers
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
+            self.client = create_client(
+                "itglue",
+                self.base_url,
                 headers={
                     "x-api-key": self.api_key,
                     "Content-Type": "application/vnd.api+json"
-                },
-                timeout=30.0
+                }
             )
             logger.info(f"IT Glue client initialized")
         except Exception as e:
@@ -72,6 +78,7 @@ class ITGlueProvider(BaseProvider):
                 - filters: Dictionary of filters
                 - page: Page number (default: 1)
                 - page_size: Page size (default: 50)
+                - include: Optional related resources to sideload (list or comma-separated string)
                 - organization_id: Optional organization ID for scoped resources
                 - client_id: Optional MSPAlwaysOn client ID to map to IT Glue organization
 
@@ -83,71 +90,158 @@ class ITGlueProvider(BaseProvider):
             return []
 
         try:
-            # Extract query parameters
             resource_type = query_params.get("resource_type", "organizations")
-            filters = query_params.get("filters", {})
-            page = query_params.get("page", 1)
-            page_size = query_params.get("page_size", 50)
-            organization_id = query_params.get("organization_id")
-            client_id = query_params.get("client_id")
-
-            # If client_id is provided but organization_id is not, map client to organization
-            if client_id and not organization_id:
-                org_mapping = await self._get_organization_by_client_id(client_id)
-                if org_mapping and "organization_id" in org_mapping:
-                    organization_id = org_mapping["organization_id"]
-
-            # Build query parameters
-            params = {
-                "page[number]": page,
-                "page[size]": page_size
-            }
-
-            # Add filters if provided
-            if filters:
-                for key, value in filters.items():
-                    params[f"filter[{key}]"] = value
-
-            # Determine endpoint based on resource type
-            if resource_type == "organizations":
-                endpoint = "/organizations"
-            elif resource_type == "configurations":
-                if organization_id:
-                    endpoint = f"/organizations/{organization_id}/configurations"
-                else:
-                    endpoint = "/configurations"
-            elif resource_type == "passwords":
-                if organization_id:
-                    endpoint = f"/organizations/{organization_id}/passwords"
-                else:
-                    endpoint = "/passwords"
-            elif resource_type == "documents":
-                if organization_id:
-                    endpoint = f"/organizations/{organization_id}/documents"
-                else:
-                    endpoint = "/documents"
-            elif resource_type == "contacts":
-                if organization_id:
-                    endpoint = f"/organizations/{organization_id}/contacts"
-                else:
-                    endpoint = "/contacts"
-            else:
+            endpoint = await self._get_query_endpoint(query_params)
+            if not endpoint:
                 logger.error(f"Unsupported resource type: {resource_type}")
                 return []
 
+            params = self._build_query_params(query_params)
+            params["page[number]"] = query_params.get("page", 1)
+            params["page[size]"] = query_params.get("page_size", 50)
+
             # Make API request
             response = await self.client.get(endpoint, params=params)
             response.raise_for_status()
 
             # Parse response
-            data = response.json().get("data", [])
+            body = response.json()
+            included = self._index_included(body.get("included", []))
 
             # Transform data to a more usable format
-            return [self._transform_resource(item, resource_type) for item in data]
+            return [self._transform_resource(item, resource_type, included) for item in body.get("data", [])]
         except Exception as e:
             logger.error(f"Error querying IT Glue: {e}")
             return []
 
+    async def query_stream(self, query_params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all pages of an IT Glue query.
+
+        Reads meta.total-pages from the first page, then fetches the remaining
+        pages concurrently within a bounded window (the shared transport keeps
+        requests under the IT Glue rate limit) and yields resources in order.
+        Related resources requested with include are resolved in the same pass.
+
+        Args:
+            query_params: Parameters for the query
+                - resource_type: Type of resource (organizations, configurations, documents, etc.)
+                - filters: Dictionary of filters
+                - page_size: Page size (default: 1000, the IT Glue maximum)
+                - prefetch: Number of pages fetched concurrently (default: 4)
+                - include: Optional related resources to sideload (list or comma-separated string)
+                - organization_id: Optional organization ID for scoped resources
+                - client_id: Optional MSPAlwaysOn client ID to map to IT Glue organization
+
+        Yields:
+            Transformed resources
+        """
+        if not self.client:
+            logger.error("IT Glue client not initialized")
+            return
+
+        resource_type = query_params.get("resource_type", "organizations")
+
+        try:
+            endpoint = await self._get_query_endpoint(query_params)
+            if not endpoint:
+                logger.error(f"Unsupported resource type: {resource_type}")
+                return
+
+            params = self._build_query_params(query_params)
+            page_size = query_params.get("page_size", 1000)
+
+            async def fetch_page(page_number: int) -> PageResult:
+                response = await self.client.get(
+                    endpoint,
+                    params={**params, "page[number]": page_number, "page[size]": page_size}
+                )
+                response.raise_for_status()
+
+                body = response.json()
+                included = self._index_included(body.get("included", []))
+                resources = [self._transform_resource(item, resource_type, included) for item in body.get("data", [])]
+
+                total_pages = (body.get("meta") or {}).get("total-pages")
+                if total_pages is not None:
+                    has_more = page_number < total_pages
+                else:
+                    has_more = bool((body.get("links") or {}).get("next"))
+
+                return PageResult(items=resources, has_more=has_more, total_pages=total_pages)
+
+            async for resources in prefetch_pages(fetch_page, window=query_params.get("prefetch", 4)):
+                for resource in resources:
+                    yield resource
+        except Exception as e:
+            logger.error(f"Error streaming IT Glue {resource_type}: {e}")
+
+    async def _get_query_endpoint(self, query_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the collection endpoint for a query.
+
+        Args:
+            query_params: Parameters for the query
+
+        Returns:
+            Collection endpoint, or None if the resource type is not supported
+        """
+        resource_type = query_params.get("resource_type", "organizations")
+        organization_id = query_params.get("organization_id")
+        client_id = query_params.get("client_id")
+
+        # If client_id is provided but organization_id is not, map client to organization
+        if client_id and not organization_id:
+            org_mapping = await self._get_organization_by_client_id(client_id)
+            if org_mapping and "organization_id" in org_mapping:
+                organization_id = org_mapping["organization_id"]
+
+        # Determine endpoint based on resource type
+        if resource_type == "organizations":
+            return "/organizations"
+        elif resource_type in ("configurations", "passwords", "documents", "contacts"):
+            if organization_id:
+                return f"/organizations/{organization_id}/{resource_type}"
+            return f"/{resource_type}"
+        return None
+
+    def _build_query_params(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build IT Glue request parameters for a query, without paging.
+
+        Args:
+            query_params: Parameters for the query
+
+        Returns:
+            Request parameters
+        """
+        params = {}
+
+        # Add filters if provided
+        filters = query_params.get("filters", {})
+        if filters:
+            for key, value in filters.items():
+                params[f"filter[{key}]"] = value
+
+        # Add related resources to sideload if requested
+        include = query_params.get("include")
+        if include:
+            params["include"] = include if isinstance(include, str) else ",".join(include)
+
+        return params
+
+    def _index_included(self, included: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Index sideloaded JSON:API resources.
+
+        Args:
+            included: The included array of a JSON:API response
+
+        Returns:
+            Included resources keyed by (type, id)
+        """
+        return {(item.get("type"), str(item.get("id"))): item for item in included}
+
     async def notify(self, notification_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create or update IT Glue resources.
@@ -295,6 +389,10 @@ class ITGlueProvider(BaseProvider):
         Get IT Glue organization ID by MSPAlwaysOn client ID.
 
         This method maps an MSPAlwaysOn client ID to an IT Glue organization ID.
+        Organizations found by name are persisted to the client's metadata,
+        together with the client name searched for, and cleared once the
+        client is renamed. Recent searches (including misses) are kept in an
+        in-process cache.
 
         Args:
             client_id: MSPAlwaysOn client ID
@@ -303,25 +401,10 @@ class ITGlueProvider(BaseProvider):
             Dictionary with organization_id and other mapping information
         """
         try:
-            # Query the database for client information
-            from sqlalchemy.ext.asyncio import AsyncSession
-            from sqlalchemy.future import select
-            from app.db.base_class import get_db
-            from app.models.client import Client
-
-            # Get database session
-            db_session = None
-            async for session in get_db():
-                db_session = session
-                break
-
-            if not db_session:
-                logger.error("Failed to get database session")
-                return {}
+            # Look up the client in the shared client mapping service
+            from app.services.client_mapping import client_mapping_service
 
-            # Query client by ID
-            result = await db_session.execute(select(Client).where(Client.id == int(client_id)))
-            client = result.scalars().first()
+            client = await client_mapping_service.get_client(client_id)
 
             if not client:
                 logger.error(f"Client with ID {client_id} not found")
@@ -340,6 +423,33 @@ class ITGlueProvider(BaseProvider):
                     "direct_mapping": True
                 }
 
+            # Use the organization resolved by a previous name search, if persisted
+            organization_id = client.metadata.get("itglue_organization_id")
+            resolved_name = client.metadata.get("itglue_organization_client_name")
+            if organization_id and resolved_name is not None and resolved_name != client_name:
+                # The client was renamed since the search; search again under the new name
+                await client_mapping_service.update_metadata(client_id, {
+                    "itglue_organization_id": None,
+                    "itglue_organization_name": None,
+                    "itglue_organization_client_name": None
+                })
+                organization_id = None
+
+            if organization_id:
+                return {
+                    "client_id": client_id,
+                    "client_name": client_name,
+                    "organization_id": organization_id,
+                    "organization_name": client.metadata.get("itglue_organization_name"),
+                    "direct_mapping": True
+                }
+
+            # Reuse recent name search results, including searches that found nothing
+            cache_key = (self.provider_id, str(client_id), client_name)
+            cached = _organization_cache.get(cache_key)
+            if cached is not MISSING:
+                return cached
+
             # Search for organizations with matching name
             params = {
                 "filter[name]": client_name,
@@ -351,36 +461,51 @@ class ITGlueProvider(BaseProvider):
 
             data = response.json().get("data", [])
 
-            if not data:
-                logger.warning(f"No IT Glue organization found for client ID {client_id}")
-                return {}
-
             # Get the first matching organization
-            organization = data[0]
+            organization = data[0] if data else {}
             organization_id = organization.get("id")
 
             if not organization_id:
-                logger.warning(f"No valid organization ID found for client ID {client_id}")
+                logger.warning(f"No IT Glue organization found for client ID {client_id}")
+                _organization_cache.set(cache_key, {}, negative=True)
                 return {}
 
+            organization_name = organization.get("attributes", {}).get("name")
+
+            # Persist the resolved organization so later lookups skip the search
+            await client_mapping_service.update_metadata(client_id, {
+                "itglue_organization_id": organization_id,
+                "itglue_organization_name": organization_name,
+                "itglue_organization_client_name": client_name
+            })
+
             # Return the mapping
-            return {
+            mapping = {
                 "client_id": client_id,
                 "client_name": client_name,
                 "organization_id": organization_id,
-                "organization_name": organization.get("attributes", {}).get("name")
+                "organization_name": organization_name
             }
+            _organization_cache.set(cache_key, mapping)
+            return mapping
         except Exception as e:
             logger.error(f"Error mapping client to IT Glue organization: {e}")
             return {}
 
-    def _transform_resource(self, resource: Dict[str, Any], resource_type: str) -> Dict[str, Any]:
+    def _transform_resource(
+        self,
+        resource: Dict[str, Any],
+        resource_type: str,
+        included: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
         """
         Transform an IT Glue resource to a more usable format.
 
         Args:
             resource: IT Glue resource
             resource_type: Type of resource
+            included: Optional sideloaded resources keyed by (type, id); related
+                resources found there are embedded in the relationships
 
         Returns:
             Transformed resource
@@ -407,8 +532,30 @@ class ITGlueProvider(BaseProvider):
                 if "data" in rel_data:
                     rel_data = rel_data.get("data")
                     if isinstance(rel_data, list):
-                        transformed["relationships"][rel_name] = [{"id": item.get("id"), "type": item.get("type")} for item in rel_data]
+                        transformed["relationships"][rel_name] = [self._resolve_relationship(item, included) for item in rel_data]
                     elif rel_data:
-                        transformed["relationships"][rel_name] = {"id": rel_data.get("id"), "type": rel_data.get("type")}
+                        transformed["relationships"][rel_name] = self._resolve_relationship(rel_data, included)
 
         return transformed
+
+    def _resolve_relationship(
+        self,
+        reference: Dict[str, Any],
+        included: Optional[Dict[Tuple[str, str], Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Resolve a JSON:API relationship reference.
+
+        Args:
+            reference: Resource identifier with id and type
+            included: Sideloaded resources keyed by (type, id)
+
+        Returns:
+            The transformed related resource if it was sideloaded, otherwise the id and type
+        """
+        related = included.get((reference.get("type"), str(reference.get("id")))) if included else None
+        if related is None:
+            return {"id": reference.get("id"), "type": reference.get("type")}
+
+        # Related resources are embedded one level deep to avoid cycles
+        return self._transform_resource(related, related.get("type"))
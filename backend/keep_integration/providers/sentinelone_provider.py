@@ -5,16 +5,152 @@ This module implements a Keep.dev provider for SentinelOne,
 allowing Keep to interact with SentinelOne threats and endpoints.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 import logging
+import re
+import time
 import httpx
 from datetime import datetime, timedelta
 
 from keep.providers.base.base_provider import BaseProvider
 from keep.providers.models.provider_config import ProviderConfig
 
+from keep_integration.transport import create_client
+
 logger = logging.getLogger(__name__)
 
+class SentinelOneSiteIndex:
+    """
+    In-memory index of SentinelOne sites.
+
+    Sites are indexed by ID and by normalized name. The index is loaded once
+    and then refreshed in the background when it is older than its TTL, while
+    lookups keep being served from the previous snapshot.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, account_id: Optional[str], ttl: float = 300):
+        """
+        Initialize the site index.
+
+        Args:
+            client: SentinelOne HTTP client
+            account_id: SentinelOne account ID
+            ttl: Seconds before the index is refreshed
+        """
+        self.client = client
+        self.account_id = account_id
+        self.ttl = ttl
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def ensure_loaded(self):
+        """Load the index on first use and schedule a refresh when it is stale."""
+        if self.loaded_at is None:
+            async with self._lock:
+                if self.loaded_at is None:
+                    await self.refresh()
+        elif time.monotonic() - self.loaded_at > self.ttl:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.ensure_future(self._refresh_in_background())
+
+    async def refresh(self):
+        """Download all sites for the account and rebuild the index."""
+        by_id = {}
+        by_name = {}
+        params = {"limit": 1000}
+        if self.account_id:
+            params["accountIds"] = self.account_id
+
+        while True:
+            response = await self.client.get("/v2/sites", params=params)
+            response.raise_for_status()
+
+            data = response.json()
+            for site in data.get("data", {}).get("sites", []):
+                by_id[str(site.get("id"))] = site
+                by_name.setdefault(self.normalize_name(site.get("name", "")), []).append(site)
+
+            next_cursor = (data.get("pagination") or {}).get("nextCursor")
+            if not next_cursor:
+                break
+            params["cursor"] = next_cursor
+
+        # Swap in the new snapshot in one step so readers never see a partial index
+        self.by_id, self.by_name = by_id, by_name
+        self.loaded_at = time.monotonic()
+        self.version += 1
+        logger.info(f"SentinelOne site index refreshed with {len(by_id)} sites")
+
+    async def _refresh_in_background(self):
+        """Refresh the index, keeping the previous snapshot on failure."""
+        try:
+            async with self._lock:
+                await self.refresh()
+        except Exception as e:
+            logger.warning(f"Error refreshing SentinelOne site index: {e}")
+
+    def invalidate(self):
+        """Force a reload on the next lookup."""
+        self.loaded_at = None
+
+    def get_site(self, site_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a site by ID.
+
+        Args:
+            site_id: SentinelOne site ID
+
+        Returns:
+            Site, or None if it is not in the index
+        """
+        return self.by_id.get(str(site_id))
+
+    def find_by_name(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Find the sites matching a client name.
+
+        Exact normalized matches are served from the name index. Otherwise the
+        sites whose normalized name contains the client name are returned.
+
+        Args:
+            name: Client name
+
+        Returns:
+            Matching sites
+        """
+        normalized = self.normalize_name(name)
+        if not normalized:
+            return []
+
+        if normalized in self.by_name:
+            return list(self.by_name[normalized])
+
+        return [
+            site
+            for site_name, sites in self.by_name.items()
+            if normalized in site_name
+            for site in sites
+        ]
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """
+        Normalize a name for matching.
+
+        Args:
+            name: Site or client name
+
+        Returns:
+            Lowercase name with punctuation collapsed to single spaces
+        """
+        return re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+
 class SentinelOneProvider(BaseProvider):
     """
     SentinelOne provider for Keep.dev.
@@ -31,9 +167,27 @@ class SentinelOneProvider(BaseProvider):
     PROVIDER_DESCRIPTION = "SentinelOne is an endpoint protection platform that uses AI to prevent, detect, and respond to threats."
     FINGERPRINT_FIELDS = ["id", "threatInfo.threatName"]
 
+    # Seconds before the cached site index is refreshed in the background
+    SITE_INDEX_TTL = 300
+
+    # Threat enrichment batch size and timeline fan-out
+    ENRICHMENT_BATCH_SIZE = 100
+    ENRICHMENT_TIMELINE_CONCURRENCY = 10
+
+    # Endpoints by query type; items are returned under data.<query type>
+    QUERY_ENDPOINTS = {
+        "threats": "/v2/threats",
+        "agents": "/v2/agents",
+        "activities": "/v2/activities",
+        "groups": "/v2/groups",
+        "sites": "/v2/sites"
+    }
+
     def __init__(self, provider_id, config):
         super().__init__(provider_id, config)
         self.client = None
+        self._site_index = None
+        self._site_mappings = {}
         self._init_client()
 
     def _init_client(self):
@@ -50,13 +204,13 @@ class SentinelOneProvider(BaseProvider):
                 return
 
             # Initialize HTTP client with authentication headers
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
+            self.client = create_client(
+                "sentinelone",
+                self.base_url,
                 headers={
                     "Authorization": f"ApiToken {self.api_token}",
                     "Content-Type": "application/json"
-                },
-                timeout=30.0
+                }
             )
             logger.info(f"SentinelOne client initialized")
         except Exception as e:
@@ -78,87 +232,191 @@ class SentinelOneProvider(BaseProvider):
         Returns:
             List of threats matching the query
         """
+        items, _ = await self.query_page(query_params)
+        return items
+
+    async def query_page(self, query_params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Query a single page from SentinelOne.
+
+        Args:
+            query_params: Parameters for the query, as for query()
+
+        Returns:
+            Tuple of (items, cursor of the next page or None on the last page)
+        """
         if not self.client:
             logger.error("SentinelOne client not initialized")
-            return []
+            return [], None
 
         try:
-            # Extract query parameters
             query_type = query_params.get("query_type", "threats")
-            filters = query_params.get("filters", {})
-            limit = query_params.get("limit", 25)
-            cursor = query_params.get("cursor")
-            client_id = query_params.get("client_id")
-
-            # If client_id is provided, get the site IDs for this client
-            site_ids = []
-            if client_id:
-                site_mapping = await self._get_client_site_mapping(client_id)
-                if site_mapping and "site_ids" in site_mapping:
-                    site_ids = site_mapping["site_ids"]
-
-            # Build query parameters
-            params = {
-                "limit": limit,
-                "accountIds": self.account_id
-            }
+            if query_type not in self.QUERY_ENDPOINTS:
+                logger.error(f"Unsupported query type: {query_type}")
+                return [], None
 
-            # Add site IDs filter if available
-            if site_ids:
-                params["siteIds"] = ",".join(site_ids)
+            params = await self._build_query_params(query_params, default_limit=25)
 
             # Add cursor if provided
+            cursor = query_params.get("cursor")
             if cursor:
                 params["cursor"] = cursor
 
-            # Add filters if provided
-            if filters:
-                for key, value in filters.items():
-                    params[key] = value
-
-            # Determine endpoint based on query type
-            if query_type == "threats":
-                endpoint = "/v2/threats"
-            elif query_type == "agents":
-                endpoint = "/v2/agents"
-            elif query_type == "activities":
-                endpoint = "/v2/activities"
-            elif query_type == "groups":
-                endpoint = "/v2/groups"
-            elif query_type == "sites":
-                endpoint = "/v2/sites"
-            else:
-                logger.error(f"Unsupported query type: {query_type}")
-                return []
+            items, next_cursor = await self._fetch_page(query_type, params)
 
-            # Make API request
-            response = await self.client.get(endpoint, params=params)
-            response.raise_for_status()
+            return [self._transform_item(query_type, item) for item in items], next_cursor
+        except Exception as e:
+            logger.error(f"Error querying SentinelOne: {e}")
+            return [], None
 
-            # Parse response
-            data = response.json()
+    async def query_stream(self, query_params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all results of a query from SentinelOne.
 
-            # Extract items based on query type
-            if query_type == "threats":
-                items = data.get("data", {}).get("threats", [])
-                return [self._transform_threat_to_alert(threat) for threat in items]
-            elif query_type == "agents":
-                items = data.get("data", {}).get("agents", [])
-                return items
-            elif query_type == "activities":
-                items = data.get("data", {}).get("activities", [])
-                return items
-            elif query_type == "groups":
-                items = data.get("data", {}).get("groups", [])
-                return items
-            elif query_type == "sites":
-                items = data.get("data", {}).get("sites", [])
-                return items
+        Follows pagination.nextCursor until it is exhausted, fetching the next
+        page while the current one is being consumed.
 
-            return []
+        Args:
+            query_params: Parameters for the query
+                - query_type: Type of query (threats, agents, activities, groups, sites)
+                - filters: Dictionary of filters
+                - limit: Page size (default: 100, maximum: 1000)
+                - cursor: Pagination cursor to resume from
+                - client_id: Optional client ID to filter by site
+                - created_after: Only return items created after this datetime or ISO timestamp
+                - max_items: Optional maximum number of items to yield
+                - raise_errors: Raise request errors instead of logging them and ending the stream
+
+        Yields:
+            Threats transformed to Keep alerts, or raw items for other query types
+
+        Raises:
+            Exception: If a request fails and raise_errors is set
+        """
+        if not self.client:
+            logger.error("SentinelOne client not initialized")
+            return
+
+        query_type = query_params.get("query_type", "threats")
+        if query_type not in self.QUERY_ENDPOINTS:
+            logger.error(f"Unsupported query type: {query_type}")
+            return
+
+        max_items = query_params.get("max_items")
+        next_page = None
+
+        try:
+            params = await self._build_query_params(query_params, default_limit=100)
+            params["limit"] = min(int(params["limit"]), 1000)
+
+            created_after = query_params.get("created_after")
+            if created_after:
+                if isinstance(created_after, datetime):
+                    created_after = created_after.isoformat()
+                params["createdAt__gt"] = created_after
+
+            cursor = query_params.get("cursor")
+            if cursor:
+                params["cursor"] = cursor
+
+            yielded = 0
+            next_page = asyncio.ensure_future(self._fetch_page(query_type, dict(params)))
+
+            while next_page is not None:
+                items, cursor = await next_page
+                next_page = None
+
+                # Fetch the next page while this one is consumed
+                if cursor and (max_items is None or yielded + len(items) < max_items):
+                    params["cursor"] = cursor
+                    next_page = asyncio.ensure_future(self._fetch_page(query_type, dict(params)))
+
+                for item in items:
+                    if max_items is not None and yielded >= max_items:
+                        return
+                    yield self._transform_item(query_type, item)
+                    yielded += 1
         except Exception as e:
-            logger.error(f"Error querying SentinelOne: {e}")
-            return []
+            if query_params.get("raise_errors"):
+                raise
+            logger.error(f"Error streaming SentinelOne {query_type}: {e}")
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def _build_query_params(self, query_params: Dict[str, Any], default_limit: int) -> Dict[str, Any]:
+        """
+        Build SentinelOne request parameters for a query.
+
+        Args:
+            query_params: Parameters for the query
+            default_limit: Page size used when no limit is given
+
+        Returns:
+            Request parameters without a cursor
+        """
+        filters = query_params.get("filters", {})
+        client_id = query_params.get("client_id")
+
+        # If client_id is provided, get the site IDs for this client
+        site_ids = []
+        if client_id:
+            site_mapping = await self._get_client_site_mapping(client_id)
+            if site_mapping and "site_ids" in site_mapping:
+                site_ids = site_mapping["site_ids"]
+
+        # Build query parameters
+        params = {
+            "limit": query_params.get("limit", default_limit),
+            "accountIds": self.account_id
+        }
+
+        # Add site IDs filter if available
+        if site_ids:
+            params["siteIds"] = ",".join(site_ids)
+
+        # Add filters if provided
+        if filters:
+            for key, value in filters.items():
+                params[key] = value
+
+        return params
+
+    async def _fetch_page(self, query_type: str, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch a single page of a query.
+
+        Args:
+            query_type: Type of query
+            params: Request parameters, including the cursor if any
+
+        Returns:
+            Raw items of the page and the cursor of the next page, if any
+        """
+        response = await self.client.get(self.QUERY_ENDPOINTS[query_type], params=params)
+        response.raise_for_status()
+
+        # Parse response
+        data = response.json()
+        items = data.get("data", {}).get(query_type, [])
+        next_cursor = (data.get("pagination") or {}).get("nextCursor")
+
+        return items, next_cursor
+
+    def _transform_item(self, query_type: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Transform a query result item.
+
+        Args:
+            query_type: Type of query
+            item: Raw SentinelOne item
+
+        Returns:
+            Keep alert for threats, otherwise the raw item
+        """
+        if query_type == "threats":
+            return self._transform_threat_to_alert(item)
+        return item
 
     async def notify(self, notification_params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -167,8 +425,9 @@ class SentinelOneProvider(BaseProvider):
         Args:
             notification_params: Parameters for the action
                 - action: Action to perform (isolate, reconnect, mitigate, etc.)
-                - agent_ids: List of agent IDs (for agent actions)
+                - agent_ids: List of agent IDs (for agent actions and get_endpoint_by_threat_id)
                 - threat_ids: List of threat IDs (for threat actions)
+                - include_timeline: Whether to fetch timelines (for enrich_threats)
 
         Returns:
             Result of the action
@@ -194,9 +453,14 @@ class SentinelOneProvider(BaseProvider):
             elif action == "mitigate" and threat_ids:
                 return await self._mitigate_threats(threat_ids)
             elif action == "get_endpoint_by_threat_id" and threat_ids:
-                return await self._get_endpoint_by_threat_id(threat_ids[0])
+                return await self._get_endpoint_by_threat_id(threat_ids[0], agent_ids[0] if agent_ids else None)
             elif action == "get_threat_details" and threat_ids:
                 return await self._get_threat_details(threat_ids[0])
+            elif action == "enrich_threats" and threat_ids:
+                return await self.enrich_threats(
+                    threat_ids,
+                    include_timeline=notification_params.get("include_timeline", True)
+                )
             else:
                 return {"success": False, "message": f"Unsupported action: {action}"}
         except Exception as e:
@@ -306,50 +570,10 @@ class SentinelOneProvider(BaseProvider):
 
             threat_data = response.json().get("data", {})
 
-            # Get additional threat information
-            threat_info = threat_data.get("threatInfo", {})
-            indicators = []
-
-            # Get indicators of compromise if available
-            if "indicators" in threat_data:
-                indicators = threat_data.get("indicators", [])
-
             # Get timeline events if available
-            timeline = []
-            timeline_endpoint = f"/v2/threats/{threat_id}/timeline"
-            try:
-                timeline_response = await self.client.get(timeline_endpoint)
-                if timeline_response.status_code == 200:
-                    timeline_data = timeline_response.json()
-                    timeline = timeline_data.get("data", {}).get("timeline", [])
-            except Exception as e:
-                logger.warning(f"Error getting threat timeline: {e}")
+            timeline = await self._get_threat_timeline(threat_id)
 
-            return {
-                "success": True,
-                "message": "Threat details retrieved successfully",
-                "threat_id": threat_id,
-                "name": threat_info.get("threatName"),
-                "classification": threat_info.get("classification"),
-                "confidence_level": threat_info.get("confidenceLevel"),
-                "severity": threat_info.get("severity"),
-                "status": "Resolved" if threat_data.get("resolved") else "Active",
-                "mitigated": threat_data.get("mitigationStatus") == "mitigated",
-                "agent_details": {
-                    "id": threat_data.get("agentId"),
-                    "computer_name": threat_data.get("agentComputerName"),
-                    "os": threat_data.get("agentOsType")
-                },
-                "site": {
-                    "id": threat_data.get("siteId"),
-                    "name": threat_data.get("siteName")
-                },
-                "indicators": indicators,
-                "timeline": timeline,
-                "created_at": threat_data.get("createdAt"),
-                "updated_at": threat_data.get("updatedAt"),
-                "raw_data": threat_data
-            }
+            return self._format_threat_details(threat_id, threat_data, timeline)
         except Exception as e:
             logger.error(f"Error getting threat details: {e}")
             return {
@@ -357,39 +581,113 @@ class SentinelOneProvider(BaseProvider):
                 "message": f"Error getting threat details: {str(e)}"
             }
 
-    async def _get_endpoint_by_threat_id(self, threat_id: str) -> Dict[str, Any]:
+    async def _get_threat_timeline(self, threat_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the timeline events of a threat.
+
+        Args:
+            threat_id: ID of the threat
+
+        Returns:
+            Timeline events, or an empty list if they are unavailable
+        """
+        timeline_endpoint = f"/v2/threats/{threat_id}/timeline"
+        try:
+            timeline_response = await self.client.get(timeline_endpoint)
+            if timeline_response.status_code == 200:
+                timeline_data = timeline_response.json()
+                return timeline_data.get("data", {}).get("timeline", [])
+        except Exception as e:
+            logger.warning(f"Error getting threat timeline: {e}")
+        return []
+
+    def _format_threat_details(self, threat_id: str, threat_data: Dict[str, Any], timeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Format threat details for workflows.
+
+        Args:
+            threat_id: ID of the threat
+            threat_data: Raw SentinelOne threat
+            timeline: Timeline events of the threat
+
+        Returns:
+            Detailed threat information
+        """
+        # Get additional threat information
+        threat_info = threat_data.get("threatInfo", {})
+
+        # Get indicators of compromise if available
+        indicators = threat_data.get("indicators", [])
+
+        return {
+            "success": True,
+            "message": "Threat details retrieved successfully",
+            "threat_id": threat_id,
+            "name": threat_info.get("threatName"),
+            "classification": threat_info.get("classification"),
+            "confidence_level": threat_info.get("confidenceLevel"),
+            "severity": threat_info.get("severity"),
+            "status": "Resolved" if threat_data.get("resolved") else "Active",
+            "mitigated": threat_data.get("mitigationStatus") == "mitigated",
+            "agent_details": {
+                "id": threat_data.get("agentId"),
+                "computer_name": threat_data.get("agentComputerName"),
+                "os": threat_data.get("agentOsType")
+            },
+            "site": {
+                "id": threat_data.get("siteId"),
+                "name": threat_data.get("siteName")
+            },
+            "indicators": indicators,
+            "timeline": timeline,
+            "created_at": threat_data.get("createdAt"),
+            "updated_at": threat_data.get("updatedAt"),
+            "raw_data": threat_data
+        }
+
+    async def _get_endpoint_by_threat_id(self, threat_id: str, agent_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get endpoint details by threat ID.
 
+        The endpoint is looked up through the batched agent fetch. When the
+        caller already holds the threat's agent ID, such as from the alert
+        annotations, the threat is not fetched again.
+
         Args:
             threat_id: ID of the threat
+            agent_id: ID of the threat's agent, if already known
 
         Returns:
             Endpoint details
         """
-        # First, get the threat details
-        endpoint = f"/v2/threats/{threat_id}"
-
-        response = await self.client.get(endpoint)
-        response.raise_for_status()
+        if agent_id:
+            agents = await self._fetch_by_ids("agents", [str(agent_id)])
+            if str(agent_id) not in agents:
+                return {"success": False, "message": "Agent not found for threat"}
+            return self._format_endpoint_details(str(agent_id), agents[str(agent_id)])
 
-        threat_data = response.json().get("data", {})
-        agent_id = threat_data.get("agentId")
+        result = await self.enrich_threats([threat_id], include_timeline=False)
+        threat = result["threats"].get(str(threat_id))
 
-        if not agent_id:
+        if not threat:
             return {
                 "success": False,
-                "message": "Agent ID not found for threat"
+                "message": "Threat not found"
             }
 
-        # Now, get the agent details
-        endpoint = f"/v2/agents/{agent_id}"
+        return threat["endpoint"]
 
-        response = await self.client.get(endpoint)
-        response.raise_for_status()
+    def _format_endpoint_details(self, agent_id: str, agent_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format endpoint details for workflows.
 
-        agent_data = response.json().get("data", {})
+        Args:
+            agent_id: ID of the agent
+            agent_data: Raw SentinelOne agent
 
+        Returns:
+            Endpoint details
+        """
         return {
             "success": True,
             "message": "Endpoint details retrieved successfully",
@@ -406,12 +704,97 @@ class SentinelOneProvider(BaseProvider):
             "raw_data": agent_data
         }
 
+    async def enrich_threats(
+        self,
+        threat_ids: List[str],
+        include_timeline: bool = True,
+        timeline_concurrency: int = ENRICHMENT_TIMELINE_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """
+        Get threat and endpoint details for many threats at once.
+
+        Threats are fetched with ids-filtered list calls and their agents with
+        ids-filtered /v2/agents calls, in chunks of ENRICHMENT_BATCH_SIZE.
+        Timelines are fetched concurrently under a limit.
+
+        Args:
+            threat_ids: IDs of the threats
+            include_timeline: Whether to fetch threat timelines
+            timeline_concurrency: Maximum number of timeline requests in flight
+
+        Returns:
+            Threat details keyed by threat ID, each with an endpoint entry,
+            plus the IDs of threats that were not found
+        """
+        threat_ids = list(dict.fromkeys(str(threat_id) for threat_id in threat_ids))
+
+        threats = await self._fetch_by_ids("threats", threat_ids)
+        agent_ids = list(dict.fromkeys(
+            str(threat["agentId"]) for threat in threats.values() if threat.get("agentId")
+        ))
+
+        semaphore = asyncio.Semaphore(max(1, timeline_concurrency))
+
+        async def get_timeline(threat_id: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._get_threat_timeline(threat_id)
+
+        # Fetch agents and timelines in parallel
+        found_ids = list(threats)
+        timeline_requests = [get_timeline(threat_id) for threat_id in found_ids] if include_timeline else []
+        agents, *timelines = await asyncio.gather(self._fetch_by_ids("agents", agent_ids), *timeline_requests)
+
+        results = {}
+        for index, threat_id in enumerate(found_ids):
+            threat_data = threats[threat_id]
+            details = self._format_threat_details(threat_id, threat_data, timelines[index] if timelines else [])
+
+            agent_id = str(threat_data.get("agentId")) if threat_data.get("agentId") else None
+            if agent_id and agent_id in agents:
+                details["endpoint"] = self._format_endpoint_details(agent_id, agents[agent_id])
+            else:
+                details["endpoint"] = {"success": False, "message": "Agent not found for threat"}
+
+            results[threat_id] = details
+
+        missing = [threat_id for threat_id in threat_ids if threat_id not in threats]
+
+        return {
+            "success": not missing,
+            "message": f"Enriched {len(results)} threats" + (f", {len(missing)} not found" if missing else ""),
+            "threats": results,
+            "missing": missing
+        }
+
+    async def _fetch_by_ids(self, query_type: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch items by ID using ids-filtered list calls.
+
+        Args:
+            query_type: Type of query (threats or agents)
+            ids: IDs of the items
+
+        Returns:
+            Raw items keyed by ID
+        """
+        chunks = [ids[i:i + self.ENRICHMENT_BATCH_SIZE] for i in range(0, len(ids), self.ENRICHMENT_BATCH_SIZE)]
+
+        pages = await asyncio.gather(*(
+            self._fetch_page(query_type, {"ids": ",".join(chunk), "limit": len(chunk)})
+            for chunk in chunks
+        ))
+
+        return {str(item.get("id")): item for items, _ in pages for item in items}
+
     async def _get_client_site_mapping(self, client_id: str) -> Dict[str, Any]:
         """
         Get the mapping between a client ID and SentinelOne site IDs.
 
-        This method queries the database to find the mapping between
-        MSPAlwaysOn client IDs and SentinelOne site IDs.
+        This method uses the client mapping service to find the mapping between
+        MSPAlwaysOn client IDs and SentinelOne site IDs. Sites are resolved
+        against the cached site index, and the resulting mapping is memoized
+        until the index is refreshed or the client's sentinelone_sites
+        metadata changes.
 
         Args:
             client_id: MSPAlwaysOn client ID
@@ -420,76 +803,90 @@ class SentinelOneProvider(BaseProvider):
             Dictionary with site_ids list and other mapping information
         """
         try:
-            # Query sites endpoint to get all sites
-            sites_response = await self.client.get("/v2/sites", params={"accountIds": self.account_id})
-            sites_response.raise_for_status()
-
-            sites_data = sites_response.json()
-            sites = sites_data.get("data", {}).get("sites", [])
-
-            # For now, we'll use a simple mapping based on site name
-            # Query the database for client information
-            from sqlalchemy.ext.asyncio import AsyncSession
-            from sqlalchemy.future import select
-            from app.db.base_class import get_db
-            from app.models.client import Client
-
-            # Get database session
-            db_session = None
-            async for session in get_db():
-                db_session = session
-                break
-
-            if not db_session:
-                logger.error("Failed to get database session")
-                return {}
+            # Look up the client in the shared client mapping service
+            from app.services.client_mapping import client_mapping_service
 
-            # Query client by ID
-            result = await db_session.execute(select(Client).where(Client.id == int(client_id)))
-            client = result.scalars().first()
+            client = await client_mapping_service.get_client(client_id)
 
             if not client:
                 logger.error(f"Client with ID {client_id} not found")
                 return {}
 
-            # Get client name and metadata containing SentinelOne site IDs if available
-            client_name = client.name
-            metadata = client.metadata or {}
-            sentinelone_sites = metadata.get("sentinelone_sites", [])
-
-            # If we have direct site mappings in metadata, use them
-            if sentinelone_sites:
-                return {
-                    "client_id": client_id,
-                    "client_name": client_name,
-                    "site_ids": [site.get("id") for site in sentinelone_sites if "id" in site],
-                    "site_names": [site.get("name") for site in sentinelone_sites if "name" in site],
-                    "direct_mapping": True
-                }
+            return await self._resolve_client_sites(client_id, client.name, client.metadata)
+        except Exception as e:
+            logger.error(f"Error getting client-site mapping: {e}")
+            return {}
 
-            # Find sites that match the client name
-            matching_sites = []
-            for site in sites:
-                # In a real implementation, you would have a more robust mapping
-                if client_name.lower() in site.get("name", "").lower():
-                    matching_sites.append(site)
+    async def _resolve_client_sites(self, client_id: str, client_name: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resolve a client to SentinelOne sites using the site index.
 
-            if not matching_sites:
-                logger.warning(f"No SentinelOne sites found for client ID {client_id}")
-                return {}
+        Args:
+            client_id: MSPAlwaysOn client ID
+            client_name: Client name
+            metadata: Client metadata, possibly containing sentinelone_sites
 
-            # Return the mapping
-            return {
+        Returns:
+            Dictionary with site_ids list and other mapping information
+        """
+        sentinelone_sites = metadata.get("sentinelone_sites", [])
+
+        # Direct mappings do not depend on the site index
+        site_index = None if sentinelone_sites else await self._get_site_index()
+
+        # Reuse the previous mapping while neither the index nor the client's
+        # name and sentinelone_sites metadata changed
+        signature = (
+            client_name,
+            json.dumps(sentinelone_sites, sort_keys=True, default=str),
+            site_index.version if site_index else None
+        )
+        cached = self._site_mappings.get(client_id)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        # If we have direct site mappings in metadata, use them
+        if sentinelone_sites:
+            mapping = {
+                "client_id": client_id,
+                "client_name": client_name,
+                "site_ids": [site.get("id") for site in sentinelone_sites if "id" in site],
+                "site_names": [site.get("name") for site in sentinelone_sites if "name" in site],
+                "direct_mapping": True
+            }
+            self._site_mappings[client_id] = (signature, mapping)
+            return mapping
+
+        matching_sites = site_index.find_by_name(client_name)
+
+        if not matching_sites:
+            logger.warning(f"No SentinelOne sites found for client ID {client_id}")
+            mapping = {}
+        else:
+            mapping = {
                 "client_id": client_id,
                 "client_name": client_name,
                 "site_ids": [site.get("id") for site in matching_sites],
                 "site_names": [site.get("name") for site in matching_sites]
             }
-        except Exception as e:
-            logger.error(f"Error getting client-site mapping: {e}")
-            return {}
 
-    def _transform_threat_to_alert(self, threat: Dict[str, Any]) -> Dict[str, Any]:
+        self._site_mappings[client_id] = (signature, mapping)
+        return mapping
+
+    async def _get_site_index(self) -> "SentinelOneSiteIndex":
+        """
+        Get the site index, loading it on first use.
+
+        Returns:
+            Site index for this provider's account
+        """
+        if self._site_index is None:
+            self._site_index = SentinelOneSiteIndex(self.client, self.account_id, ttl=self.SITE_INDEX_TTL)
+        await self._site_index.ensure_loaded()
+        return self._site_index
+
+    @staticmethod
+    def _transform_threat_to_alert(threat: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform a SentinelOne threat to a Keep alert format.
 
@@ -511,6 +908,10 @@ class SentinelOneProvider(BaseProvider):
         # Get threat info
         threat_info = threat.get("threatInfo", {})
 
+        # Agent addresses identify hosts reported under another name
+        agent_ips = (threat.get("agentDetectionInfo") or {}).get("agentIpV4") or ""
+        interfaces = (threat.get("agentRealtimeInfo") or {}).get("networkInterfaces") or []
+
         # Map to Keep alert
         return {
             "id": str(threat.get("id")),
@@ -525,6 +926,8 @@ class SentinelOneProvider(BaseProvider):
                 "site_name": threat.get("siteName", "Unknown"),
                 "account_name": threat.get("accountName", "Unknown"),
                 "computer_name": threat.get("agentComputerName", "Unknown"),
+                "ip_address": agent_ips.split(",")[0].strip() or "Unknown",
+                "mac_address": next((interface.get("physical") for interface in interfaces if interface.get("physical")), "Unknown"),
                 "classification": threat_info.get("classification", "Unknown"),
                 "confidence_level": threat_info.get("confidenceLevel", "Unknown"),
                 "threat_name": threat_info.get("threatName", "Unknown")
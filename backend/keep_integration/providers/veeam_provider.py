@@ -5,17 +5,57 @@ This module implements a Keep.dev provider for Veeam Backup & Replication,
 allowing Keep to interact with Veeam backup jobs and sessions.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
 import logging
+import math
 import httpx
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from keep.providers.base.base_provider import BaseProvider
 from keep.providers.models.provider_config import ProviderConfig
 
+from keep_integration.pagination import PageResult, prefetch_pages
+from keep_integration.state import watermark_store
+from keep_integration.transport import create_client
+
 logger = logging.getLogger(__name__)
 
+class VeeamTokenAuth(httpx.Auth):
+    """
+    httpx authentication flow for Veeam.
+
+    Adds the provider's current bearer token to each request instead of
+    storing it in the shared client headers, and retries once with a fresh
+    token when Veeam answers 401.
+    """
+
+    def __init__(self, provider: "VeeamProvider"):
+        self.provider = provider
+
+    async def async_auth_flow(self, request: httpx.Request):
+        # Token requests carry their own Basic credentials
+        if request.url.path.endswith(self.provider.TOKEN_ENDPOINT):
+            yield request
+            return
+
+        if self.provider.token:
+            request.headers["Authorization"] = f"Bearer {self.provider.token}"
+        response = yield request
+
+        if response.status_code == 401:
+            token = self.provider.token
+            async with self.provider._token_lock:
+                # Only request a new token if nobody else replaced it meanwhile
+                if self.provider.token == token:
+                    self.provider.token = None
+                    await self.provider._request_token()
+            if self.provider.token:
+                request.headers["Authorization"] = f"Bearer {self.provider.token}"
+                yield request
+
 class VeeamProvider(BaseProvider):
     """
     Veeam provider for Keep.dev.
@@ -32,11 +72,32 @@ class VeeamProvider(BaseProvider):
     PROVIDER_DESCRIPTION = "Veeam Backup & Replication is a backup and disaster recovery solution."
     FINGERPRINT_FIELDS = ["id", "name"]
 
+    API_VERSION = "1.0-rev1"
+    TOKEN_ENDPOINT = "/api/oauth2/token"
+
+    # Renew tokens once this share of their lifetime has passed
+    TOKEN_RENEWAL_RATIO = 0.8
+
+    # Watermarked session streams re-read this much history before the watermark
+    WATERMARK_OVERLAP_SECONDS = 120
+
+    # Endpoints by query type
+    QUERY_ENDPOINTS = {
+        "jobs": "/api/v1/jobs",
+        "sessions": "/api/v1/sessions",
+        "repositories": "/api/v1/backupInfrastructure/repositories",
+        "vms": "/api/v1/inventory/vms",
+        "protected_vms": "/api/v1/inventory/protectedVms"
+    }
+
     def __init__(self, provider_id, config):
         super().__init__(provider_id, config)
         self.client = None
         self.token = None
         self.token_expiry = None
+        self.refresh_token = None
+        self._token_lock = asyncio.Lock()
+        self._renewal_task = None
         self._init_client()
 
     def _init_client(self):
@@ -52,11 +113,16 @@ class VeeamProvider(BaseProvider):
                 logger.error("Missing required Veeam authentication configuration")
                 return
 
-            # Initialize HTTP client
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
+            # Initialize HTTP client; the bearer token is added per request
+            self.client = create_client(
+                "veeam",
+                self.base_url,
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-version": self.API_VERSION
+                },
                 verify=False,  # Veeam often uses self-signed certificates
-                timeout=30.0
+                auth=VeeamTokenAuth(self)
             )
             logger.info(f"Veeam client initialized")
         except Exception as e:
@@ -67,6 +133,9 @@ class VeeamProvider(BaseProvider):
         """
         Get an authentication token from Veeam.
 
+        Concurrent callers share a single token request, and a valid token is
+        renewed in the background before it expires.
+
         Returns:
             True if successful, False otherwise
         """
@@ -75,9 +144,28 @@ class VeeamProvider(BaseProvider):
             return False
 
         # Check if we already have a valid token
-        if self.token and self.token_expiry and datetime.now() < self.token_expiry:
+        if self._token_valid():
             return True
 
+        async with self._token_lock:
+            # Another caller may have refreshed the token while we waited
+            if self._token_valid():
+                return True
+            return await self._request_token()
+
+    def _token_valid(self) -> bool:
+        """Check whether the current token can still be used."""
+        return bool(self.token and self.token_expiry and datetime.now() < self.token_expiry)
+
+    async def _request_token(self) -> bool:
+        """
+        Request a new token, using the refresh token when one is available.
+
+        Must be called with the token lock held.
+
+        Returns:
+            True if successful, False otherwise
+        """
         try:
             # Prepare authentication headers
             auth_string = f"{self.username}:{self.password}"
@@ -86,37 +174,84 @@ class VeeamProvider(BaseProvider):
             headers = {
                 "Authorization": f"Basic {encoded_auth}",
                 "Content-Type": "application/x-www-form-urlencoded",
-                "x-api-version": "1.0-rev1"
+                "x-api-version": self.API_VERSION
             }
 
-            # Make API request
-            response = await self.client.post(
-                "/api/oauth2/token",
-                headers=headers,
-                data="grant_type=password&username=&password="
-            )
+            response = None
+            if self.refresh_token:
+                response = await self.client.post(
+                    self.TOKEN_ENDPOINT,
+                    headers=headers,
+                    data={"grant_type": "refresh_token", "refresh_token": self.refresh_token}
+                )
+                if response.is_error:
+                    # The refresh token expired or was revoked; log in again
+                    logger.info("Veeam refresh token rejected, requesting a new token")
+                    response = None
+
+            if response is None:
+                response = await self.client.post(
+                    self.TOKEN_ENDPOINT,
+                    headers=headers,
+                    data="grant_type=password&username=&password="
+                )
             response.raise_for_status()
 
             # Parse response
             data = response.json()
             self.token = data.get("access_token")
+            self.refresh_token = data.get("refresh_token")
             expires_in = data.get("expires_in", 900)  # Default to 15 minutes
             self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
 
-            # Update client headers
-            self.client.headers.update({
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json",
-                "x-api-version": "1.0-rev1"
-            })
+            self._schedule_token_renewal(expires_in * self.TOKEN_RENEWAL_RATIO)
 
             return True
         except Exception as e:
             logger.error(f"Error getting Veeam token: {e}")
             self.token = None
             self.token_expiry = None
+            self.refresh_token = None
             return False
 
+    def _schedule_token_renewal(self, delay: float):
+        """
+        Schedule a background token renewal.
+
+        Args:
+            delay: Seconds until the token is renewed
+        """
+        current_task = asyncio.current_task()
+        if self._renewal_task and not self._renewal_task.done() and self._renewal_task is not current_task:
+            self._renewal_task.cancel()
+        self._renewal_task = asyncio.ensure_future(self._renew_token_after(delay))
+
+    async def _renew_token_after(self, delay: float):
+        """
+        Renew the token after a delay, before it expires.
+
+        Args:
+            delay: Seconds to wait before renewing
+        """
+        await asyncio.sleep(delay)
+        async with self._token_lock:
+            if not await self._request_token():
+                logger.warning("Proactive Veeam token renewal failed, will retry on next request")
+
+    async def close(self):
+        """Cancel the scheduled token renewal and close the HTTP client."""
+        if self._renewal_task and not self._renewal_task.done():
+            self._renewal_task.cancel()
+            try:
+                await self._renewal_task
+            except asyncio.CancelledError:
+                pass
+        self._renewal_task = None
+
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
     async def query(self, query_params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Query backup jobs and sessions from Veeam.
@@ -137,75 +272,229 @@ class VeeamProvider(BaseProvider):
             return []
 
         try:
-            # Extract query parameters
             query_type = query_params.get("query_type", "jobs")
-            filters = query_params.get("filters", {})
-            limit = query_params.get("limit", 100)
-            offset = query_params.get("offset", 0)
-            client_id = query_params.get("client_id")
-
-            # If client_id is provided, get the client-specific filters
-            if client_id:
-                client_filters = await self._get_client_filters(client_id)
-                if client_filters:
-                    # Merge client filters with existing filters
-                    filters.update(client_filters)
-
-            # Build query parameters
-            params = {
-                "limit": limit,
-                "offset": offset
-            }
-
-            # Add filters if provided
-            if filters:
-                for key, value in filters.items():
-                    params[key] = value
-
-            # Determine endpoint based on query type
-            if query_type == "jobs":
-                endpoint = "/api/v1/jobs"
-            elif query_type == "sessions":
-                endpoint = "/api/v1/sessions"
-            elif query_type == "repositories":
-                endpoint = "/api/v1/backupInfrastructure/repositories"
-            elif query_type == "vms":
-                endpoint = "/api/v1/inventory/vms"
-            elif query_type == "protected_vms":
-                endpoint = "/api/v1/inventory/protectedVms"
-            else:
+            if query_type not in self.QUERY_ENDPOINTS:
                 logger.error(f"Unsupported query type: {query_type}")
                 return []
 
+            params = await self._build_query_params(query_params)
+            params["limit"] = query_params.get("limit", 100)
+            params["offset"] = query_params.get("offset", 0)
+
             # Make API request
-            response = await self.client.get(endpoint, params=params)
+            response = await self.client.get(self.QUERY_ENDPOINTS[query_type], params=params)
             response.raise_for_status()
 
             # Parse response
-            data = response.json()
+            items = response.json().get("data", [])
 
-            # Extract items based on query type
-            if query_type == "jobs":
-                items = data.get("data", [])
-                return [self._transform_job_to_alert(job) for job in items]
-            elif query_type == "sessions":
-                items = data.get("data", [])
-                return [self._transform_session_to_alert(session) for session in items]
-            elif query_type == "repositories":
-                items = data.get("data", [])
-                return items
-            elif query_type == "vms":
-                items = data.get("data", [])
-                return items
-            elif query_type == "protected_vms":
-                items = data.get("data", [])
-                return items
-
-            return []
+            return [self._transform_item(query_type, item) for item in items]
         except Exception as e:
             logger.error(f"Error querying Veeam: {e}")
             return []
 
+    async def query_stream(self, query_params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all results of a query from Veeam.
+
+        Reads pagination.total from the first page, then fetches the remaining
+        offsets concurrently within a bounded window and yields results in order.
+        Sessions are paged in ascending creation order.
+
+        Args:
+            query_params: Parameters for the query
+                - query_type: Type of query (jobs, sessions, repositories, vms, protected_vms)
+                - filters: Dictionary of filters
+                - limit: Page size (default: 500)
+                - prefetch: Number of pages fetched concurrently (default: 4)
+                - client_id: Optional client ID to filter results
+                - created_after: Only return sessions created after this datetime or ISO timestamp
+                - since_watermark: Only return sessions not returned by a previous
+                  watermarked stream. Sessions are re-read from a short overlap
+                  window before the stored creationTime watermark and skipped by
+                  ID; the watermark advances once the stream completes
+                - overlap_seconds: Overlap window (default: WATERMARK_OVERLAP_SECONDS)
+
+        Yields:
+            Jobs and sessions transformed to Keep alerts, or raw items for other query types
+        """
+        if not await self._get_token():
+            logger.error("Failed to get Veeam token")
+            return
+
+        query_type = query_params.get("query_type", "jobs")
+        if query_type not in self.QUERY_ENDPOINTS:
+            logger.error(f"Unsupported query type: {query_type}")
+            return
+
+        try:
+            endpoint = self.QUERY_ENDPOINTS[query_type]
+            params = await self._build_query_params(query_params)
+            limit = query_params.get("limit", 500)
+
+            since_watermark = query_type == "sessions" and query_params.get("since_watermark", False)
+            created_after = self._parse_timestamp(query_params.get("created_after"))
+            overlap = timedelta(seconds=query_params.get("overlap_seconds", self.WATERMARK_OVERLAP_SECONDS))
+            watermark, seen = await self._get_watermark() if since_watermark else (None, {})
+            if watermark and (created_after is None or watermark - overlap > created_after):
+                created_after = watermark - overlap
+            if created_after and query_type == "sessions":
+                params["createdAfterFilter"] = created_after.isoformat()
+            if query_type == "sessions":
+                # Veeam returns the newest sessions first; in creation order,
+                # sessions created during the stream land after the pages
+                # being read instead of shifting unread sessions past them
+                params["orderColumn"] = "CreationTime"
+                params["orderAsc"] = "true"
+
+            async def fetch_page(page_number: int) -> PageResult:
+                offset = (page_number - 1) * limit
+                response = await self.client.get(endpoint, params={**params, "limit": limit, "offset": offset})
+                response.raise_for_status()
+
+                data = response.json()
+                items = data.get("data", [])
+                total = (data.get("pagination") or {}).get("total")
+
+                if total is None:
+                    return PageResult(items=items, has_more=len(items) >= limit)
+                return PageResult(
+                    items=items,
+                    has_more=offset + len(items) < total and bool(items),
+                    total_pages=max(1, math.ceil(total / limit))
+                )
+
+            newest = watermark
+            stream_seen = dict(seen)
+            async for items in prefetch_pages(fetch_page, window=query_params.get("prefetch", 4)):
+                for item in items:
+                    if query_type == "sessions":
+                        creation_time = self._parse_timestamp(item.get("creationTime"))
+                        session_id = str(item.get("id"))
+                        if created_after and creation_time and creation_time <= created_after:
+                            continue
+                        # Skip sessions already returned in the overlap window
+                        if session_id in stream_seen:
+                            continue
+                        if creation_time:
+                            if since_watermark:
+                                stream_seen[session_id] = creation_time.isoformat()
+                            if newest is None or creation_time > newest:
+                                newest = creation_time
+                    yield self._transform_item(query_type, item)
+
+            # Only IDs inside the overlap window can be returned again
+            if newest:
+                cutoff = newest - overlap
+                stream_seen = {
+                    session_id: creation_time
+                    for session_id, creation_time in stream_seen.items()
+                    if (self._parse_timestamp(creation_time) or cutoff) >= cutoff
+                }
+
+            # Only advance the watermark once every page was delivered
+            if since_watermark and newest and (newest != watermark or stream_seen != seen):
+                await self._set_watermark(newest, stream_seen)
+        except Exception as e:
+            logger.error(f"Error streaming Veeam {query_type}: {e}")
+
+    async def _build_query_params(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build Veeam request parameters for a query, without paging.
+
+        Args:
+            query_params: Parameters for the query
+
+        Returns:
+            Request parameters
+        """
+        filters = dict(query_params.get("filters", {}))
+        client_id = query_params.get("client_id")
+
+        # If client_id is provided, get the client-specific filters
+        if client_id:
+            client_filters = await self._get_client_filters(client_id)
+            if client_filters:
+                # Merge client filters with existing filters
+                filters.update(client_filters)
+
+        return filters
+
+    def _transform_item(self, query_type: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Transform a query result item.
+
+        Args:
+            query_type: Type of query
+            item: Raw Veeam item
+
+        Returns:
+            Keep alert for jobs and sessions, otherwise the raw item
+        """
+        if query_type == "jobs":
+            return self._transform_job_to_alert(item)
+        elif query_type == "sessions":
+            return self._transform_session_to_alert(item)
+        return item
+
+    async def _get_watermark(self):
+        """
+        Get the session stream watermark for this provider.
+
+        Returns:
+            Tuple of (newest creationTime streamed or None, creationTime of the
+            sessions streamed in the overlap window by session ID)
+        """
+        watermark = self._parse_timestamp(await watermark_store.get(self._watermark_key()))
+
+        seen = {}
+        stored_seen = await watermark_store.get(self._seen_key())
+        if stored_seen:
+            try:
+                seen = json.loads(stored_seen)
+            except ValueError:
+                logger.warning(f"Ignoring unreadable seen sessions for {self._watermark_key()}")
+        return watermark, seen
+
+    async def _set_watermark(self, watermark: datetime, seen: Dict[str, str]):
+        """
+        Persist the session stream watermark for this provider.
+
+        Args:
+            watermark: Newest creationTime streamed
+            seen: creationTime of the sessions streamed in the overlap window, by session ID
+        """
+        # Persist the watermark first; if the seen map is lost, sessions are re-emitted rather than skipped
+        await watermark_store.set(self._watermark_key(), watermark.isoformat())
+        await watermark_store.set(self._seen_key(), json.dumps(seen))
+
+    def _watermark_key(self) -> str:
+        """Get the watermark store key for this provider's sessions."""
+        return f"veeam:{self.provider_id}:sessions"
+
+    def _seen_key(self) -> str:
+        """Get the watermark store key for the sessions seen in the overlap window."""
+        return f"veeam:{self.provider_id}:sessions-seen"
+
+    def _parse_timestamp(self, value: Any) -> Optional[datetime]:
+        """
+        Parse a Veeam timestamp.
+
+        Args:
+            value: Datetime or ISO 8601 timestamp
+
+        Returns:
+            Timezone-aware datetime, or None if the value cannot be parsed
+        """
+        if isinstance(value, datetime):
+            parsed = value
+        else:
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except (AttributeError, ValueError):
+                return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
     async def notify(self, notification_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Perform actions on Veeam jobs.
@@ -298,25 +587,10 @@ class VeeamProvider(BaseProvider):
             Dictionary of Veeam-specific filters
         """
         try:
-            # Query the database for client information
-            from sqlalchemy.ext.asyncio import AsyncSession
-            from sqlalchemy.future import select
-            from app.db.base_class import get_db
-            from app.models.client import Client
-
-            # Get database session
-            db_session = None
-            async for session in get_db():
-                db_session = session
-                break
-
-            if not db_session:
-                logger.error("Failed to get database session")
-                return {}
+            # Look up the client in the shared client mapping service
+            from app.services.client_mapping import client_mapping_service
 
-            # Query client by ID
-            result = await db_session.execute(select(Client).where(Client.id == int(client_id)))
-            client = result.scalars().first()
+            client = await client_mapping_service.get_client(client_id)
 
             if not client:
                 logger.error(f"Client with ID {client_id} not found")
@@ -324,7 +598,7 @@ class VeeamProvider(BaseProvider):
 
             # Get client name and metadata containing Veeam-specific filters if available
             client_name = client.name
-            metadata = client.metadata or {}
+            metadata = client.metadata
             veeam_filters = metadata.get("veeam_filters", {})
 
             # If we have direct filter mappings in metadata, use them
@@ -360,7 +634,8 @@ class VeeamProvider(BaseProvider):
             "task_id": response.json().get("taskId")
         }
 
-    def _transform_job_to_alert(self, job: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _transform_job_to_alert(job: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform a Veeam job to a Keep alert format.
 
@@ -417,7 +692,8 @@ class VeeamProvider(BaseProvider):
             "raw_data": job
         }
 
-    def _transform_session_to_alert(self, session: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _transform_session_to_alert(session: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform a Veeam session to a Keep alert format.
 
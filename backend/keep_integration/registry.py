@@ -0,0 +1,168 @@
+"""
+Provider and workflow registry for MSPAlwaysOn.
+
+This module builds the provider and workflow listings served by the Keep
+integration API from the registered MSP providers and the loaded
+workflows. Each listing is serialized once with an ETag, so repeated
+polling is answered from memory, or with 304 Not Modified when the client
+already has the current version.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+from keep_integration.providers import MSP_PROVIDERS
+from keep_integration.workflows import WorkflowLoader, workflow_loader
+
+logger = logging.getLogger(__name__)
+
+class CachedResponse(NamedTuple):
+    """Serialized JSON body and its ETag."""
+
+    body: bytes
+    etag: str
+
+def _encode(payload: Dict[str, Any]) -> CachedResponse:
+    """
+    Serialize a payload and compute its ETag.
+
+    Args:
+        payload: JSON-serializable payload
+
+    Returns:
+        Cached response
+    """
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return CachedResponse(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match: Header value, possibly a list of (weak) ETags or "*"
+        etag: Current ETag
+
+    Returns:
+        True if the client has the current version
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates]
+
+class Registry:
+    """
+    Registry of MSP providers and workflows.
+
+    The provider listing is built once from the provider class metadata.
+    The workflow listing is rebuilt only when the workflow loader swaps in
+    a new index after a file change.
+    """
+
+    def __init__(self, providers: Optional[Dict[str, Any]] = None, loader: Optional[WorkflowLoader] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            providers: Provider classes by type (default: MSP_PROVIDERS)
+            loader: Workflow loader (default: the shared loader)
+        """
+        self.provider_classes = providers if providers is not None else MSP_PROVIDERS
+        self.loader = loader or workflow_loader
+        self._providers: Optional[CachedResponse] = None
+        self._workflows: Optional[CachedResponse] = None
+        self._workflow_index = None
+
+    def build(self):
+        """Build both listings, e.g. at startup."""
+        self._providers = _encode({"providers": self._describe_providers()})
+        self._refresh_workflows()
+
+    @property
+    def providers(self) -> CachedResponse:
+        """Get the provider listing."""
+        if self._providers is None:
+            self._providers = _encode({"providers": self._describe_providers()})
+        return self._providers
+
+    @property
+    def workflows(self) -> CachedResponse:
+        """Get the workflow listing, rebuilding it if the workflows were reloaded."""
+        if self._workflows is None or self._workflow_index is not self.loader.index:
+            self._refresh_workflows()
+        return self._workflows
+
+    def _refresh_workflows(self):
+        """Rebuild the workflow listing from the loader's current index."""
+        index = self.loader.index
+        self._workflows = _encode({"workflows": self._describe_workflows(index.workflows.values())})
+        self._workflow_index = index
+
+    def _describe_providers(self) -> List[Dict[str, Any]]:
+        """
+        Describe the registered providers.
+
+        Returns:
+            Provider metadata sorted by type
+        """
+        return [
+            {
+                "type": provider_type,
+                "display_name": getattr(provider_class, "PROVIDER_DISPLAY_NAME", provider_type),
+                "category": list(getattr(provider_class, "PROVIDER_CATEGORY", [])),
+                "tags": list(getattr(provider_class, "PROVIDER_TAGS", [])),
+                "description": getattr(provider_class, "PROVIDER_DESCRIPTION", ""),
+                "supports_query_stream": hasattr(provider_class, "query_stream"),
+            }
+            for provider_type, provider_class in sorted(self.provider_classes.items())
+        ]
+
+    @staticmethod
+    def _describe_workflows(workflows) -> List[Dict[str, Any]]:
+        """
+        Describe loaded workflows.
+
+        Args:
+            workflows: Loaded workflows
+
+        Returns:
+            Workflow metadata sorted by ID
+        """
+        descriptions = []
+        for workflow in sorted(workflows, key=lambda workflow: workflow.id):
+            nodes = (workflow.definition.get("steps") or []) + (workflow.definition.get("actions") or [])
+            descriptions.append({
+                "id": workflow.id,
+                "name": workflow.name,
+                "description": workflow.description,
+                "triggers": workflow.triggers,
+                "steps": [step.get("name") for step in workflow.definition.get("steps") or []],
+                "actions": [action.get("name") for action in workflow.definition.get("actions") or []],
+                "providers": sorted({(node.get("provider") or {}).get("type") for node in nodes} - {None}),
+            })
+        return descriptions
+
+    @staticmethod
+    def respond(cached: CachedResponse, request: Request) -> Response:
+        """
+        Serve a cached listing, honouring If-None-Match.
+
+        Args:
+            cached: Cached listing
+            request: Incoming request
+
+        Returns:
+            200 response with the body, or 304 if the client's ETag is current
+        """
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+# Singleton instance
+registry = Registry()
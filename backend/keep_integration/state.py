@@ -0,0 +1,104 @@
+"""
+Persistent sync state for MSP providers.
+
+This module stores per-provider sync watermarks so incremental polling
+survives restarts. Watermarks are kept in memory and persisted to Redis
+when it is reachable.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is optional for local development
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+class WatermarkStore:
+    """
+    Store for per-provider sync watermarks.
+
+    Values are cached in memory and written through to a Redis hash. If Redis
+    is unavailable the store keeps working from memory only.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, namespace: str = "mspalwayson:watermarks"):
+        """
+        Initialize the watermark store.
+
+        Args:
+            redis_url: Redis connection URL, or None for an in-memory store
+            namespace: Redis hash holding the watermarks
+        """
+        self.namespace = namespace
+        self._values: Dict[str, str] = {}
+        self._redis = None
+
+        if redis_url and aioredis is not None:
+            try:
+                self._redis = aioredis.from_url(redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Error connecting watermark store to Redis, using memory only: {e}")
+                self._redis = None
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Get a watermark.
+
+        Args:
+            key: Watermark key
+
+        Returns:
+            The stored watermark, or None if none has been stored
+        """
+        if key in self._values:
+            return self._values[key]
+
+        if self._redis is not None:
+            try:
+                value = await self._redis.hget(self.namespace, key)
+                if value is not None:
+                    self._values[key] = value
+                return value
+            except Exception as e:
+                logger.warning(f"Error reading watermark {key} from Redis: {e}")
+
+        return None
+
+    async def set(self, key: str, value: str):
+        """
+        Set a watermark.
+
+        Args:
+            key: Watermark key
+            value: Watermark value
+        """
+        self._values[key] = value
+
+        if self._redis is not None:
+            try:
+                await self._redis.hset(self.namespace, key, value)
+            except Exception as e:
+                logger.warning(f"Error persisting watermark {key} to Redis: {e}")
+
+    async def delete(self, key: str):
+        """
+        Delete a watermark, forcing the next sync to start from scratch.
+
+        Args:
+            key: Watermark key
+        """
+        self._values.pop(key, None)
+
+        if self._redis is not None:
+            try:
+                await self._redis.hdel(self.namespace, key)
+            except Exception as e:
+                logger.warning(f"Error deleting watermark {key} from Redis: {e}")
+
+# Singleton instance
+watermark_store = WatermarkStore(settings.REDIS_URL)
@@ -0,0 +1,5 @@
+"""
+Scheduled syncs of external systems into MSPAlwaysOn.
+"""
+
+from .scheduler import PeriodicJob, schedule, stop_scheduled_jobs
@@ -0,0 +1,152 @@
+"""
+Scheduled alert polling for MSPAlwaysOn.
+
+Webhooks deliver most alerts; polling is a fallback that picks up alerts
+whose callbacks were missed. Each configured provider is polled
+incrementally and its alerts are published to the ingestion queue, where
+duplicates of alerts already received by webhook are suppressed.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from keep_integration.ingestion import get_ingestion_queue, ingest_provider_alerts
+from keep_integration.providers.configured import configured_provider_types, get_configured_provider
+from keep_integration.state import watermark_store
+from keep_integration.sync.scheduler import PeriodicJob, schedule
+from keep_integration.sync.sentinelone import _parse_timestamp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Polled providers; the others are only read on demand
+POLLED_PROVIDER_TYPES = ("connectwise-manage", "sentinelone", "veeam")
+
+# SentinelOne threats are re-read this far before the newest update seen
+SENTINELONE_POLL_OVERLAP_SECONDS = 120
+
+# Number of SentinelOne threats published per call
+SENTINELONE_POLL_BATCH_SIZE = 500
+
+class AlertPoller:
+    """
+    Incremental poll of one provider's alerts into the ingestion queue.
+
+    ConnectWise tickets and Veeam sessions are read from their providers'
+    persisted watermarks. SentinelOne threats are read in updatedAt order
+    from the newest update already published, less an overlap, so threats
+    that are mitigated or resolved after creation are read again.
+    """
+
+    def __init__(self, provider_type: str, provider):
+        """
+        Initialize the poller.
+
+        Args:
+            provider_type: Provider type
+            provider: Provider instance
+        """
+        self.provider_type = provider_type
+        self.provider = provider
+
+    def _watermark_key(self) -> str:
+        """Get the watermark store key of this poller."""
+        return f"{self.provider_type}:{self.provider.provider_id}:alert-poll"
+
+    async def _get_watermark(self) -> Optional[datetime]:
+        """Get the newest threat update already published."""
+        stored = await watermark_store.get(self._watermark_key())
+        return _parse_timestamp(stored) if stored else None
+
+    async def poll(self) -> int:
+        """
+        Poll the provider once.
+
+        Returns:
+            Number of alerts published
+        """
+        if self.provider_type == "sentinelone":
+            published = await self._poll_threats()
+        elif self.provider_type == "veeam":
+            published = await ingest_provider_alerts(self.provider, {"query_type": "sessions", "since_watermark": True})
+        else:
+            published = await ingest_provider_alerts(self.provider, {"incremental": True})
+
+        if published:
+            logger.info(f"Polled {published} alerts from {self.provider_type}")
+        return published
+
+    async def _poll_threats(self) -> int:
+        """
+        Poll SentinelOne threats updated since the watermark.
+
+        Returns:
+            Number of alerts published
+        """
+        watermark = await self._get_watermark()
+        filters = {"sortBy": "updatedAt", "sortOrder": "asc"}
+        if watermark:
+            filters["updatedAt__gt"] = (watermark - timedelta(seconds=SENTINELONE_POLL_OVERLAP_SECONDS)).isoformat()
+
+        queue = get_ingestion_queue()
+        published = 0
+        batch: List[Dict[str, Any]] = []
+        # Errors end the poll; the watermark only covers published batches
+        async for alert in self.provider.query_stream({
+            "query_type": "threats",
+            "filters": filters,
+            "limit": 1000,
+            "raise_errors": True
+        }):
+            batch.append(alert)
+            if len(batch) >= SENTINELONE_POLL_BATCH_SIZE:
+                published += await self._publish_threats(queue, batch)
+                batch = []
+        if batch:
+            published += await self._publish_threats(queue, batch)
+
+        return published
+
+    async def _publish_threats(self, queue, alerts: List[Dict[str, Any]]) -> int:
+        """
+        Publish a batch of threat alerts and advance the watermark past them.
+
+        Args:
+            queue: Ingestion queue
+            alerts: Threat alerts, in updatedAt order
+
+        Returns:
+            Number of alerts published
+        """
+        await queue.publish(alerts)
+
+        watermark = await self._get_watermark()
+        newest = watermark
+        for alert in alerts:
+            updated_at = _parse_timestamp((alert.get("raw_data") or {}).get("updatedAt"))
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+        if newest and newest != watermark:
+            await watermark_store.set(self._watermark_key(), newest.isoformat())
+
+        return len(alerts)
+
+def start_alert_polling() -> List[PeriodicJob]:
+    """
+    Schedule alert polling of the configured providers if it is enabled.
+
+    Returns:
+        The scheduled jobs
+    """
+    if not settings.ALERT_POLL_ENABLED:
+        return []
+
+    jobs = []
+    for provider_type in configured_provider_types():
+        if provider_type not in POLLED_PROVIDER_TYPES:
+            continue
+        poller = AlertPoller(provider_type, get_configured_provider(provider_type))
+        jobs.append(schedule(PeriodicJob(f"{provider_type}-alert-poll", settings.ALERT_POLL_INTERVAL_SECONDS, poller.poll)))
+    return jobs
@@ -0,0 +1,388 @@
+"""
+ConnectWise Manage sync for MSPAlwaysOn.
+
+This module mirrors ConnectWise Manage companies, sites and contacts into
+the local clients, sites and contacts tables. Each entity is streamed with
+a ``lastUpdated`` watermark, so a scheduled run only reads what changed
+since the previous one, and rows are written with the bulk upsert service
+in batches.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.future import select
+
+from keep_integration.providers.configured import get_configured_provider
+from keep_integration.providers.connectwise_provider import ConnectWiseManageProvider
+from keep_integration.state import watermark_store
+from keep_integration.sync.scheduler import PeriodicJob, schedule
+
+from app.core.config import settings
+from app.models.client import Client
+from app.services.bulk_upsert import BulkUpsertResult, BulkUpsertService, bulk_upsert_service
+
+logger = logging.getLogger(__name__)
+
+# External system name stored on synced clients
+EXTERNAL_SYSTEM = "connectwise"
+
+# Seconds between full sweeps of all companies' sites; sites have no
+# collection endpoint, so incremental runs only read sites of changed companies
+SITE_SWEEP_INTERVAL_SECONDS = 24 * 60 * 60
+
+def _communication(contact: Dict[str, Any], communication_type: str, names: tuple) -> Optional[str]:
+    """
+    Get a communication item of a contact.
+
+    Args:
+        contact: ConnectWise contact
+        communication_type: Item type (Email or Phone)
+        names: Accepted item names, lowercased; the default item wins
+
+    Returns:
+        The item value, or None if the contact has none
+    """
+    matches = [
+        item for item in contact.get("communicationItems") or []
+        if item.get("communicationType") == communication_type
+        and (item.get("type", {}).get("name") or "").lower() in names
+    ]
+    if not matches:
+        return None
+    matches.sort(key=lambda item: not item.get("defaultFlag"))
+    return matches[0].get("value")
+
+def map_company(company: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a ConnectWise company to client columns.
+
+    Args:
+        company: ConnectWise company
+
+    Returns:
+        Client row
+    """
+    address = ", ".join(part for part in (company.get("addressLine1"), company.get("addressLine2")) if part)
+    return {
+        "external_id": str(company["id"]),
+        "external_system": EXTERNAL_SYSTEM,
+        "name": company.get("name") or company.get("identifier") or str(company["id"]),
+        "address": address or None,
+        "city": company.get("city"),
+        "state": company.get("state"),
+        "postal_code": company.get("zip"),
+        "country": (company.get("country") or {}).get("name"),
+        "phone": company.get("phoneNumber"),
+        "website": company.get("website"),
+        "is_active": not company.get("deletedFlag", False),
+        "metadata": {
+            "connectwise_identifier": company.get("identifier"),
+            "connectwise_status": (company.get("status") or {}).get("name"),
+            "connectwise_types": [company_type.get("name") for company_type in company.get("types") or []],
+        },
+    }
+
+def map_site(company_id: Any, site: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a ConnectWise company site to site columns.
+
+    Args:
+        company_id: ID of the site's company
+        site: ConnectWise site
+
+    Returns:
+        Site row, with client_external_id instead of client_id
+    """
+    address = ", ".join(part for part in (site.get("addressLine1"), site.get("addressLine2")) if part)
+    return {
+        "external_id": str(site["id"]),
+        "client_external_id": str(company_id),
+        "name": site.get("name") or str(site["id"]),
+        "address": address or None,
+        "city": site.get("city"),
+        "state": (site.get("stateReference") or {}).get("identifier"),
+        "postal_code": site.get("zip"),
+        "country": (site.get("country") or {}).get("name"),
+        "phone": site.get("phoneNumber"),
+        "is_active": not site.get("inactiveFlag", False),
+        "is_primary": bool(site.get("primaryAddressFlag")),
+    }
+
+def map_contact(contact: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map a ConnectWise contact to contact columns.
+
+    Args:
+        contact: ConnectWise contact
+
+    Returns:
+        Contact row with client_external_id instead of client_id, or None
+        for contacts without a company
+    """
+    company = contact.get("company") or {}
+    if not company.get("id"):
+        return None
+    return {
+        "external_id": str(contact["id"]),
+        "client_external_id": str(company["id"]),
+        "first_name": contact.get("firstName") or "",
+        "last_name": contact.get("lastName") or "",
+        "title": contact.get("title"),
+        "email": _communication(contact, "Email", ("email",)),
+        "phone": _communication(contact, "Phone", ("direct", "phone", "work")),
+        "mobile": _communication(contact, "Phone", ("mobile", "cell")),
+        "is_active": not contact.get("inactiveFlag", False),
+        "is_primary": bool(contact.get("defaultFlag")),
+    }
+
+class ConnectWiseSync:
+    """
+    Incremental sync of ConnectWise Manage companies, sites and contacts.
+
+    Companies are written before their sites and contacts, so child rows
+    can resolve their client. A watermark only advances after all of its
+    rows have been written; a failed run is retried from the old watermark.
+    """
+
+    def __init__(
+        self,
+        provider: ConnectWiseManageProvider,
+        upsert_service: Optional[BulkUpsertService] = None,
+        batch_size: int = 1000,
+        site_concurrency: int = 4
+    ):
+        """
+        Initialize the sync.
+
+        Args:
+            provider: ConnectWise Manage provider to read from
+            upsert_service: Service writing the rows (default: the shared service)
+            batch_size: Rows per upsert batch and page size of the API reads
+            site_concurrency: Concurrent site requests
+        """
+        self.provider = provider
+        self.upsert_service = upsert_service or bulk_upsert_service
+        self.batch_size = batch_size
+        self.site_concurrency = site_concurrency
+
+    def _watermark_key(self, entity: str) -> str:
+        """Get the watermark store key of an entity."""
+        return f"connectwise-manage:{self.provider.provider_id}:{entity}"
+
+    async def _get_watermark(self, entity: str) -> Optional[datetime]:
+        """
+        Get the watermark of an entity.
+
+        Args:
+            entity: Entity name (companies, sites or contacts)
+
+        Returns:
+            Newest lastUpdated synced, or None before the first sync
+        """
+        stored = await watermark_store.get(self._watermark_key(entity))
+        return self.provider.parse_timestamp(stored) if stored else None
+
+    async def _set_watermark(self, entity: str, watermark: Optional[datetime]):
+        """Persist the watermark of an entity."""
+        if watermark:
+            await watermark_store.set(self._watermark_key(entity), watermark.isoformat())
+
+    def _changed_since(self, watermark: Optional[datetime]) -> List[Dict[str, Any]]:
+        """
+        Build conditions selecting records changed since a watermark.
+
+        Args:
+            watermark: Watermark, or None to select all records
+
+        Returns:
+            Conditions for ConnectWiseManageProvider.stream
+        """
+        if not watermark:
+            return []
+        overlap = timedelta(seconds=self.provider.WATERMARK_OVERLAP_SECONDS)
+        return [{"field": "lastUpdated", "operator": "greater_than", "value": watermark - overlap}]
+
+    def _newest(self, records: List[Dict[str, Any]], newest: Optional[datetime]) -> Optional[datetime]:
+        """
+        Get the newest lastUpdated of a page of records.
+
+        Args:
+            records: Raw records
+            newest: Newest timestamp seen so far
+
+        Returns:
+            The newest timestamp
+        """
+        for record in records:
+            updated_at = self.provider.parse_timestamp(record.get("_info", {}).get("lastUpdated"))
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+        return newest
+
+    async def sync(self, full: bool = False) -> Dict[str, BulkUpsertResult]:
+        """
+        Run one sync.
+
+        Args:
+            full: Ignore the watermarks and re-read everything
+
+        Returns:
+            Upsert counts by entity
+        """
+        if not self.provider.client:
+            logger.error("ConnectWise Manage client not initialized")
+            return {}
+
+        results = {}
+        results["companies"], changed_companies = await self.sync_companies(full)
+        results["sites"] = await self.sync_sites(changed_companies, full)
+        results["contacts"] = await self.sync_contacts(full)
+
+        for entity, result in results.items():
+            logger.info(
+                f"ConnectWise {entity} sync: {result.created} created, {result.updated} updated, "
+                f"{result.unchanged} unchanged, {result.skipped} skipped"
+            )
+        return results
+
+    async def sync_companies(self, full: bool = False):
+        """
+        Sync companies changed since the companies watermark.
+
+        Args:
+            full: Ignore the watermark
+
+        Returns:
+            Upsert counts and the IDs of the companies read
+        """
+        watermark = None if full else await self._get_watermark("companies")
+        newest = watermark
+        result = BulkUpsertResult()
+        company_ids = []
+
+        async for companies in self.provider.stream(
+            "/company/companies", self._changed_since(watermark), page_size=self.batch_size
+        ):
+            result.merge(await self.upsert_service.upsert_clients([map_company(company) for company in companies]))
+            company_ids.extend(company["id"] for company in companies)
+            newest = self._newest(companies, newest)
+
+        await self._set_watermark("companies", newest)
+        return result, company_ids
+
+    async def sync_sites(self, company_ids: List[Any], full: bool = False) -> BulkUpsertResult:
+        """
+        Sync the sites of companies.
+
+        Sites are read per company, for the given companies and, once per
+        sweep interval, for every synced company.
+
+        Args:
+            company_ids: Companies whose sites are read
+            full: Read the sites of every synced company
+
+        Returns:
+            Upsert counts
+        """
+        last_sweep = None if full else await self._get_watermark("sites-sweep")
+        now = datetime.now(timezone.utc)
+        sweep = last_sweep is None or (now - last_sweep).total_seconds() >= SITE_SWEEP_INTERVAL_SECONDS
+        if sweep:
+            company_ids = sorted(set(company_ids) | set(await self._synced_company_ids()))
+
+        semaphore = asyncio.Semaphore(self.site_concurrency)
+
+        async def fetch_sites(company_id) -> List[Dict[str, Any]]:
+            async with semaphore:
+                rows = []
+                async for sites in self.provider.stream(
+                    f"/company/companies/{company_id}/sites", page_size=self.batch_size
+                ):
+                    rows.extend(map_site(company_id, site) for site in sites)
+                return rows
+
+        result = BulkUpsertResult()
+        rows = []
+        tasks = [asyncio.ensure_future(fetch_sites(company_id)) for company_id in company_ids]
+        try:
+            for fetched in asyncio.as_completed(tasks):
+                rows.extend(await fetched)
+                if len(rows) >= self.batch_size:
+                    result.merge(await self.upsert_service.upsert_sites(rows))
+                    rows = []
+        finally:
+            # A failed company ends the run; stop the requests still pending
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if rows:
+            result.merge(await self.upsert_service.upsert_sites(rows))
+
+        if sweep:
+            await self._set_watermark("sites-sweep", now)
+        return result
+
+    async def _synced_company_ids(self) -> List[int]:
+        """Get the IDs of the companies synced so far."""
+        async with self.upsert_service.session_factory() as session:
+            result = await session.execute(
+                select(Client.external_id).where(Client.external_system == EXTERNAL_SYSTEM)
+            )
+            return [int(external_id) for (external_id,) in result if external_id.isdigit()]
+
+    async def sync_contacts(self, full: bool = False) -> BulkUpsertResult:
+        """
+        Sync contacts changed since the contacts watermark.
+
+        Args:
+            full: Ignore the watermark
+
+        Returns:
+            Upsert counts
+        """
+        watermark = None if full else await self._get_watermark("contacts")
+        newest = watermark
+        result = BulkUpsertResult()
+
+        async for contacts in self.provider.stream(
+            "/company/contacts", self._changed_since(watermark), page_size=self.batch_size
+        ):
+            rows = [row for row in (map_contact(contact) for contact in contacts) if row]
+            result.merge(await self.upsert_service.upsert_contacts(rows))
+            newest = self._newest(contacts, newest)
+
+        await self._set_watermark("contacts", newest)
+        return result
+
+def create_connectwise_sync() -> Optional[ConnectWiseSync]:
+    """
+    Create the sync from the ConnectWise settings.
+
+    Returns:
+        The sync, or None if ConnectWise is not configured
+    """
+    provider = get_configured_provider("connectwise-manage")
+    if provider is None:
+        logger.error("ConnectWise sync is enabled but the ConnectWise credentials are not configured")
+        return None
+
+    return ConnectWiseSync(provider)
+
+def start_connectwise_sync() -> Optional[PeriodicJob]:
+    """
+    Schedule the ConnectWise sync if it is enabled.
+
+    Returns:
+        The scheduled job, or None if the sync is disabled or not configured
+    """
+    if not settings.CONNECTWISE_SYNC_ENABLED:
+        return None
+
+    connectwise_sync = create_connectwise_sync()
+    if connectwise_sync is None:
+        return None
+
+    return schedule(PeriodicJob("connectwise-sync", settings.CONNECTWISE_SYNC_INTERVAL_SECONDS, connectwise_sync.sync))
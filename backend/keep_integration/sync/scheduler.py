@@ -0,0 +1,83 @@
+"""
+Periodic job scheduling for MSPAlwaysOn syncs.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class PeriodicJob:
+    """
+    Background job running a coroutine at a fixed interval.
+
+    Runs never overlap: the next run starts ``interval`` seconds after the
+    previous one finished. Errors are logged and the job keeps running.
+    """
+
+    def __init__(self, name: str, interval: float, run: Callable[[], Awaitable[None]], initial_delay: float = 0):
+        """
+        Initialize the job.
+
+        Args:
+            name: Job name used in logs
+            interval: Seconds between the end of a run and the start of the next
+            run: Coroutine function performing one run
+            initial_delay: Seconds before the first run
+        """
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.initial_delay = initial_delay
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self):
+        """Run the job until cancelled."""
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error running {self.name}: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the job in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self):
+        """Stop the job, cancelling a run in progress."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Jobs started with schedule()
+_jobs: List[PeriodicJob] = []
+
+def schedule(job: PeriodicJob) -> PeriodicJob:
+    """
+    Start a job and keep it for shutdown.
+
+    Args:
+        job: Job to start
+
+    Returns:
+        The started job
+    """
+    job.start()
+    _jobs.append(job)
+    logger.info(f"Scheduled {job.name} every {job.interval}s")
+    return job
+
+async def stop_scheduled_jobs():
+    """Stop all jobs started with schedule()."""
+    while _jobs:
+        await _jobs.pop().stop()
@@ -0,0 +1,255 @@
+"""
+SentinelOne asset sync for MSPAlwaysOn.
+
+This module mirrors SentinelOne agents into the local assets table. Agents
+are streamed from ``/v2/agents`` in ``updatedAt`` order with a watermark,
+so a scheduled run only reads agents that changed since the previous one,
+and each agent's SentinelOne site is mapped to the site with the same
+external ID.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from keep_integration.providers.configured import get_configured_provider
+from keep_integration.providers.sentinelone_provider import SentinelOneProvider
+from keep_integration.state import watermark_store
+from keep_integration.sync.scheduler import PeriodicJob, schedule
+
+from app.core.config import settings
+from app.models.asset import AssetType
+from app.services.bulk_upsert import BulkUpsertResult, BulkUpsertService, bulk_upsert_service
+
+logger = logging.getLogger(__name__)
+
+# External system name stored on synced assets
+EXTERNAL_SYSTEM = "sentinelone"
+
+# Agent machine types by asset type
+MACHINE_TYPES = {
+    "server": AssetType.SERVER,
+    "desktop": AssetType.WORKSTATION,
+    "laptop": AssetType.WORKSTATION,
+    "kubernetes node": AssetType.SERVER,
+}
+
+# Incremental syncs re-read this much history before the watermark
+WATERMARK_OVERLAP_SECONDS = 120
+
+# Seconds between full re-reads, which pick up agents skipped because their
+# site had not been synced yet; unchanged rows are not rewritten
+FULL_SYNC_INTERVAL_SECONDS = 24 * 60 * 60
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a SentinelOne timestamp.
+
+    Args:
+        value: ISO 8601 timestamp (e.g. 2024-01-01T10:00:00.000000Z)
+
+    Returns:
+        Timezone-aware datetime, or None if the value cannot be parsed
+    """
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _primary_interface(agent: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the network interface an agent talks to the management console from.
+
+    Args:
+        agent: SentinelOne agent
+
+    Returns:
+        The interface holding the agent's management IP, else its first interface
+    """
+    interfaces = agent.get("networkInterfaces") or []
+    management_ip = agent.get("lastIpToMgmt")
+    for interface in interfaces:
+        if management_ip and management_ip in (interface.get("inet") or []):
+            return interface
+    return interfaces[0] if interfaces else {}
+
+def map_agent(agent: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map a SentinelOne agent to asset columns.
+
+    Args:
+        agent: SentinelOne agent
+
+    Returns:
+        Asset row with site_external_id instead of site_id, or None for
+        agents without an ID or site
+    """
+    if not agent.get("id") or not agent.get("siteId"):
+        return None
+
+    interface = _primary_interface(agent)
+    mac_address = interface.get("physical")
+    return {
+        "external_id": str(agent["id"]),
+        "external_system": EXTERNAL_SYSTEM,
+        "site_external_id": str(agent["siteId"]),
+        "name": agent.get("computerName") or str(agent["id"]),
+        "hostname": agent.get("computerName"),
+        "ip_address": agent.get("lastIpToMgmt") or next(iter(interface.get("inet") or []), None),
+        "mac_address": mac_address.lower() if mac_address else None,
+        "asset_type": MACHINE_TYPES.get((agent.get("machineType") or "").lower(), AssetType.OTHER),
+        "model": agent.get("modelName"),
+        "serial_number": agent.get("serialNumber"),
+        "os_type": agent.get("osType"),
+        "os_version": " ".join(part for part in (agent.get("osName"), agent.get("osRevision")) if part) or None,
+        "is_active": not agent.get("isDecommissioned", False),
+        "last_seen": _parse_timestamp(agent.get("lastActiveDate")),
+        "metadata": {
+            "sentinelone_agent_version": agent.get("agentVersion"),
+            "sentinelone_network_status": agent.get("networkStatus"),
+            "sentinelone_infected": agent.get("infected"),
+        },
+    }
+
+class SentinelOneAssetSync:
+    """
+    Incremental sync of SentinelOne agents to assets.
+
+    Agents are read oldest change first, so the watermark can advance to
+    the newest agent written even if a run stops part way through. Agents
+    whose site is unknown are skipped until the next full re-read.
+    """
+
+    def __init__(
+        self,
+        provider: SentinelOneProvider,
+        upsert_service: Optional[BulkUpsertService] = None,
+        batch_size: int = 1000
+    ):
+        """
+        Initialize the sync.
+
+        Args:
+            provider: SentinelOne provider to read from
+            upsert_service: Service writing the rows (default: the shared service)
+            batch_size: Rows per upsert batch and page size of the API reads
+        """
+        self.provider = provider
+        self.upsert_service = upsert_service or bulk_upsert_service
+        self.batch_size = batch_size
+
+    def _watermark_key(self, name: str = "agents") -> str:
+        """Get a watermark store key of this sync."""
+        return f"sentinelone:{self.provider.provider_id}:{name}"
+
+    async def _get_timestamp(self, name: str) -> Optional[datetime]:
+        """Get a stored timestamp of this sync."""
+        stored = await watermark_store.get(self._watermark_key(name))
+        return _parse_timestamp(stored) if stored else None
+
+    async def sync(self, full: bool = False) -> BulkUpsertResult:
+        """
+        Run one sync.
+
+        Args:
+            full: Ignore the watermark and re-read every agent
+
+        Returns:
+            Upsert counts
+
+        Raises:
+            Exception: If reading the agents fails; batches written so far are kept
+        """
+        if not self.provider.client:
+            logger.error("SentinelOne client not initialized")
+            return BulkUpsertResult()
+
+        now = datetime.now(timezone.utc)
+        last_full = await self._get_timestamp("agents-full")
+        full = full or last_full is None or (now - last_full).total_seconds() >= FULL_SYNC_INTERVAL_SECONDS
+        watermark = None if full else await self._get_timestamp("agents")
+
+        filters = {"sortBy": "updatedAt", "sortOrder": "asc"}
+        if watermark:
+            filters["updatedAt__gt"] = (watermark - timedelta(seconds=WATERMARK_OVERLAP_SECONDS)).isoformat()
+
+        result = BulkUpsertResult()
+        batch: List[Dict[str, Any]] = []
+        # Errors end the run, so a full re-read is only recorded once it completes
+        async for agent in self.provider.query_stream({
+            "query_type": "agents",
+            "filters": filters,
+            "limit": self.batch_size,
+            "raise_errors": True
+        }):
+            batch.append(agent)
+            if len(batch) >= self.batch_size:
+                result.merge(await self._write_batch(batch))
+                batch = []
+        if batch:
+            result.merge(await self._write_batch(batch))
+
+        if full:
+            await watermark_store.set(self._watermark_key("agents-full"), now.isoformat())
+
+        logger.info(
+            f"SentinelOne asset sync: {result.created} created, {result.updated} updated, "
+            f"{result.unchanged} unchanged, {result.skipped} skipped"
+        )
+        return result
+
+    async def _write_batch(self, agents: List[Dict[str, Any]]) -> BulkUpsertResult:
+        """
+        Upsert a batch of agents and advance the watermark past them.
+
+        Args:
+            agents: Raw agents, in updatedAt order
+
+        Returns:
+            Upsert counts
+        """
+        result = await self.upsert_service.upsert_assets(
+            [row for row in (map_agent(agent) for agent in agents) if row]
+        )
+
+        watermark = await self._get_timestamp("agents")
+        newest = watermark
+        for agent in agents:
+            updated_at = _parse_timestamp(agent.get("updatedAt"))
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+        if newest and newest != watermark:
+            await watermark_store.set(self._watermark_key(), newest.isoformat())
+
+        return result
+
+def create_sentinelone_sync() -> Optional[SentinelOneAssetSync]:
+    """
+    Create the sync from the SentinelOne settings.
+
+    Returns:
+        The sync, or None if SentinelOne is not configured
+    """
+    provider = get_configured_provider("sentinelone")
+    if provider is None:
+        logger.error("SentinelOne sync is enabled but the SentinelOne API token is not configured")
+        return None
+
+    return SentinelOneAssetSync(provider)
+
+def start_sentinelone_sync() -> Optional[PeriodicJob]:
+    """
+    Schedule the SentinelOne asset sync if it is enabled.
+
+    Returns:
+        The scheduled job, or None if the sync is disabled or not configured
+    """
+    if not settings.SENTINELONE_SYNC_ENABLED:
+        return None
+
+    sentinelone_sync = create_sentinelone_sync()
+    if sentinelone_sync is None:
+        return None
+
+    return schedule(PeriodicJob("sentinelone-asset-sync", settings.SENTINELONE_SYNC_INTERVAL_SECONDS, sentinelone_sync.sync))
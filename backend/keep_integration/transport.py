@@ -0,0 +1,269 @@
+"""
+Shared HTTP transport for MSP providers.
+
+This module builds the httpx clients used by the MSP providers. Every client
+gets a per-vendor token bucket, retries with exponential backoff and jitter
+on 429 and 5xx responses, explicit connection pool limits and HTTP/2 where
+the vendor supports it.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - HTTP/2 is optional
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to retry after the vendor may have processed them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+@dataclass(frozen=True)
+class TransportProfile:
+    """Rate limit, retry and connection settings for a vendor API."""
+
+    rate: float  # Sustained requests per second
+    burst: int  # Maximum requests sent back to back
+    http2: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    max_retries: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    timeout: float = 30.0
+
+# Vendor profiles, keyed by provider type
+VENDOR_PROFILES: Dict[str, TransportProfile] = {
+    "connectwise-manage": TransportProfile(rate=10.0, burst=20),
+    "sentinelone": TransportProfile(rate=20.0, burst=40, http2=True),
+    "veeam": TransportProfile(rate=20.0, burst=20, max_connections=10, max_keepalive_connections=5),
+    # IT Glue allows 3000 requests per 5 minutes
+    "itglue": TransportProfile(rate=10.0, burst=10, http2=True),
+}
+
+DEFAULT_PROFILE = TransportProfile(rate=10.0, burst=10)
+
+class TokenBucket:
+    """
+    Asynchronous token bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each request takes one token, waiting for a refill when none are left.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take a token, waiting until one is available."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# Buckets are shared by every client talking to the same vendor host, so
+# many tenants polling at once still respect the vendor throttle. They are
+# kept per event loop, since their locks can only be used by one loop.
+_buckets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], TokenBucket]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def get_bucket(vendor: str, host: str) -> TokenBucket:
+    """
+    Get the shared token bucket for a vendor host in the running event loop.
+
+    Args:
+        vendor: Provider type
+        host: Vendor API host
+
+    Returns:
+        Token bucket for the vendor host
+    """
+    buckets = _buckets.setdefault(asyncio.get_running_loop(), {})
+    key = (vendor, host)
+    if key not in buckets:
+        profile = VENDOR_PROFILES.get(vendor, DEFAULT_PROFILE)
+        buckets[key] = TokenBucket(profile.rate, profile.burst)
+    return buckets[key]
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport adding rate limiting and retries.
+
+    Wraps an inner transport. 429 responses are retried for every method
+    since the vendor rejected the request; 5xx responses and connection
+    errors are only retried for idempotent methods.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        get_bucket: Callable[[], TokenBucket],
+        profile: TransportProfile
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            transport: Inner transport sending the requests
+            get_bucket: Callable returning the token bucket limiting the request rate,
+                called for each request so the bucket belongs to the running event loop
+            profile: Retry settings
+        """
+        self._transport = transport
+        self._get_bucket = get_bucket
+        self._profile = profile
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Send a request, waiting for the rate limiter and retrying failures.
+
+        Args:
+            request: Request to send
+
+        Returns:
+            Response from the vendor
+        """
+        idempotent = request.method in IDEMPOTENT_METHODS
+        bucket = self._get_bucket()
+
+        for attempt in range(self._profile.max_retries + 1):
+            await bucket.acquire()
+            last_attempt = attempt == self._profile.max_retries
+
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # The request never reached the vendor, so it is safe to resend
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except httpx.TransportError:
+                if last_attempt or not idempotent:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUS_CODES)
+            if not retryable or last_attempt:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+
+            logger.warning(
+                f"{request.method} {request.url.path} returned {response.status_code}, "
+                f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self._profile.max_retries})"
+            )
+            await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Close the inner transport."""
+        await self._transport.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Get the exponential backoff delay with full jitter for an attempt.
+
+        Args:
+            attempt: Zero-based attempt number
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self._profile.backoff_max, self._profile.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        """
+        Get the delay requested by a Retry-After header.
+
+        Args:
+            response: Rate limited response
+
+        Returns:
+            Delay in seconds, or None if the header is missing or not numeric
+        """
+        try:
+            return min(self._profile.backoff_max, max(0.0, float(response.headers["Retry-After"])))
+        except (KeyError, ValueError):
+            return None
+
+def create_client(
+    vendor: str,
+    base_url: str,
+    headers: Optional[Dict[str, str]] = None,
+    verify: bool = True,
+    auth: Optional[httpx.Auth] = None
+) -> httpx.AsyncClient:
+    """
+    Create an HTTP client for a vendor API.
+
+    Args:
+        vendor: Provider type, used to pick the transport profile
+        base_url: Base URL of the vendor API
+        headers: Default request headers
+        verify: Whether to verify TLS certificates
+        auth: Optional httpx authentication flow
+
+    Returns:
+        Configured HTTP client
+    """
+    profile = VENDOR_PROFILES.get(vendor, DEFAULT_PROFILE)
+    http2 = profile.http2 and HTTP2_AVAILABLE
+
+    inner = httpx.AsyncHTTPTransport(
+        verify=verify,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=profile.max_connections,
+            max_keepalive_connections=profile.max_keepalive_connections,
+            keepalive_expiry=profile.keepalive_expiry
+        )
+    )
+    vendor_bucket = partial(get_bucket, vendor, urlsplit(base_url).netloc)
+
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        auth=auth,
+        timeout=profile.timeout,
+        transport=RateLimitedTransport(inner, vendor_bucket, profile)
+    )
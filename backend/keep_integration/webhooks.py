@@ -0,0 +1,198 @@
+"""
+Webhook receivers for push-based MSP alerts.
+
+This module lets ConnectWise Manage callbacks, SentinelOne notifications and
+Veeam alarms push alerts instead of being polled. Requests are verified,
+transformed with the providers' existing alert transforms and published to
+the durable ingestion queue before they are acknowledged, so an accepted
+alert survives a restart; processing happens in the ingestion consumers.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.core.config import settings
+from keep_integration.ingestion import get_ingestion_queue
+from keep_integration.providers.connectwise_provider import ConnectWiseManageProvider
+from keep_integration.providers.sentinelone_provider import SentinelOneProvider
+from keep_integration.providers.veeam_provider import VeeamProvider
+
+logger = logging.getLogger(__name__)
+
+# Router for webhook endpoints, mounted under the Keep API router
+webhook_router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+# Seconds to wait for room in a full ingestion queue before asking the
+# vendor to redeliver
+WEBHOOK_PUBLISH_TIMEOUT_SECONDS = 10
+
+# Signature header, digest encoding and secret setting for each webhook source
+WEBHOOK_SIGNATURES = {
+    "connectwise": ("x-content-signature", "base64", "CONNECTWISE_WEBHOOK_SECRET"),
+    "sentinelone": ("x-s1-signature", "hex", "SENTINELONE_WEBHOOK_SECRET"),
+    "veeam": ("x-veeam-signature", "hex", "VEEAM_WEBHOOK_SECRET"),
+}
+
+def verify_signature(source: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    Verify the HMAC-SHA256 signature of a webhook body.
+
+    Args:
+        source: Webhook source (connectwise, sentinelone, veeam)
+        body: Raw request body
+        signature: Signature sent by the vendor
+
+    Returns:
+        True if the signature matches the configured secret
+    """
+    _, encoding, secret_setting = WEBHOOK_SIGNATURES[source]
+    secret = getattr(settings, secret_setting, "")
+
+    if not secret or not signature:
+        return False
+
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+    expected = base64.b64encode(digest).decode() if encoding == "base64" else digest.hex()
+
+    # Some vendors prefix the digest with the algorithm name
+    signature = signature.split("=", 1)[1] if signature.startswith("sha256=") else signature
+
+    return hmac.compare_digest(expected, signature.strip())
+
+def transform_connectwise(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Transform a ConnectWise Manage callback to alerts.
+
+    Args:
+        payload: Callback payload with Type, Action and Entity
+
+    Returns:
+        Alerts for ticket callbacks
+    """
+    if str(payload.get("Type", "ticket")).lower() != "ticket" or payload.get("Action") == "deleted":
+        return []
+
+    entity = payload.get("Entity")
+    if isinstance(entity, str):
+        entity = json.loads(entity) if entity else None
+
+    if not isinstance(entity, dict) or not entity:
+        return []
+
+    return [ConnectWiseManageProvider._transform_ticket_to_alert(entity)]
+
+def transform_sentinelone(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Transform a SentinelOne notification to alerts.
+
+    Args:
+        payload: A threat, or a data envelope holding one or more threats
+
+    Returns:
+        Alerts for the threats in the notification
+    """
+    threats = payload.get("data", payload)
+    if isinstance(threats, dict):
+        threats = threats.get("threats", [threats])
+    if not isinstance(threats, list):
+        return []
+
+    return [
+        SentinelOneProvider._transform_threat_to_alert(threat) for threat in threats
+        if isinstance(threat, dict) and threat.get("id")
+    ]
+
+def transform_veeam(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Transform a Veeam alarm to alerts.
+
+    Args:
+        payload: Alarm holding a session and/or job
+
+    Returns:
+        Alerts for the sessions and jobs in the alarm
+    """
+    alerts = []
+    if payload.get("session"):
+        alerts.append(VeeamProvider._transform_session_to_alert(payload["session"]))
+    if payload.get("job"):
+        alerts.append(VeeamProvider._transform_job_to_alert(payload["job"]))
+    return alerts
+
+WEBHOOK_TRANSFORMS = {
+    "connectwise": transform_connectwise,
+    "sentinelone": transform_sentinelone,
+    "veeam": transform_veeam,
+}
+
+async def _accept(source: str, request: Request) -> Dict[str, Any]:
+    """
+    Verify a webhook request and publish its alerts to the ingestion queue.
+
+    Args:
+        source: Webhook source
+        request: Incoming request
+
+    Returns:
+        Acknowledgement body
+
+    Raises:
+        HTTPException: If the request is invalid, or the alerts cannot be published
+    """
+    header, _, _ = WEBHOOK_SIGNATURES[source]
+    body = await request.body()
+
+    if not verify_signature(source, body, request.headers.get(header)):
+        logger.warning(f"Rejected {source} webhook with invalid signature")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+
+    # Every vendor sends a single JSON object; the transforms expect one
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Webhook body must be a JSON object")
+
+    try:
+        alerts = WEBHOOK_TRANSFORMS[source](payload)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid webhook payload")
+
+    if alerts:
+        try:
+            await asyncio.wait_for(get_ingestion_queue().publish(alerts), WEBHOOK_PUBLISH_TIMEOUT_SECONDS)
+        except Exception as e:
+            # Ask the vendor to redeliver later instead of dropping the alerts
+            logger.error(f"Error publishing {source} webhook alerts: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Alert ingestion unavailable",
+                headers={"Retry-After": "30"}
+            )
+
+    logger.debug(f"Accepted {source} webhook with {len(alerts)} alerts")
+    return {"status": "accepted"}
+
+@webhook_router.post("/connectwise", status_code=status.HTTP_202_ACCEPTED)
+async def connectwise_webhook(request: Request):
+    """Receive a ConnectWise Manage callback."""
+    return await _accept("connectwise", request)
+
+@webhook_router.post("/sentinelone", status_code=status.HTTP_202_ACCEPTED)
+async def sentinelone_webhook(request: Request):
+    """Receive a SentinelOne notification."""
+    return await _accept("sentinelone", request)
+
+@webhook_router.post("/veeam", status_code=status.HTTP_202_ACCEPTED)
+async def veeam_webhook(request: Request):
+    """Receive a Veeam alarm."""
+    return await _accept("veeam", request)
@@ -0,0 +1,7 @@
+"""
+Workflow loading and matching for MSPAlwaysOn.
+"""
+
+from .executor import NodeResult, WorkflowExecutor, WorkflowPlan
+from .loader import TriggerIndex, Workflow, WorkflowLoader, workflow_loader
+from .templates import CompiledParameters, CompiledTemplate, compile_template
@@ -0,0 +1,286 @@
+"""
+Workflow executor for MSPAlwaysOn.
+
+This module runs the steps and actions of a workflow as a dependency
+graph. Dependencies are inferred from the ``steps.X`` and ``actions.X``
+references in each node's templates, and nodes whose dependencies have
+completed run concurrently. Calls are capped per provider type and
+bounded by a per-node timeout; nodes depending on a failed node are
+skipped.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from keep_integration.workflows.loader import Workflow
+from keep_integration.workflows.templates import CompiledParameters
+
+logger = logging.getLogger(__name__)
+
+# Default cap on concurrent calls per provider type
+DEFAULT_PROVIDER_CONCURRENCY = 5
+
+# Default seconds before a step or action is cancelled
+DEFAULT_NODE_TIMEOUT = 60
+
+# Provider config reference, e.g. "{{ providers.sentinelone }}"
+PROVIDER_CONFIG_REFERENCE = re.compile(r"^\s*{{\s*providers\.([\w-]+)\s*}}\s*$")
+
+NodeKey = Tuple[str, str]
+
+@dataclass
+class WorkflowNode:
+    """A compiled step or action."""
+
+    kind: str
+    name: str
+    provider_type: str
+    provider_config: Optional[str]
+    parameters: CompiledParameters
+    timeout: float
+    dependencies: Set[NodeKey] = field(default_factory=set)
+
+    @property
+    def key(self) -> NodeKey:
+        """Get the node key, e.g. ("steps", "get-endpoint-details")."""
+        return (self.kind, self.name)
+
+@dataclass
+class NodeResult:
+    """Outcome of a step or action."""
+
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+class WorkflowPlan:
+    """
+    Dependency graph of a workflow's steps and actions.
+    """
+
+    def __init__(self, workflow: Workflow, default_timeout: float = DEFAULT_NODE_TIMEOUT):
+        """
+        Compile a workflow into a dependency graph.
+
+        Args:
+            workflow: Loaded workflow
+            default_timeout: Seconds before a node without its own timeout is cancelled
+
+        Raises:
+            ValueError: If the workflow's references form a cycle
+        """
+        self.workflow_id = workflow.id
+        self.nodes: Dict[NodeKey, WorkflowNode] = {}
+
+        for kind in ("steps", "actions"):
+            for definition in workflow.definition.get(kind) or []:
+                node = self._compile_node(kind, definition, default_timeout)
+                self.nodes[node.key] = node
+
+        for node in self.nodes.values():
+            for path in node.parameters.paths:
+                if path[0] in ("steps", "actions") and len(path) > 1:
+                    dependency = (path[0], path[1])
+                    if dependency in self.nodes and dependency != node.key:
+                        node.dependencies.add(dependency)
+                    else:
+                        logger.warning(f"Workflow {workflow.id} {node.name} references unknown {path[0]}.{path[1]}")
+
+        self.order = self._topological_order()
+
+    @staticmethod
+    def _compile_node(kind: str, definition: Dict[str, Any], default_timeout: float) -> WorkflowNode:
+        """
+        Compile a step or action definition.
+
+        Args:
+            kind: "steps" or "actions"
+            definition: Node definition from the workflow
+            default_timeout: Timeout used if the node does not set one
+
+        Returns:
+            Compiled node
+        """
+        provider = definition.get("provider") or {}
+        config = provider.get("config")
+        config_match = PROVIDER_CONFIG_REFERENCE.match(config) if isinstance(config, str) else None
+
+        return WorkflowNode(
+            kind=kind,
+            name=definition.get("name", ""),
+            provider_type=provider.get("type", ""),
+            provider_config=config_match.group(1) if config_match else None,
+            parameters=CompiledParameters(provider.get("with")),
+            timeout=float(definition.get("timeout", default_timeout))
+        )
+
+    def _topological_order(self) -> List[NodeKey]:
+        """
+        Order nodes so each follows its dependencies.
+
+        Returns:
+            Node keys in dependency order
+
+        Raises:
+            ValueError: If the dependencies form a cycle
+        """
+        remaining = {key: set(node.dependencies) for key, node in self.nodes.items()}
+        order = []
+        while remaining:
+            ready = [key for key, dependencies in remaining.items() if not dependencies]
+            if not ready:
+                cycle = ", ".join(f"{kind}.{name}" for kind, name in remaining)
+                raise ValueError(f"Workflow {self.workflow_id} has a dependency cycle between {cycle}")
+            for key in ready:
+                del remaining[key]
+                order.append(key)
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+        return order
+
+ProviderResolver = Callable[[str, Optional[str]], Any]
+
+class WorkflowExecutor:
+    """
+    Executor running workflow plans with asyncio.
+
+    Steps call the provider's ``query`` and actions its ``notify`` with
+    the rendered ``with:`` parameters. Provider instances are obtained from
+    the resolver, which receives the provider type and the name of the
+    referenced provider config.
+    """
+
+    def __init__(
+        self,
+        get_provider: ProviderResolver,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = DEFAULT_PROVIDER_CONCURRENCY,
+        default_timeout: float = DEFAULT_NODE_TIMEOUT
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            get_provider: Callable returning a provider for a provider type and config name;
+                may return an awaitable
+            provider_concurrency: Concurrent call cap by provider type
+            default_concurrency: Cap for provider types not listed
+            default_timeout: Seconds before a node without its own timeout is cancelled
+        """
+        self.get_provider = get_provider
+        self.provider_concurrency = provider_concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.default_timeout = default_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._plans: Dict[str, Tuple[Workflow, WorkflowPlan]] = {}
+
+    def get_plan(self, workflow: Workflow) -> WorkflowPlan:
+        """
+        Get the compiled plan of a workflow, compiling each loaded version once.
+
+        Args:
+            workflow: Loaded workflow
+
+        Returns:
+            Workflow plan
+        """
+        cached = self._plans.get(workflow.id)
+        if cached and cached[0] is workflow:
+            return cached[1]
+
+        plan = WorkflowPlan(workflow, self.default_timeout)
+        self._plans[workflow.id] = (workflow, plan)
+        return plan
+
+    def _get_semaphore(self, provider_type: str) -> asyncio.Semaphore:
+        """Get the concurrency cap of a provider type."""
+        if provider_type not in self._semaphores:
+            limit = self.provider_concurrency.get(provider_type, self.default_concurrency)
+            self._semaphores[provider_type] = asyncio.Semaphore(limit)
+        return self._semaphores[provider_type]
+
+    async def execute(
+        self,
+        workflow: Workflow,
+        alert: Dict[str, Any],
+        providers: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, NodeResult]:
+        """
+        Run a workflow for an alert.
+
+        Args:
+            workflow: Workflow to run
+            alert: Alert that triggered the workflow
+            providers: Provider configs available to templates, by name
+
+        Returns:
+            Result of each node, keyed "steps.<name>" or "actions.<name>"
+        """
+        plan = self.get_plan(workflow)
+        outputs: Dict[str, Dict[str, Any]] = {"steps": {}, "actions": {}}
+        sources = {"alert": alert, "providers": providers or {}, **outputs}
+        tasks: Dict[NodeKey, asyncio.Task] = {}
+
+        for key in plan.order:
+            node = plan.nodes[key]
+            dependencies = [tasks[dependency] for dependency in node.dependencies]
+            tasks[key] = asyncio.ensure_future(self._run_node(node, dependencies, sources, outputs))
+
+        results = await asyncio.gather(*tasks.values())
+        return {f"{kind}.{name}": result for (kind, name), result in zip(tasks, results)}
+
+    async def _run_node(
+        self,
+        node: WorkflowNode,
+        dependencies: List[Awaitable[NodeResult]],
+        sources: Dict[str, Any],
+        outputs: Dict[str, Dict[str, Any]]
+    ) -> NodeResult:
+        """
+        Run a node once its dependencies have completed.
+
+        Args:
+            node: Node to run
+            dependencies: Tasks of the nodes it depends on
+            sources: Template context sources
+            outputs: Results of completed nodes, updated with this node's result
+
+        Returns:
+            Node result
+        """
+        dependency_results = await asyncio.gather(*dependencies)
+        if any(result.status != "success" for result in dependency_results):
+            return NodeResult(status="skipped", error="A dependency did not succeed")
+
+        start = time.monotonic()
+        try:
+            parameters = node.parameters.render(sources)
+            async with self._get_semaphore(node.provider_type):
+                provider = self.get_provider(node.provider_type, node.provider_config)
+                if asyncio.iscoroutine(provider):
+                    provider = await provider
+                call = provider.query if node.kind == "steps" else provider.notify
+                result = await asyncio.wait_for(call(parameters), node.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{node.kind[:-1].capitalize()} {node.name} timed out after {node.timeout}s")
+            return NodeResult(status="timeout", error=f"Timed out after {node.timeout}s", duration=time.monotonic() - start)
+        except Exception as e:
+            logger.error(f"Error running {node.kind[:-1]} {node.name}: {e}")
+            return NodeResult(status="failed", error=str(e), duration=time.monotonic() - start)
+
+        # Providers report notify failures in the result instead of raising
+        if isinstance(result, dict) and result.get("success") is False:
+            logger.error(f"{node.kind[:-1].capitalize()} {node.name} failed: {result.get('message')}")
+            return NodeResult(status="failed", result=result, error=result.get("message"), duration=time.monotonic() - start)
+
+        # Expose results as steps.X.results and actions.X.<field>
+        output = dict(result) if isinstance(result, dict) else {}
+        output["results"] = result
+        outputs[node.kind][node.name] = output
+
+        return NodeResult(status="success", result=result, duration=time.monotonic() - start)
@@ -0,0 +1,302 @@
+"""
+Workflow loader for MSPAlwaysOn.
+
+This module loads the YAML workflows and compiles their alert trigger
+filters into an inverted index from (key, value) to triggers. Matching an
+alert only touches the triggers indexed under the alert's own field
+values instead of evaluating every workflow. The workflow directory is
+polled for changes and the index is rebuilt when a file changes.
+"""
+
+import asyncio
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple
+
+import yaml
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Filter values written as r"..." are regular expressions, as in Keep;
+# all other values match literally
+REGEX_VALUE = re.compile(r"""r(["'])(.*)\1""", re.DOTALL)
+
+@dataclass
+class Workflow:
+    """A loaded workflow definition."""
+
+    id: str
+    name: str
+    description: str
+    triggers: List[Dict[str, Any]]
+    path: str
+    definition: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_definition(cls, definition: Dict[str, Any], path: str) -> "Workflow":
+        """
+        Create a workflow from a parsed YAML document.
+
+        Args:
+            definition: Parsed document, with or without a top-level "workflow" key
+            path: File the workflow was loaded from
+
+        Returns:
+            Workflow
+        """
+        workflow = definition.get("workflow", definition)
+        return cls(
+            id=str(workflow.get("id") or os.path.splitext(os.path.basename(path))[0]),
+            name=workflow.get("name", ""),
+            description=workflow.get("description", ""),
+            triggers=workflow.get("triggers") or [],
+            path=path,
+            definition=workflow
+        )
+
+class TriggerIndex:
+    """
+    Inverted index of alert trigger filters.
+
+    Filters of a trigger must all match (AND); any matching trigger selects
+    its workflow (OR). Each (key, value) filter is indexed by exact value,
+    so matching counts hits per trigger and selects those whose every filter
+    was hit. Regex filter values, written as r"...", are kept in a short
+    per-key list.
+    """
+
+    def __init__(self, workflows: List[Workflow]):
+        """
+        Compile the triggers of the given workflows.
+
+        Args:
+            workflows: Loaded workflows
+        """
+        self.workflows: Dict[str, Workflow] = {}
+        self._exact: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self._patterns: Dict[str, List[Tuple[Pattern, int]]] = defaultdict(list)
+        self._filter_counts: List[int] = []
+        self._trigger_workflows: List[str] = []
+        self._match_all: List[str] = []
+
+        for workflow in workflows:
+            self.workflows[workflow.id] = workflow
+            for trigger in workflow.triggers:
+                if trigger.get("type") == "alert":
+                    self._add_trigger(workflow.id, trigger.get("filters") or [])
+
+        self.keys = {key for key, _ in self._exact} | set(self._patterns)
+
+    def _add_trigger(self, workflow_id: str, filters: List[Dict[str, Any]]):
+        """
+        Index an alert trigger.
+
+        Args:
+            workflow_id: Workflow ID
+            filters: Trigger filters with key and value
+        """
+        if not filters:
+            self._match_all.append(workflow_id)
+            return
+
+        trigger_id = len(self._trigger_workflows)
+        self._trigger_workflows.append(workflow_id)
+        self._filter_counts.append(len(filters))
+
+        for trigger_filter in filters:
+            key = str(trigger_filter.get("key"))
+            value = str(trigger_filter.get("value"))
+            regex = REGEX_VALUE.fullmatch(value)
+            if regex:
+                try:
+                    self._patterns[key].append((re.compile(regex.group(2)), trigger_id))
+                    continue
+                except re.error:
+                    logger.warning(f"Invalid regex filter {key}={value} in workflow {workflow_id}, matching literally")
+            self._exact[(key, value)].append(trigger_id)
+
+    def match(self, alert: Dict[str, Any]) -> List[Workflow]:
+        """
+        Get the workflows triggered by an alert.
+
+        Args:
+            alert: Alert
+
+        Returns:
+            Triggered workflows
+        """
+        hits: Dict[int, int] = defaultdict(int)
+        for key in self.keys:
+            values = _get_field(alert, key)
+            if values is None:
+                continue
+
+            matched = set()
+            for value in values:
+                matched.update(self._exact.get((key, value), ()))
+                for pattern, trigger_id in self._patterns.get(key, ()):
+                    if pattern.fullmatch(value):
+                        matched.add(trigger_id)
+
+            # A filter counts once even if several list values match it
+            for trigger_id in matched:
+                hits[trigger_id] += 1
+
+        workflow_ids = list(self._match_all)
+        for trigger_id, count in hits.items():
+            if count >= self._filter_counts[trigger_id]:
+                workflow_ids.append(self._trigger_workflows[trigger_id])
+
+        return [self.workflows[workflow_id] for workflow_id in dict.fromkeys(workflow_ids)]
+
+def _get_field(alert: Dict[str, Any], key: str) -> Optional[List[str]]:
+    """
+    Get the string values of a possibly dotted alert field.
+
+    Args:
+        alert: Alert
+        key: Field name, e.g. "severity" or "labels.company"
+
+    Returns:
+        String values of the field, or None if it is missing
+    """
+    value: Any = alert
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+
+    if isinstance(value, (list, tuple, set)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+class WorkflowLoader:
+    """
+    Loader keeping the workflows of a directory and their trigger index.
+
+    Only files whose modification time changed are parsed again; the index
+    is rebuilt and swapped in one step so matching never sees a partial
+    index.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 5):
+        """
+        Initialize the workflow loader.
+
+        Args:
+            directory: Directory holding the workflow YAML files
+            poll_interval: Seconds between checks for changed files
+        """
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.index = TriggerIndex([])
+        self._files: Dict[str, Tuple[int, List[Workflow]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def workflows(self) -> Dict[str, Workflow]:
+        """Get the loaded workflows by ID."""
+        return self.index.workflows
+
+    def match(self, alert: Dict[str, Any]) -> List[Workflow]:
+        """
+        Get the workflows triggered by an alert.
+
+        Args:
+            alert: Alert
+
+        Returns:
+            Triggered workflows
+        """
+        return self.index.match(alert)
+
+    def reload(self) -> bool:
+        """
+        Reload changed, added and removed workflow files.
+
+        Returns:
+            True if any file changed and the index was rebuilt
+        """
+        mtimes = dict(self._scan())
+        if mtimes.keys() == self._files.keys() and all(
+            self._files[path][0] == mtime for path, mtime in mtimes.items()
+        ):
+            return False
+
+        files = {}
+        for path, mtime in mtimes.items():
+            cached = self._files.get(path)
+            files[path] = cached if cached and cached[0] == mtime else (mtime, self._load_file(path))
+
+        workflows = [workflow for _, loaded in files.values() for workflow in loaded]
+        self.index = TriggerIndex(workflows)
+        self._files = files
+        logger.info(f"Loaded {len(self.index.workflows)} workflows from {self.directory}")
+        return True
+
+    def _scan(self) -> Iterator[Tuple[str, int]]:
+        """Yield the path and modification time of each workflow file."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            logger.warning(f"Workflow directory {self.directory} does not exist")
+            return
+
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith((".yml", ".yaml")):
+                yield entry.path, entry.stat().st_mtime_ns
+
+    def _load_file(self, path: str) -> List[Workflow]:
+        """
+        Parse the workflows of a file.
+
+        Args:
+            path: YAML file path
+
+        Returns:
+            Workflows in the file; empty if the file is invalid
+        """
+        try:
+            with open(path) as f:
+                return [
+                    Workflow.from_definition(document, path)
+                    for document in yaml.safe_load_all(f)
+                    if isinstance(document, dict)
+                ]
+        except Exception as e:
+            logger.error(f"Error loading workflow file {path}: {e}")
+            return []
+
+    async def _watch(self):
+        """Poll the directory for changes until cancelled."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                # Stat and parse off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.reload)
+            except Exception as e:
+                logger.error(f"Error reloading workflows: {e}")
+
+    def start_watching(self):
+        """Load the workflows and start reloading them on change."""
+        self.reload()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._watch())
+
+    async def stop_watching(self):
+        """Stop reloading workflows on change."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Singleton instance
+workflow_loader = WorkflowLoader(settings.WORKFLOWS_DIR)
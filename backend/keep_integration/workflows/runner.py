@@ -0,0 +1,96 @@
+"""
+Workflow runs for ingested alerts.
+
+This module connects the alert ingestion pipeline to the workflows: each
+alert handed on by the ingestion consumer is matched against the loaded
+workflow triggers, and every triggered workflow is run with the workflow
+executor, using the providers configured in the settings.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from keep_integration.providers.configured import get_configured_provider
+from keep_integration.workflows.executor import WorkflowExecutor
+from keep_integration.workflows.loader import Workflow, WorkflowLoader, workflow_loader
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def resolve_configured_provider(provider_type: str, config_name: Optional[str]):
+    """
+    Resolve a workflow node's provider to the provider configured in the settings.
+
+    Args:
+        provider_type: Provider type of the node
+        config_name: Name of the referenced provider config (unused; one config per type)
+
+    Returns:
+        Provider instance
+
+    Raises:
+        ValueError: If the provider type is not configured
+    """
+    provider = get_configured_provider(provider_type)
+    if provider is None:
+        raise ValueError(f"Provider {provider_type} is not configured")
+    return provider
+
+class WorkflowRunner:
+    """
+    Runner executing the workflows triggered by batches of alerts.
+
+    Runs are isolated from each other and from the ingestion consumer:
+    a failing run is logged and never fails the batch, so a redelivered
+    batch does not repeat actions that already ran.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[WorkflowLoader] = None,
+        executor: Optional[WorkflowExecutor] = None,
+        concurrency: int = 10
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            loader: Workflow loader matching alerts to workflows (default: the shared loader)
+            executor: Workflow executor (default: one using the configured providers)
+            concurrency: Maximum number of concurrent workflow runs
+        """
+        self.loader = loader or workflow_loader
+        self.executor = executor or WorkflowExecutor(resolve_configured_provider)
+        self.concurrency = concurrency
+
+    async def handle(self, alerts: List[Dict[str, Any]]):
+        """
+        Run the workflows triggered by a batch of alerts.
+
+        Args:
+            alerts: Alerts from the ingestion pipeline
+        """
+        runs = [(workflow, alert) for alert in alerts for workflow in self.loader.match(alert)]
+        if not runs:
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(workflow: Workflow, alert: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    results = await self.executor.execute(workflow, alert)
+                except Exception as e:
+                    logger.error(f"Error running workflow {workflow.id} for alert {alert.get('fingerprint')}: {e}")
+                    return
+
+                failed = [key for key, result in results.items() if result.status != "success"]
+                if failed:
+                    logger.warning(f"Workflow {workflow.id} for alert {alert.get('fingerprint')} did not complete: {', '.join(failed)}")
+
+        await asyncio.gather(*(run(workflow, alert) for workflow, alert in runs))
+
+# Singleton instance
+workflow_runner = WorkflowRunner(concurrency=settings.WORKFLOW_RUN_CONCURRENCY)
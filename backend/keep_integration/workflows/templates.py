@@ -0,0 +1,231 @@
+"""
+Workflow templates for MSPAlwaysOn.
+
+This module compiles the Jinja templates in workflow ``with:`` blocks once
+and caches them by content hash, so rendering an action for an alert only
+runs precompiled code. Templates run in a sandboxed environment. The
+variables each template references are extracted from its syntax tree, so
+callers only build the parts of the context that are actually used.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, Union
+
+from jinja2 import ChainableUndefined, meta, nodes
+from jinja2.sandbox import SandboxedEnvironment
+
+from keep_integration.cache import MISSING, LRUCache
+
+# Context roots whose dotted paths may contain hyphenated names
+CONTEXT_ROOTS = ("alert", "incident", "steps", "actions", "providers")
+
+# Template expressions and statements
+TEMPLATE_BLOCK = re.compile(r"({{.*?}}|{%.*?%})", re.DOTALL)
+
+# Dotted paths under a context root, e.g. steps.get-endpoint-details.results
+DOTTED_PATH = re.compile(r"\b(" + "|".join(CONTEXT_ROOTS) + r")((?:\.[A-Za-z_][\w-]*)+)")
+
+# Missing attributes render empty and work with default() at any depth
+_environment = SandboxedEnvironment(undefined=ChainableUndefined, autoescape=False)
+
+_template_cache = LRUCache(maxsize=10000, ttl=86400)
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A compiled template and the context it references."""
+
+    source: str
+    template: Any
+    variables: FrozenSet[str]
+    paths: FrozenSet[Tuple[str, ...]]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """
+        Render the template.
+
+        Args:
+            context: Template context
+
+        Returns:
+            Rendered string
+        """
+        return self.template.render(context)
+
+def is_template(value: Any) -> bool:
+    """
+    Check whether a value contains template syntax.
+
+    Args:
+        value: Parameter value
+
+    Returns:
+        True if the value is a string with an expression or statement
+    """
+    return isinstance(value, str) and ("{{" in value or "{%" in value)
+
+def _subscript_hyphenated(match: re.Match) -> str:
+    """Rewrite a dotted path so hyphenated names become subscripts."""
+    root, path = match.group(1), match.group(2)
+    parts = []
+    for name in path[1:].split("."):
+        parts.append(f'["{name}"]' if "-" in name else f".{name}")
+    return root + "".join(parts)
+
+def rewrite_hyphenated_paths(source: str) -> str:
+    """
+    Rewrite hyphenated names in template paths to subscripts.
+
+    Workflow paths such as ``steps.get-endpoint-details.results`` would
+    otherwise parse as subtraction.
+
+    Args:
+        source: Template source
+
+    Returns:
+        Template source Jinja can parse
+    """
+    return TEMPLATE_BLOCK.sub(lambda block: DOTTED_PATH.sub(_subscript_hyphenated, block.group(0)), source)
+
+def _extract_paths(ast: nodes.Template) -> FrozenSet[Tuple[str, ...]]:
+    """
+    Extract the constant attribute paths referenced by a template.
+
+    Args:
+        ast: Parsed template
+
+    Returns:
+        Paths such as ("steps", "get-endpoint-details", "results")
+    """
+    paths = set()
+    for node in ast.find_all((nodes.Getattr, nodes.Getitem)):
+        path = []
+        current = node
+        while isinstance(current, (nodes.Getattr, nodes.Getitem)):
+            if isinstance(current, nodes.Getattr):
+                path.append(current.attr)
+            elif isinstance(current.arg, nodes.Const) and isinstance(current.arg.value, str):
+                path.append(current.arg.value)
+            else:
+                path = []
+            current = current.node
+        if isinstance(current, nodes.Name) and path:
+            paths.add((current.name, *reversed(path)))
+
+    # Keep only the longest path of each chain
+    return frozenset(
+        path for path in paths
+        if not any(other != path and other[:len(path)] == path for other in paths)
+    )
+
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Compile a template, reusing the compiled template for identical sources.
+
+    Args:
+        source: Template source
+
+    Returns:
+        Compiled template
+    """
+    key = hashlib.sha256(source.encode()).hexdigest()
+    compiled = _template_cache.get(key)
+    if compiled is not MISSING:
+        return compiled
+
+    rewritten = rewrite_hyphenated_paths(source)
+    ast = _environment.parse(rewritten)
+    compiled = CompiledTemplate(
+        source=source,
+        template=_environment.from_string(ast),
+        variables=frozenset(meta.find_undeclared_variables(ast)),
+        paths=_extract_paths(ast)
+    )
+    _template_cache.set(key, compiled)
+    return compiled
+
+ContextSource = Union[Any, Callable[[], Any]]
+
+class CompiledParameters:
+    """
+    Precompiled ``with:`` block of a workflow step or action.
+
+    Strings containing templates are compiled once; other values are kept
+    as they are. Nested dictionaries and lists are supported.
+    """
+
+    def __init__(self, parameters: Optional[Dict[str, Any]]):
+        """
+        Compile a parameter block.
+
+        Args:
+            parameters: Parameters from the workflow definition
+        """
+        self.parameters = self._compile(parameters or {})
+        self.variables: FrozenSet[str] = frozenset()
+        self.paths: FrozenSet[Tuple[str, ...]] = frozenset()
+        for template in self._templates(self.parameters):
+            self.variables |= template.variables
+            self.paths |= template.paths
+
+    def _compile(self, value: Any) -> Any:
+        """Compile the templates in a parameter value."""
+        if is_template(value):
+            return compile_template(value)
+        if isinstance(value, dict):
+            return {key: self._compile(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._compile(item) for item in value]
+        return value
+
+    def _templates(self, value: Any):
+        """Yield the compiled templates in a parameter value."""
+        if isinstance(value, CompiledTemplate):
+            yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from self._templates(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from self._templates(item)
+
+    def build_context(self, sources: Dict[str, ContextSource]) -> Dict[str, Any]:
+        """
+        Build the context for the referenced variables only.
+
+        Args:
+            sources: Context values, or callables producing them, by variable name
+
+        Returns:
+            Context holding the referenced variables
+        """
+        context = {}
+        for name in self.variables:
+            if name in sources:
+                value = sources[name]
+                context[name] = value() if callable(value) else value
+        return context
+
+    def render(self, sources: Dict[str, ContextSource]) -> Dict[str, Any]:
+        """
+        Render the parameters.
+
+        Args:
+            sources: Context values, or callables producing them, by variable name
+
+        Returns:
+            Parameters with templates rendered
+        """
+        context = self.build_context(sources)
+        return self._render(self.parameters, context)
+
+    def _render(self, value: Any, context: Dict[str, Any]) -> Any:
+        """Render the templates in a parameter value."""
+        if isinstance(value, CompiledTemplate):
+            return value.render(context)
+        if isinstance(value, dict):
+            return {key: self._render(item, context) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._render(item, context) for item in value]
+        return value
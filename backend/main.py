@@ -16,6 +16,15 @@ from app.core.config import settings
 # Import Keep.dev integration
 from keep_integration import initialize_keep_integration
 from keep_integration.api import keep_api_router
+from keep_integration.ingestion import register_alert_handler, start_ingestion_consumer, stop_ingestion_consumer
+from keep_integration.providers.configured import close_configured_providers
+from keep_integration.registry import registry
+from keep_integration.sync import stop_scheduled_jobs
+from keep_integration.sync.alerts import start_alert_polling
+from keep_integration.sync.connectwise import start_connectwise_sync
+from keep_integration.sync.sentinelone import start_sentinelone_sync
+from keep_integration.workflows import workflow_loader
+from keep_integration.workflows.runner import workflow_runner
 
 # Configure environment variables
 # Load from .env file if available
@@ -73,10 +82,26 @@ async def startup_event():
     print("Starting MSPAlwaysOn API...")
     # Initialize Keep.dev integration
     initialize_keep_integration()
+    # Load workflows and reload them when their files change
+    workflow_loader.start_watching()
+    # Precompute the provider and workflow listings
+    registry.build()
+    # Run triggered workflows for alerts from the ingestion queue
+    register_alert_handler(workflow_runner.handle)
+    await start_ingestion_consumer(settings.INGESTION_CONSUMER_NAME or None)
+    # Poll providers for alerts missed by webhooks
+    start_alert_polling()
+    # Schedule incremental syncs of external systems
+    start_connectwise_sync()
+    start_sentinelone_sync()
     # Initialize database connections, etc.
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown."""
     print("Shutting down MSPAlwaysOn API...")
+    await stop_scheduled_jobs()
+    await stop_ingestion_consumer()
+    await workflow_loader.stop_watching()
+    await close_configured_providers()
     # Clean up resources
@@ -0,0 +1,74 @@
+"""
+Tests for scheduled alert polling.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from keep_integration.ingestion import InMemoryIngestionQueue
+from keep_integration.state import WatermarkStore
+from keep_integration.sync.alerts import AlertPoller
+
+def threat(threat_id: str, updated_at: str, resolved: bool = False):
+    """Create a threat alert as transformed by the SentinelOne provider."""
+    return {
+        "id": threat_id,
+        "fingerprint": f"sentinelone-{threat_id}",
+        "status": "resolved" if resolved else "firing",
+        "raw_data": {"id": threat_id, "createdAt": "2024-01-01T09:00:00Z", "updatedAt": updated_at}
+    }
+
+class FakeSentinelOne:
+    """SentinelOne provider streaming queued threats and recording the queries."""
+
+    def __init__(self, *polls):
+        self.provider_id = "test-s1"
+        self.polls = list(polls)
+        self.queries = []
+
+    async def query_stream(self, query_params):
+        self.queries.append(query_params)
+        for alert in self.polls.pop(0):
+            yield alert
+
+@pytest.mark.asyncio
+async def test_threats_are_polled_by_update_time():
+    """Test that threats are read in updatedAt order from the newest update published, less the overlap."""
+    provider = FakeSentinelOne(
+        [threat("1", "2024-01-01T10:00:00Z"), threat("2", "2024-01-01T10:05:00Z")],
+        [threat("1", "2024-01-01T11:00:00Z", resolved=True)]
+    )
+    queue = InMemoryIngestionQueue()
+    store = WatermarkStore()
+    poller = AlertPoller("sentinelone", provider)
+
+    with patch("keep_integration.sync.alerts.get_ingestion_queue", return_value=queue), \
+            patch("keep_integration.sync.alerts.watermark_store", store):
+        assert await poller.poll() == 2
+        # A threat resolved after creation is read again
+        assert await poller.poll() == 1
+
+    first, second = [query["filters"] for query in provider.queries]
+    assert first == {"sortBy": "updatedAt", "sortOrder": "asc"}
+    assert second["updatedAt__gt"] == "2024-01-01T10:03:00+00:00"
+    assert await store.get("sentinelone:test-s1:alert-poll") == "2024-01-01T11:00:00+00:00"
+    assert await queue.backlog() == 3
+
+@pytest.mark.asyncio
+async def test_failed_poll_keeps_the_watermark():
+    """Test that a failed poll does not advance the watermark."""
+    class FailingSentinelOne(FakeSentinelOne):
+        async def query_stream(self, query_params):
+            raise RuntimeError("SentinelOne unavailable")
+            yield
+
+    store = WatermarkStore()
+    await store.set("sentinelone:test-s1:alert-poll", "2024-01-01T10:00:00+00:00")
+    poller = AlertPoller("sentinelone", FailingSentinelOne())
+
+    with patch("keep_integration.sync.alerts.get_ingestion_queue", return_value=InMemoryIngestionQueue()), \
+            patch("keep_integration.sync.alerts.watermark_store", store):
+        with pytest.raises(RuntimeError):
+            await poller.poll()
+
+    assert await store.get("sentinelone:test-s1:alert-poll") == "2024-01-01T10:00:00+00:00"
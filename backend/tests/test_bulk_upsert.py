@@ -0,0 +1,113 @@
+"""
+Tests for the bulk upsert service.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from app.models.site import Site
+from app.services.bulk_upsert import BulkUpsertService
+
+class FakeResult:
+    """Statement result returning fixed rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    """Session answering each statement with the next queued result."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else [])
+
+    async def commit(self):
+        self.commits += 1
+
+def returned(*inserted):
+    """Create rows returned by an upsert, one per written row."""
+    return [SimpleNamespace(id=index, inserted=flag) for index, flag in enumerate(inserted, 1)]
+
+@pytest.mark.asyncio
+async def test_upsert_groups_rows_by_columns_and_counts_results():
+    """Test that rows are grouped by columns, deduplicated and counted per chunk."""
+    # The first group writes one new and one changed row, the second is unchanged
+    session = FakeSession([returned(True, False), returned()])
+    service = BulkUpsertService(session_factory=lambda: session)
+
+    with patch.object(service, "_upsert_chunk", wraps=service._upsert_chunk) as upsert_chunk:
+        result = await service.upsert(Site, [
+            {"external_id": "1", "name": "HQ", "client_id": 1},
+            {"external_id": 2, "name": "Branch", "client_id": 1},
+            {"external_id": "3", "name": "Lab", "client_id": 1, "city": "Boston"},
+            {"external_id": "1", "name": "Head Office", "client_id": 1},
+            {"name": "No ID", "client_id": 1},
+        ])
+
+    chunks = [call.args[2] for call in upsert_chunk.call_args_list]
+    assert [[row["external_id"] for row in chunk] for chunk in chunks] == [["1", "2"], ["3"]]
+    # The last row with an external ID wins
+    assert chunks[0][0]["name"] == "Head Office"
+    assert all(len(row["content_hash"]) == 64 for chunk in chunks for row in chunk)
+
+    assert (result.created, result.updated, result.unchanged, result.skipped) == (1, 1, 1, 1)
+    assert session.commits == 2
+
+@pytest.mark.asyncio
+async def test_upsert_limits_chunks_to_bind_parameters():
+    """Test that chunks stay below PostgreSQL's bind parameter limit."""
+    session = FakeSession([])
+    service = BulkUpsertService(session_factory=lambda: session, chunk_size=1000)
+    rows = [{"external_id": str(index), "name": f"Site {index}", "client_id": 1} for index in range(5)]
+
+    # external_id, name, client_id and content_hash: 4 parameters per row
+    with patch("app.services.bulk_upsert.MAX_BIND_PARAMETERS", 8), \
+            patch.object(service, "_upsert_chunk", wraps=service._upsert_chunk) as upsert_chunk:
+        result = await service.upsert(Site, rows)
+
+    assert [len(call.args[2]) for call in upsert_chunk.call_args_list] == [2, 2, 1]
+    assert result.unchanged == 5
+
+@pytest.mark.asyncio
+async def test_upsert_rejects_unknown_columns():
+    """Test that rows with columns the table does not have are rejected before writing."""
+    session = FakeSession([])
+    service = BulkUpsertService(session_factory=lambda: session)
+
+    with pytest.raises(ValueError, match="Unknown sites columns: colour"):
+        await service.upsert(Site, [{"external_id": "1", "name": "HQ", "colour": "blue"}])
+
+    assert session.statements == []
+
+@pytest.mark.asyncio
+async def test_upsert_with_parent_skips_unknown_parents():
+    """Test that child rows resolve their parent by external ID and rows with unknown parents are skipped."""
+    service = BulkUpsertService(session_factory=lambda: FakeSession([returned(True)]))
+    service.resolve_external_ids = AsyncMock(return_value={"c1": 7})
+
+    with patch.object(service, "_upsert_chunk", wraps=service._upsert_chunk) as upsert_chunk:
+        result = await service.upsert_sites([
+            {"external_id": "s1", "name": "HQ", "client_external_id": "c1"},
+            {"external_id": "s2", "name": "Branch", "client_external_id": "c2"},
+        ])
+
+    chunk = upsert_chunk.call_args.args[2]
+    assert [(row["external_id"], row["client_id"]) for row in chunk] == [("s1", 7)]
+    assert "client_external_id" not in chunk[0]
+    assert (result.created, result.skipped) == (1, 1)
+    assert result.errors == ["sites s2: unknown clients c2"]
@@ -0,0 +1,105 @@
+"""
+Tests for the client mapping service.
+"""
+
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.client_mapping import ClientMappingService
+
+def client(client_id, name, updated_at, external_id=None):
+    """Create a client row."""
+    return SimpleNamespace(
+        id=client_id,
+        name=name,
+        external_id=external_id,
+        external_system="connectwise" if external_id else None,
+        is_active=True,
+        metadata={},
+        updated_at=updated_at,
+        created_at=updated_at
+    )
+
+class FakeSession:
+    """Session answering each query with the next queued list of clients."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.queries += 1
+        rows = self.results.pop(0) if self.results else []
+        return SimpleNamespace(
+            scalars=lambda: SimpleNamespace(all=lambda: rows),
+            first=lambda: rows[0] if rows else None
+        )
+
+    async def commit(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_lookups_are_served_from_the_snapshot():
+    """Test that clients are loaded once and then looked up without queries."""
+    session = FakeSession([[client(1, "Acme", datetime(2024, 1, 1), external_id="250")]])
+    service = ClientMappingService(session_factory=session)
+
+    assert (await service.get_client("1")).name == "Acme"
+    assert (await service.get_by_external_id("connectwise", 250)).id == 1
+    assert await service.get_client("not-an-id") is None
+    assert session.queries == 1
+
+@pytest.mark.asyncio
+async def test_miss_refreshes_incrementally():
+    """Test that a lookup miss loads clients created since the last refresh."""
+    session = FakeSession([
+        [client(1, "Acme", datetime(2024, 1, 1))],
+        [client(2, "Globex", datetime(2024, 1, 2))]
+    ])
+    service = ClientMappingService(session_factory=session, miss_refresh_interval=0)
+
+    assert (await service.get_client(2)).name == "Globex"
+    assert (await service.get_client(1)).name == "Acme"
+    assert service._watermark == datetime(2024, 1, 2)
+    assert session.queries == 2
+
+@pytest.mark.asyncio
+async def test_invalidated_clients_are_reloaded_or_dropped():
+    """Test that invalidated clients are reloaded, and dropped once deleted."""
+    session = FakeSession([
+        [client(1, "Acme", datetime(2024, 1, 1)), client(2, "Globex", datetime(2024, 1, 1))],
+        [client(1, "Acme Corp", datetime(2024, 1, 3))]
+    ])
+    service = ClientMappingService(session_factory=session, miss_refresh_interval=3600)
+    await service.get_client(1)
+
+    service.invalidate(1)
+    service.invalidate(2)
+
+    assert (await service.get_client(1)).name == "Acme Corp"
+    assert await service.get_client(2) is None
+    assert session.queries == 2
+
+@pytest.mark.asyncio
+async def test_update_metadata_merges_in_one_statement():
+    """Test that metadata is merged with a single UPDATE and the client is reloaded."""
+    session = FakeSession([[client(1, "Acme", datetime(2024, 1, 1))], [(1,)], []])
+    service = ClientMappingService(session_factory=session, miss_refresh_interval=3600)
+    await service.get_client(1)
+
+    assert await service.update_metadata(1, {"itglue_organization_id": "10"}) is True
+    assert await service.update_metadata(2, {"itglue_organization_id": "11"}) is False
+
+    # One load and one statement per update, without reading the client first
+    assert session.queries == 3
+    assert service._stale_ids == {1}
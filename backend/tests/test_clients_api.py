@@ -0,0 +1,101 @@
+"""
+Tests for the client API endpoints.
+"""
+
+import base64
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from app.api.endpoints.clients import decode_cursor, encode_cursor, get_clients, search_clients
+
+def client(client_id, name):
+    """Create a client row."""
+    return SimpleNamespace(id=client_id, name=name, created_at=datetime(2024, 1, 1))
+
+class FakeResult:
+    """Result of a statement over a list of rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: self.rows)
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+class FakeDB:
+    """Database session answering each statement with the next queued result."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else [])
+
+def test_cursor_round_trip():
+    """Test that cursors decode to the name and ID they were encoded from."""
+    for name, client_id in [("Acme", 1), ("Müller & Söhne, \"GmbH\"", 42), ("", 7)]:
+        cursor = encode_cursor(name, client_id)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (name, client_id)
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'["Acme"]').decode(),
+    base64.urlsafe_b64encode(b'["Acme", "one"]').decode(),
+    base64.urlsafe_b64encode(b'{"name": "Acme"}').decode(),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    """Test that malformed cursors are rejected with 400."""
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_clients_returns_next_cursor_after_the_last_item():
+    """Test that a full page links to the next one through the last client's cursor."""
+    clients = [client(index, f"Client {index}") for index in range(3)]
+    db = FakeDB(clients)
+
+    page = await get_clients(db=db, cursor=None, limit=2, name=None, is_active=None, include_total=False, current_user=None)
+
+    assert [client.id for client in page.items] == [0, 1]
+    assert decode_cursor(page.next_cursor) == ("Client 1", 1)
+
+@pytest.mark.asyncio
+async def test_get_clients_last_page_has_no_cursor():
+    """Test that the last page has no next cursor."""
+    db = FakeDB([client(1, "Acme")])
+
+    page = await get_clients(
+        db=db, cursor=encode_cursor("Aardvark", 9), limit=2, name=None, is_active=None, include_total=False, current_user=None
+    )
+
+    assert [client.id for client in page.items] == [1]
+    assert page.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_search_clients_sets_threshold_and_returns_ranked_rows():
+    """Test that search sets the similarity threshold before the query and returns its rows in order."""
+    rows = [
+        SimpleNamespace(_mapping={"id": 1, "name": "Acme", "external_id": None, "is_active": True, "score": 1.0}),
+        SimpleNamespace(_mapping={"id": 2, "name": "Acme Labs", "external_id": "250", "is_active": True, "score": 0.8}),
+    ]
+    db = FakeDB([], rows)
+
+    results = await search_clients(q=" acme ", limit=20, is_active=None, db=db, current_user=None)
+
+    assert "word_similarity_threshold" in str(db.statements[0])
+    assert [result.id for result in results] == [1, 2]
+    assert results[1].external_id == "250"
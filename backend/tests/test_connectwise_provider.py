@@ -9,6 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from keep.providers.models.provider_config import ProviderConfig
 from keep_integration.providers.connectwise_provider import ConnectWiseManageProvider
+from keep_integration.state import WatermarkStore
 
 # Test data
 TEST_PROVIDER_ID = "test-connectwise-provider"
@@ -171,3 +172,158 @@ async def test_add_ticket_note(provider):
     assert kwargs["json"]["text"] == "Test note"
     assert kwargs["json"]["internalAnalysisFlag"] is True
     assert kwargs["json"]["externalFlag"] is False
+
+@pytest.mark.asyncio
+async def test_query_stream(provider):
+    """Test streaming tickets across pages from ConnectWise Manage."""
+    pages = {
+        1: [dict(TEST_TICKET, id=1), dict(TEST_TICKET, id=2)],
+        2: [dict(TEST_TICKET, id=3), dict(TEST_TICKET, id=4)],
+        3: [dict(TEST_TICKET, id=5)]
+    }
+
+    # Mock the paged responses
+    async def mock_get(endpoint, params=None):
+        mock_response = MagicMock()
+        mock_response.headers = {}
+        mock_response.json.return_value = pages.get(params["page"], [])
+        return mock_response
+
+    provider.client.get.side_effect = mock_get
+
+    # Consume the stream
+    result = [alert async for alert in provider.query_stream({
+        "conditions": [
+            {"field": "status", "operator": "equals", "value": "New"}
+        ],
+        "page_size": 2,
+        "prefetch": 2
+    })]
+
+    # Verify the tickets arrive in page order
+    assert [alert["id"] for alert in result] == ["1", "2", "3", "4", "5"]
+
+    # Verify the conditions are sent with every page
+    for args, kwargs in provider.client.get.call_args_list:
+        assert args[0] == "/service/tickets"
+        assert kwargs["params"]["conditions"] == "status = 'New'"
+        assert kwargs["params"]["pageSize"] == 2
+
+@pytest.mark.asyncio
+async def test_query_incremental(provider):
+    """Test incremental ticket sync using the lastUpdated watermark."""
+    first_poll = [
+        dict(TEST_TICKET, id=1, _info={"lastUpdated": "2023-04-12T12:00:00Z"}),
+        dict(TEST_TICKET, id=2, _info={"lastUpdated": "2023-04-12T12:30:00Z"})
+    ]
+    second_poll = [
+        dict(TEST_TICKET, id=2, _info={"lastUpdated": "2023-04-12T12:30:00Z"}),
+        dict(TEST_TICKET, id=3, _info={"lastUpdated": "2023-04-12T12:45:00Z"})
+    ]
+
+    def mock_response(tickets):
+        response = MagicMock()
+        response.headers = {}
+        response.json.return_value = tickets
+        return response
+
+    provider.client.get.side_effect = [mock_response(first_poll), mock_response(second_poll)]
+
+    with patch("keep_integration.providers.connectwise_provider.watermark_store", WatermarkStore()):
+        first = await provider.query_incremental({})
+        second = await provider.query_incremental({"overlap_seconds": 60})
+
+    # Verify the first poll is a full sync
+    assert [alert["id"] for alert in first] == ["1", "2"]
+    args, kwargs = provider.client.get.call_args_list[0]
+    assert "conditions" not in kwargs["params"]
+
+    # Verify the second poll only asks for the delta, minus the overlap window
+    args, kwargs = provider.client.get.call_args_list[1]
+    assert kwargs["params"]["conditions"] == "lastUpdated > [2023-04-12T12:29:00Z]"
+
+    # Verify the unchanged ticket from the overlap window is skipped
+    assert [alert["id"] for alert in second] == ["3"]
+
+@pytest.mark.asyncio
+async def test_notify_batch(provider):
+    """Test running a batch of ticket operations in ConnectWise Manage."""
+    request = httpx.Request("POST", "https://test.connectwisedev.com/service/tickets")
+
+    # Mock a successful create; 429s are retried by the transport, not the provider
+    created_response = MagicMock()
+    created_response.json.return_value = TEST_TICKET
+    provider.client.post.return_value = created_response
+
+    # Mock a failing update
+    failed_response = MagicMock()
+    failed_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "Not Found",
+        request=request,
+        response=httpx.Response(404, request=request)
+    )
+    provider.client.patch.return_value = failed_response
+
+    # Call the notify_batch method
+    result = await provider.notify_batch([
+        {"summary": "Test Ticket", "board_id": 1, "company_id": 2},
+        {"operation": "update", "ticket_id": 999, "status_id": 2},
+        {"operation": "note"}
+    ], concurrency=1)
+
+    # Verify the create succeeded with a single request
+    assert result[0]["success"] is True
+    assert result[0]["operation"] == "create"
+    assert result[0]["ticket_id"] == TEST_TICKET["id"]
+    assert provider.client.post.call_count == 1
+
+    # Verify failures are reported per item without aborting the batch
+    assert result[1]["success"] is False
+    assert result[1]["index"] == 1
+    assert result[2]["success"] is False
+    assert "missing ticket_id" in result[2]["message"]
+
+@pytest.mark.asyncio
+async def test_query_incremental_keeps_state_when_a_page_fails(provider):
+    """Test that a failed sync neither advances the watermark nor marks tickets as seen."""
+    first_page = MagicMock()
+    first_page.headers = {"link": '<https://test/service/tickets?page=2>; rel="next"'}
+    first_page.links = {"next": {"url": "https://test/service/tickets?page=2"}}
+    first_page.json.return_value = [dict(TEST_TICKET, id=1, _info={"lastUpdated": "2023-04-12T12:00:00Z"})]
+    retried_page = MagicMock()
+    retried_page.headers = {}
+    retried_page.json.return_value = [dict(TEST_TICKET, id=1, _info={"lastUpdated": "2023-04-12T12:00:00Z"})]
+
+    provider.client.get.side_effect = [first_page, httpx.ConnectError("connection reset"), retried_page]
+
+    store = WatermarkStore()
+    with patch("keep_integration.providers.connectwise_provider.watermark_store", store):
+        assert await provider.query_incremental({"prefetch": 1}) == []
+        retried = await provider.query_incremental({"prefetch": 1})
+
+    # Verify the ticket read before the failure is returned on retry
+    assert [alert["id"] for alert in retried] == ["1"]
+    assert await store.get("connectwise-manage:test-connectwise-provider:tickets") == "2023-04-12T12:00:00+00:00"
+
+@pytest.mark.asyncio
+async def test_query_incremental_restores_seen_tickets(provider_config):
+    """Test that the tickets seen in the overlap window survive a restart."""
+    ticket = dict(TEST_TICKET, id=1, _info={"lastUpdated": "2023-04-12T12:00:00Z"})
+
+    def mock_response():
+        response = MagicMock()
+        response.headers = {}
+        response.json.return_value = [ticket]
+        return response
+
+    store = WatermarkStore()
+    with patch("keep_integration.providers.connectwise_provider.watermark_store", store):
+        before_restart = ConnectWiseManageProvider(TEST_PROVIDER_ID, provider_config)
+        before_restart.client = AsyncMock()
+        before_restart.client.get.return_value = mock_response()
+        assert len(await before_restart.query_incremental({})) == 1
+
+        after_restart = ConnectWiseManageProvider(TEST_PROVIDER_ID, provider_config)
+        after_restart.client = AsyncMock()
+        after_restart.client.get.return_value = mock_response()
+        assert await after_restart.query_incremental({}) == []
@@ -0,0 +1,139 @@
+"""
+Tests for the ConnectWise Manage sync.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from app.services.bulk_upsert import BulkUpsertResult
+from keep_integration.providers.connectwise_provider import ConnectWiseManageProvider
+from keep_integration.state import watermark_store
+from keep_integration.sync.connectwise import ConnectWiseSync, map_company, map_contact
+
+COMPANY = {
+    "id": 250,
+    "identifier": "Acme",
+    "name": "Acme, Inc.",
+    "city": "Springfield",
+    "zip": "12345",
+    "country": {"id": 1, "name": "United States"},
+    "status": {"name": "Active"},
+    "_info": {"lastUpdated": "2024-01-01T10:00:00Z"}
+}
+
+CONTACT = {
+    "id": 7,
+    "firstName": "Jane",
+    "lastName": "Doe",
+    "company": {"id": 250},
+    "communicationItems": [
+        {"type": {"name": "Email"}, "communicationType": "Email", "value": "jane@acme.test", "defaultFlag": True},
+        {"type": {"name": "Mobile"}, "communicationType": "Phone", "value": "555-0100"}
+    ],
+    "_info": {"lastUpdated": "2024-01-02T10:00:00Z"}
+}
+
+class FakeUpsertService:
+    """Upsert service recording the rows it receives."""
+
+    def __init__(self):
+        self.rows = {"clients": [], "sites": [], "contacts": []}
+
+    async def upsert_clients(self, rows):
+        self.rows["clients"].extend(rows)
+        return BulkUpsertResult(created=len(rows))
+
+    async def upsert_sites(self, rows):
+        self.rows["sites"].extend(rows)
+        return BulkUpsertResult(created=len(rows))
+
+    async def upsert_contacts(self, rows):
+        self.rows["contacts"].extend(rows)
+        return BulkUpsertResult(created=len(rows))
+
+async def no_synced_companies():
+    """Report no previously synced companies."""
+    return []
+
+def test_maps_companies_and_contacts():
+    """Test mapping ConnectWise records to model columns."""
+    client = map_company(COMPANY)
+    contact = map_contact(CONTACT)
+
+    assert client["external_id"] == "250"
+    assert client["external_system"] == "connectwise"
+    assert client["country"] == "United States"
+    assert client["postal_code"] == "12345"
+    assert contact["client_external_id"] == "250"
+    assert contact["email"] == "jane@acme.test"
+    assert contact["mobile"] == "555-0100"
+    assert map_contact({"id": 8}) is None
+
+@pytest.mark.asyncio
+async def test_sync_uses_watermarks():
+    """Test that a sync writes each entity and the next run only reads changes."""
+    pages = {
+        "/company/companies": [COMPANY],
+        "/company/companies/250/sites": [{"id": 3, "name": "Main", "primaryAddressFlag": True}],
+        "/company/contacts": [CONTACT],
+    }
+    requests = []
+
+    async def stream(endpoint, conditions=None, page_size=1000):
+        requests.append((endpoint, conditions))
+        yield pages[endpoint]
+
+    provider = MagicMock()
+    provider.provider_id = "test-sync"
+    provider.WATERMARK_OVERLAP_SECONDS = 0
+    provider.stream = stream
+    provider.parse_timestamp = ConnectWiseManageProvider.parse_timestamp
+
+    upserts = FakeUpsertService()
+    sync = ConnectWiseSync(provider, upsert_service=upserts)
+    sync._synced_company_ids = no_synced_companies
+
+    results = await sync.sync()
+
+    assert results["companies"].created == 1
+    assert upserts.rows["sites"][0]["client_external_id"] == "250"
+    assert upserts.rows["sites"][0]["is_primary"] is True
+    assert upserts.rows["contacts"][0]["external_id"] == "7"
+    assert await watermark_store.get("connectwise-manage:test-sync:companies") == "2024-01-01T10:00:00+00:00"
+
+    requests.clear()
+    await sync.sync()
+
+    def changed_since(*args):
+        return [{"field": "lastUpdated", "operator": "greater_than", "value": datetime(*args, tzinfo=timezone.utc)}]
+
+    assert ("/company/companies", changed_since(2024, 1, 1, 10)) in requests
+    assert ("/company/contacts", changed_since(2024, 1, 2, 10)) in requests
+
+@pytest.mark.asyncio
+async def test_failed_site_request_cancels_pending_requests():
+    """Test that the site requests still pending are cancelled when one company fails."""
+    cancelled = []
+
+    async def stream(endpoint, conditions=None, page_size=1000):
+        if endpoint == "/company/companies/1/sites":
+            raise RuntimeError("ConnectWise unavailable")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(endpoint)
+            raise
+        yield []
+
+    provider = MagicMock()
+    provider.provider_id = "test-sync-sites"
+    provider.stream = stream
+    sync = ConnectWiseSync(provider, upsert_service=FakeUpsertService())
+    sync._synced_company_ids = no_synced_companies
+
+    with pytest.raises(RuntimeError):
+        await sync.sync_sites([1, 2], full=False)
+
+    assert cancelled == ["/company/companies/2/sites"]
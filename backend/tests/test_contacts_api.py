@@ -0,0 +1,43 @@
+"""
+Tests for the contact API endpoints.
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from app.api.endpoints.contacts import search_contacts
+
+class FakeDB:
+    """Database session answering each statement with the next queued rows."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return iter(self.results.pop(0) if self.results else [])
+
+def contact_row(contact_id, first_name, last_name, score):
+    """Create a search result row."""
+    return SimpleNamespace(_mapping={
+        "id": contact_id,
+        "client_id": 1,
+        "first_name": first_name,
+        "last_name": last_name,
+        "title": None,
+        "email": None,
+        "is_active": True,
+        "score": score
+    })
+
+@pytest.mark.asyncio
+async def test_search_contacts_matches_the_indexed_full_name():
+    """Test that search sets the similarity threshold and filters on the indexed full name expression."""
+    db = FakeDB([], [contact_row(7, "Jane", "Doe", 1.0), contact_row(8, "Janet", "Doe", 0.6)])
+
+    results = await search_contacts(q=" jane doe ", limit=20, client_id=None, is_active=None, db=db, current_user=None)
+
+    assert "word_similarity_threshold" in str(db.statements[0])
+    assert "first_name || ' ' || contacts.last_name" in str(db.statements[1])
+    assert [result.id for result in results] == [7, 8]
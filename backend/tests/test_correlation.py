@@ -0,0 +1,110 @@
+"""
+Tests for cross-source alert correlation.
+"""
+
+import pytest
+
+from keep_integration.correlation import AssetDirectory, CorrelationEngine
+
+@pytest.fixture
+def engine():
+    """Create a correlation engine with a preloaded asset directory."""
+    directory = AssetDirectory()
+    directory.set_entries({"fs01": (1, 10), "ws02": (2, 20)}, {"acme": 1, "globex": 2})
+    return CorrelationEngine(directory, window=600)
+
+def test_correlates_alerts_for_the_same_client_and_host(engine):
+    """Test that threats, backup failures and tickets for one host form one incident."""
+    threat = {"fingerprint": "sentinelone-1", "source": "sentinelone", "severity": "critical",
+              "lastReceived": "2024-01-01T10:00:00Z", "labels": {"computer_name": "FS01.acme.local"}}
+    backup = {"fingerprint": "veeam-session-1", "source": "veeam", "severity": "warning",
+              "lastReceived": "2024-01-01T10:05:00Z", "labels": {"job_name": "Acme - FS01 Daily"}}
+    ticket = {"fingerprint": "connectwise-manage-1", "source": "connectwise-manage", "severity": "info",
+              "lastReceived": "2024-01-01T10:06:00Z", "labels": {"company": "Acme, Inc."}}
+    other = {"fingerprint": "sentinelone-2", "source": "sentinelone", "severity": "high",
+             "lastReceived": "2024-01-01T10:07:00Z", "labels": {"computer_name": "WS02"}}
+
+    incidents = [engine.correlate(alert) for alert in (threat, backup, ticket, other)]
+
+    assert incidents[0] is incidents[1] is incidents[2]
+    assert incidents[3] is not incidents[0]
+    assert incidents[0].severity == "critical"
+    assert incidents[0].sources == {"sentinelone", "veeam", "connectwise-manage"}
+    assert ticket["annotations"]["incident_id"] == incidents[0].id
+
+def test_opens_new_incident_after_window(engine):
+    """Test that alerts outside the sliding window open a new incident."""
+    first = engine.correlate({"lastReceived": "2024-01-01T10:00:00Z", "labels": {"computer_name": "FS01"}})
+    second = engine.correlate({"lastReceived": "2024-01-01T11:00:00Z", "labels": {"computer_name": "FS01"}})
+
+    assert first is not second
+    assert first.id not in engine.incidents
+
+def test_resolves_connectwise_tickets_by_company_id():
+    """Test that tickets resolve synced clients by company ID rather than by name."""
+    directory = AssetDirectory()
+    directory.set_entries({}, {"acme": 1}, {("connectwise", "250"): 2})
+    engine = CorrelationEngine(directory, window=600)
+
+    ticket = {"source": "connectwise-manage", "labels": {"company": "Acme"}, "annotations": {"company_id": "250"}}
+
+    assert engine.resolve_entities(ticket) == ("2", None)
+
+class FakeSession:
+    """Session returning fixed asset rows, or failing."""
+
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+        self.queries = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        self.queries += 1
+        if self.error:
+            raise self.error
+        return iter(self.rows)
+
+def test_resolves_alerts_by_ip_or_mac_address():
+    """Test that hosts reported under another name resolve by address."""
+    directory = AssetDirectory()
+    directory.set_entries({}, {}, addresses={"10.0.0.5": (3, 30), "aa:bb:cc:00:00:01": (4, 40)})
+    engine = CorrelationEngine(directory, window=600)
+
+    by_ip = {"labels": {"computer_name": "DESKTOP-1", "ip_address": "10.0.0.5", "mac_address": "Unknown"}}
+    by_mac = {"labels": {"computer_name": "DESKTOP-2", "mac_address": "AA:BB:CC:00:00:01"}}
+
+    assert engine.resolve_entities(by_ip) == ("3", "desktop-1")
+    assert engine.resolve_entities(by_mac) == ("4", "desktop-2")
+
+@pytest.mark.asyncio
+async def test_resolve_hosts_matches_short_hostnames():
+    """Test that fully qualified hostnames resolve assets stored under another domain."""
+    session = FakeSession([(10, "FS01.corp.example", "10.0.0.5", "AA:BB:CC:00:00:01", 1)])
+    directory = AssetDirectory(session_factory=lambda: session)
+    directory.set_entries({}, {})
+
+    await directory.resolve_hosts(["fs01.acme.local", "ws09"])
+    await directory.resolve_hosts(["ws09"])
+
+    assert directory.hosts == {"fs01": (1, 10)}
+    assert directory.addresses == {"10.0.0.5": (1, 10), "aa:bb:cc:00:00:01": (1, 10)}
+    # The miss is remembered until the next reload
+    assert session.queries == 1
+
+@pytest.mark.asyncio
+async def test_resolve_hosts_does_not_cache_failed_lookups():
+    """Test that hosts are looked up again after a failed query."""
+    session = FakeSession([], error=ConnectionError("database unavailable"))
+    directory = AssetDirectory(session_factory=lambda: session)
+    directory.set_entries({}, {})
+
+    await directory.resolve_hosts(["fs01"])
+    await directory.resolve_hosts(["fs01"])
+
+    assert session.queries == 2
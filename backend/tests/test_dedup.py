@@ -0,0 +1,135 @@
+"""
+Tests for alert deduplication.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from keep_integration.dedup import AlertDeduplicator
+
+@pytest.mark.asyncio
+async def test_suppresses_unchanged_alerts():
+    """Test that only alerts whose state changed are emitted."""
+    deduplicator = AlertDeduplicator(ttl=60)
+    alert = {"fingerprint": "sentinelone-1", "status": "firing", "severity": "critical", "labels": {"site": "A"}}
+
+    assert await deduplicator.filter([alert, dict(alert)]) == [alert]
+    await deduplicator.record([alert])
+
+    assert await deduplicator.filter([dict(alert)]) == []
+
+    resolved = dict(alert, status="resolved")
+    assert await deduplicator.filter([resolved]) == [resolved]
+    assert deduplicator.stats()["emitted"] == 2
+    assert deduplicator.stats()["suppressed"] == 2
+
+ALERT = {"fingerprint": "veeam-job-1", "status": "firing", "severity": "warning", "labels": {"job_name": "Nightly"}}
+
+class FakeClock:
+    """Monotonic clock advanced by the test."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.mark.asyncio
+async def test_alert_is_emitted_again_after_the_window_expires():
+    """Test that an unchanged alert is suppressed within the TTL window and emitted once it expires."""
+    clock = FakeClock()
+    deduplicator = AlertDeduplicator(ttl=60)
+
+    with patch("keep_integration.cache.time.monotonic", clock):
+        await deduplicator.record([ALERT])
+
+        clock.now += 59
+        assert await deduplicator.filter([dict(ALERT)]) == []
+
+        clock.now += 2
+        assert await deduplicator.filter([dict(ALERT)]) == [ALERT]
+
+@pytest.mark.parametrize("change", [
+    {"status": "resolved"},
+    {"severity": "critical"},
+    {"labels": {"job_name": "Nightly", "result": "Failed"}},
+])
+@pytest.mark.asyncio
+async def test_state_changes_are_emitted(change):
+    """Test that a change of status, severity or labels is emitted."""
+    deduplicator = AlertDeduplicator(ttl=60)
+    await deduplicator.record([ALERT])
+
+    changed = dict(ALERT, **change)
+    assert await deduplicator.filter([changed]) == [changed]
+
+    # Other fields are not part of the state
+    assert await deduplicator.filter([dict(ALERT, description="Retried")]) == []
+
+@pytest.mark.asyncio
+async def test_stats_count_emitted_suppressed_and_tracked_alerts():
+    """Test the emitted, suppressed and tracked counters."""
+    deduplicator = AlertDeduplicator(ttl=60)
+    other = dict(ALERT, fingerprint="veeam-job-2")
+    unfingerprinted = {"status": "firing"}
+
+    emitted = await deduplicator.filter([ALERT, other, unfingerprinted])
+    await deduplicator.record(emitted)
+    await deduplicator.filter([dict(ALERT), dict(other), dict(unfingerprinted)])
+
+    assert deduplicator.stats() == {"emitted": 4, "suppressed": 2, "tracked": 2}
+
+class FakeRedis:
+    """Redis client storing strings with their expiry."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    """Redis pipeline applying queued SETs on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    async def execute(self):
+        for key, value, ex in self.commands:
+            self.redis.values[key] = value
+            self.redis.expiry[key] = ex
+        return [True] * len(self.commands)
+
+@pytest.mark.asyncio
+async def test_state_is_shared_through_redis():
+    """Test that recorded states are written to Redis with the TTL and read by other processes."""
+    redis = FakeRedis()
+    first = AlertDeduplicator(ttl=60)
+    first._redis = redis
+    second = AlertDeduplicator(ttl=60)
+    second._redis = redis
+
+    await first.record([ALERT])
+
+    assert redis.expiry == {"mspalwayson:dedup:veeam-job-1": 60}
+    assert await second.filter([dict(ALERT)]) == []
+    resolved = dict(ALERT, status="resolved")
+    assert await second.filter([resolved]) == [resolved]
+
+@pytest.mark.asyncio
+async def test_redis_errors_fall_back_to_memory():
+    """Test that alerts are still emitted when Redis cannot be read."""
+    redis = FakeRedis()
+    redis.mget = AsyncMock(side_effect=ConnectionError("Redis unavailable"))
+    deduplicator = AlertDeduplicator(ttl=60)
+    deduplicator._redis = redis
+
+    assert await deduplicator.filter([ALERT]) == [ALERT]
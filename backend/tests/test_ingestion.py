@@ -0,0 +1,103 @@
+"""
+Tests for the alert ingestion queue.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from keep_integration.ingestion import IngestionConsumer, InMemoryIngestionQueue
+
+@pytest.mark.asyncio
+async def test_unacknowledged_messages_are_replayed():
+    """Test that a failed batch stays pending and is replayed on restart."""
+    queue = InMemoryIngestionQueue()
+    await queue.publish([{"id": "1"}, {"id": "2"}])
+
+    async def failing_handler(alerts):
+        raise RuntimeError("processing failed")
+
+    messages = await queue.read("worker-1", count=10, block_ms=10)
+    consumer = IngestionConsumer(queue, failing_handler, "worker-1")
+    assert await consumer._process(messages) is False
+    assert await queue.backlog() == 2
+
+    processed = []
+
+    async def handler(alerts):
+        processed.extend(alerts)
+
+    replayed = await queue.read_pending("worker-1")
+    consumer = IngestionConsumer(queue, handler, "worker-1")
+    assert await consumer._process(replayed) is True
+    assert processed == [{"id": "1"}, {"id": "2"}]
+    assert await queue.backlog() == 0
+
+@pytest.mark.asyncio
+async def test_stale_messages_are_claimed():
+    """Test that messages pending on another consumer can be claimed."""
+    queue = InMemoryIngestionQueue()
+    await queue.publish([{"id": "1"}])
+    await queue.read("worker-1", count=10, block_ms=10)
+
+    assert await queue.read("worker-2", count=10, block_ms=10) == []
+    claimed = await queue.claim_stale("worker-2", min_idle_ms=0)
+
+    assert [message.alert for message in claimed] == [{"id": "1"}]
+    assert await queue.read_pending("worker-1") == []
+
+@pytest.mark.asyncio
+async def test_own_idle_messages_are_redelivered_and_dead_lettered():
+    """Test that a consumer retries its own failed messages and dead-letters them after the delivery limit."""
+    queue = InMemoryIngestionQueue()
+    await queue.publish([{"id": "bad"}, {"id": "good"}])
+    processed = []
+
+    async def handler(alerts):
+        if any(alert["id"] == "bad" for alert in alerts):
+            raise RuntimeError("processing failed")
+        processed.extend(alerts)
+
+    consumer = IngestionConsumer(queue, handler, "worker-1", max_deliveries=3)
+
+    # The batch fails, the good message is processed on its own
+    assert await consumer._process(await queue.read("worker-1", count=10, block_ms=10)) is False
+    assert processed == [{"id": "good"}]
+
+    for _ in range(2):
+        claimed = await queue.claim_stale("worker-1", min_idle_ms=0)
+        assert [message.alert for message in claimed] == [{"id": "bad"}]
+        await consumer._process(claimed)
+
+    assert await queue.backlog() == 0
+    assert [alert for _, alert, _ in queue.dead_letters] == [{"id": "bad"}]
+
+@pytest.mark.asyncio
+async def test_consumer_retries_replay_until_queue_is_reachable():
+    """Test that the startup replay is retried instead of killing the consumer."""
+    queue = InMemoryIngestionQueue()
+    await queue.publish([{"id": "1"}])
+    await queue.read("worker-1", count=10, block_ms=10)
+
+    read_pending = queue.read_pending
+    attempts = []
+
+    async def flaky_read_pending(consumer, count=100):
+        attempts.append(consumer)
+        if len(attempts) == 1:
+            raise ConnectionError("redis unreachable")
+        return await read_pending(consumer, count)
+
+    queue.read_pending = flaky_read_pending
+    processed = asyncio.Event()
+
+    async def handler(alerts):
+        processed.set()
+
+    consumer = IngestionConsumer(queue, handler, "worker-1", block_ms=10)
+    with patch("keep_integration.ingestion.asyncio.sleep", new=AsyncMock()):
+        consumer.start()
+        await asyncio.wait_for(processed.wait(), 1)
+    await consumer.stop()
+
+    assert len(attempts) >= 2
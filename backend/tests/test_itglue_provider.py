@@ -0,0 +1,107 @@
+"""
+Tests for the IT Glue provider.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from keep.providers.models.provider_config import ProviderConfig
+from keep_integration.providers.itglue_provider import ITGlueProvider
+
+# Test data
+TEST_PROVIDER_ID = "test-itglue-provider"
+TEST_CONFIG = {
+    "authentication": {
+        "api_key": "test_api_key",
+        "base_url": "https://api.itglue.test"
+    }
+}
+
+TEST_ORGANIZATION = {"id": "10", "type": "organizations", "attributes": {"name": "Acme"}}
+
+@pytest.fixture
+def provider():
+    """Create an IT Glue provider for testing."""
+    provider = ITGlueProvider(TEST_PROVIDER_ID, ProviderConfig(provider_id=TEST_PROVIDER_ID, **TEST_CONFIG))
+    # Mock the HTTP client
+    provider.client = AsyncMock()
+    return provider
+
+def configuration(configuration_id: str, organization_id: str = "10"):
+    """Create a configuration referencing an organization."""
+    return {
+        "id": configuration_id,
+        "type": "configurations",
+        "attributes": {"name": f"FS{configuration_id}"},
+        "relationships": {"organization": {"data": {"id": organization_id, "type": "organizations"}}}
+    }
+
+def test_resolve_relationship(provider):
+    """Test that sideloaded references are embedded and others are left as identifiers."""
+    included = provider._index_included([TEST_ORGANIZATION])
+
+    assert provider._resolve_relationship({"id": 10, "type": "organizations"}, included) == {
+        "id": "10", "type": "organizations", "name": "Acme"
+    }
+    assert provider._resolve_relationship({"id": "11", "type": "organizations"}, included) == {
+        "id": "11", "type": "organizations"
+    }
+    assert provider._resolve_relationship({"id": "10", "type": "organizations"}, None) == {
+        "id": "10", "type": "organizations"
+    }
+
+@pytest.mark.asyncio
+async def test_query_stream_resolves_included_resources_across_pages(provider):
+    """Test that every page is read and its relationships are resolved from its included resources."""
+    async def get(endpoint, params=None):
+        response = MagicMock()
+        response.json.return_value = {
+            "data": [configuration(str(params["page[number]"]))],
+            "included": [TEST_ORGANIZATION],
+            "meta": {"total-pages": 2}
+        }
+        return response
+
+    provider.client.get.side_effect = get
+
+    resources = [resource async for resource in provider.query_stream({
+        "resource_type": "configurations",
+        "include": ["organization"],
+        "page_size": 1
+    })]
+
+    assert [resource["name"] for resource in resources] == ["FS1", "FS2"]
+    assert resources[0]["relationships"]["organization"]["name"] == "Acme"
+    assert provider.client.get.call_args.kwargs["params"]["include"] == "organization"
+
+@pytest.mark.asyncio
+async def test_renamed_client_is_searched_again(provider):
+    """Test that an organization persisted for a client's old name is cleared and searched again."""
+    client = SimpleNamespace(
+        id=1,
+        name="Acme Holdings",
+        external_id=None,
+        external_system=None,
+        metadata={"itglue_organization_id": "10", "itglue_organization_client_name": "Acme"}
+    )
+    mapping_service = MagicMock()
+    mapping_service.get_client = AsyncMock(return_value=client)
+    mapping_service.update_metadata = AsyncMock(return_value=True)
+
+    response = MagicMock()
+    response.json.return_value = {"data": [{"id": "20", "attributes": {"name": "Acme Holdings"}}]}
+    provider.client.get.return_value = response
+
+    with patch("app.services.client_mapping.client_mapping_service", mapping_service):
+        mapping = await provider._get_organization_by_client_id("1")
+
+    assert mapping["organization_id"] == "20"
+    assert provider.client.get.call_args.kwargs["params"]["filter[name]"] == "Acme Holdings"
+    cleared, persisted = [call.args[1] for call in mapping_service.update_metadata.call_args_list]
+    assert cleared["itglue_organization_id"] is None
+    assert persisted == {
+        "itglue_organization_id": "20",
+        "itglue_organization_name": "Acme Holdings",
+        "itglue_organization_client_name": "Acme Holdings"
+    }
@@ -0,0 +1,51 @@
+"""
+Tests for the provider and workflow registry.
+"""
+
+import json
+from types import SimpleNamespace
+
+from keep_integration.registry import Registry, _etag_matches
+
+ETAG = '"0123456789abcdef"'
+
+def test_etag_matches():
+    """Test matching If-None-Match against strong, weak, listed and wildcard ETags."""
+    assert _etag_matches(ETAG, ETAG) is True
+    assert _etag_matches(f"W/{ETAG}", ETAG) is True
+    assert _etag_matches(f'"other", W/{ETAG}', ETAG) is True
+    assert _etag_matches("*", ETAG) is True
+    assert _etag_matches('"other"', ETAG) is False
+    assert _etag_matches(None, ETAG) is False
+    assert _etag_matches("", ETAG) is False
+
+class FakeProvider:
+    """Provider class with listing metadata."""
+
+    PROVIDER_DISPLAY_NAME = "Fake"
+    PROVIDER_CATEGORY = ["Testing"]
+
+    async def query_stream(self, query_params):
+        yield {}
+
+def test_workflow_listing_is_rebuilt_when_the_index_changes():
+    """Test that listings are cached until the workflow loader swaps in a new index."""
+    loader = SimpleNamespace(index=SimpleNamespace(workflows={}))
+    registry = Registry(providers={"fake": FakeProvider}, loader=loader)
+
+    providers = json.loads(registry.providers.body)["providers"]
+    first = registry.workflows
+
+    assert providers[0]["display_name"] == "Fake"
+    assert providers[0]["supports_query_stream"] is True
+    assert registry.workflows is first
+
+    workflow = SimpleNamespace(
+        id="isolate", name="Isolate", description="", triggers=[],
+        definition={"actions": [{"name": "isolate", "provider": {"type": "sentinelone"}}]}
+    )
+    loader.index = SimpleNamespace(workflows={"isolate": workflow})
+    second = registry.workflows
+
+    assert second.etag != first.etag
+    assert json.loads(second.body)["workflows"][0]["providers"] == ["sentinelone"]
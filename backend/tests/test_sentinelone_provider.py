@@ -0,0 +1,177 @@
+"""
+Tests for the SentinelOne provider.
+"""
+
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from keep.providers.models.provider_config import ProviderConfig
+from keep_integration.providers.sentinelone_provider import SentinelOneProvider, SentinelOneSiteIndex
+
+# Test data
+TEST_PROVIDER_ID = "test-sentinelone-provider"
+TEST_CONFIG = {
+    "authentication": {
+        "api_token": "test_api_token",
+        "base_url": "https://test.sentinelone.net/web/api",
+        "account_id": "test_account"
+    }
+}
+
+TEST_THREAT = {
+    "id": "1",
+    "agentComputerName": "FS01",
+    "createdAt": "2024-01-01T10:00:00Z",
+    "threatInfo": {"threatName": "Trojan", "severity": "Critical"}
+}
+
+@pytest.fixture
+def provider():
+    """Create a SentinelOne provider for testing."""
+    provider = SentinelOneProvider(TEST_PROVIDER_ID, ProviderConfig(provider_id=TEST_PROVIDER_ID, **TEST_CONFIG))
+    # Mock the HTTP client
+    provider.client = AsyncMock()
+    return provider
+
+def page_response(items, next_cursor=None):
+    """Create a threats page response."""
+    response = MagicMock()
+    response.json.return_value = {"data": {"threats": items}, "pagination": {"nextCursor": next_cursor}}
+    return response
+
+@pytest.mark.asyncio
+async def test_query_page_returns_next_cursor(provider):
+    """Test that a page query exposes the cursor of the next page."""
+    provider.client.get.side_effect = [page_response([TEST_THREAT], "cursor-2"), page_response([])]
+
+    items, next_cursor = await provider.query_page({"query_type": "threats"})
+    last_items, last_cursor = await provider.query_page({"query_type": "threats", "cursor": next_cursor})
+
+    assert [item["fingerprint"] for item in items] == ["sentinelone-1"]
+    assert next_cursor == "cursor-2"
+    assert provider.client.get.call_args_list[1].kwargs["params"]["cursor"] == "cursor-2"
+    assert (last_items, last_cursor) == ([], None)
+
+def sites_response(sites, next_cursor=None):
+    """Create a sites page response."""
+    response = MagicMock()
+    response.json.return_value = {"data": {"sites": sites}, "pagination": {"nextCursor": next_cursor}}
+    return response
+
+@pytest.mark.asyncio
+async def test_site_index_loads_all_pages_once():
+    """Test that the site index follows the cursor on first use and indexes names."""
+    client = AsyncMock()
+    client.get.side_effect = [
+        sites_response([{"id": 1, "name": "Acme, Inc."}], "cursor-2"),
+        sites_response([{"id": 2, "name": "Globex"}])
+    ]
+    index = SentinelOneSiteIndex(client, "test_account", ttl=300)
+
+    await index.ensure_loaded()
+    await index.ensure_loaded()
+
+    assert client.get.call_count == 2
+    assert index.get_site("2")["name"] == "Globex"
+    assert [site["id"] for site in index.find_by_name("ACME inc")] == [1]
+    assert [site["id"] for site in index.find_by_name("acme")] == [1]
+
+@pytest.mark.asyncio
+async def test_site_index_refreshes_in_background_after_ttl():
+    """Test that a stale index keeps serving its snapshot while it is refreshed."""
+    client = AsyncMock()
+    client.get.side_effect = [
+        sites_response([{"id": 1, "name": "Acme"}]),
+        sites_response([{"id": 1, "name": "Acme"}, {"id": 2, "name": "Globex"}])
+    ]
+    index = SentinelOneSiteIndex(client, "test_account", ttl=300)
+    await index.ensure_loaded()
+
+    # Fresh snapshots are not refreshed
+    await index.ensure_loaded()
+    assert client.get.call_count == 1
+
+    index.loaded_at = time.monotonic() - 301
+    await index.ensure_loaded()
+    assert index.get_site("2") is None
+
+    await index._refresh_task
+    assert index.get_site("2")["name"] == "Globex"
+    assert index.version == 2
+
+@pytest.mark.asyncio
+async def test_site_index_keeps_snapshot_when_refresh_fails():
+    """Test that a failed background refresh keeps the previous snapshot."""
+    client = AsyncMock()
+    client.get.side_effect = [sites_response([{"id": 1, "name": "Acme"}]), ConnectionError("unavailable")]
+    index = SentinelOneSiteIndex(client, "test_account", ttl=300)
+    await index.ensure_loaded()
+
+    index.loaded_at = time.monotonic() - 301
+    await index.ensure_loaded()
+    await index._refresh_task
+
+    assert index.get_site("1")["name"] == "Acme"
+    assert index.version == 1
+
+@pytest.mark.asyncio
+async def test_enrich_threats_batches_lookups(provider):
+    """Test that threats and agents are fetched in ids-filtered batches and joined."""
+    threats = {"t1": {"id": "t1", "agentId": "a1"}, "t2": {"id": "t2", "agentId": "a2"}}
+    agents = {"a1": {"id": "a1", "computerName": "FS01"}}
+    requests = []
+
+    async def get(endpoint, params=None):
+        requests.append((endpoint, params))
+        response = MagicMock(status_code=200)
+        if endpoint == "/v2/threats":
+            items = [threats[i] for i in params["ids"].split(",") if i in threats]
+            response.json.return_value = {"data": {"threats": items}}
+        elif endpoint == "/v2/agents":
+            items = [agents[i] for i in params["ids"].split(",") if i in agents]
+            response.json.return_value = {"data": {"agents": items}}
+        else:
+            response.json.return_value = {"data": {"timeline": [{"event": endpoint}]}}
+        return response
+
+    provider.client.get.side_effect = get
+    provider.ENRICHMENT_BATCH_SIZE = 2
+
+    result = await provider.enrich_threats(["t1", "t2", "t3", "t1"])
+
+    threat_batches = [params["ids"] for endpoint, params in requests if endpoint == "/v2/threats"]
+    agent_batches = [params["ids"] for endpoint, params in requests if endpoint == "/v2/agents"]
+    assert threat_batches == ["t1,t2", "t3"]
+    assert agent_batches == ["a1,a2"]
+
+    assert result["missing"] == ["t3"]
+    assert result["success"] is False
+    assert result["threats"]["t1"]["timeline"] == [{"event": "/v2/threats/t1/timeline"}]
+    assert result["threats"]["t1"]["endpoint"]["hostname"] == "FS01"
+    assert result["threats"]["t2"]["endpoint"]["success"] is False
+
+@pytest.mark.asyncio
+async def test_endpoint_by_threat_id_uses_batched_lookups(provider):
+    """Test that endpoint lookups use the ids-filtered calls and skip the threat when its agent is known."""
+    requests = []
+
+    async def get(endpoint, params=None):
+        requests.append(endpoint)
+        response = MagicMock(status_code=200)
+        if endpoint == "/v2/threats":
+            response.json.return_value = {"data": {"threats": [{"id": "t1", "agentId": "a1"}]}}
+        else:
+            response.json.return_value = {"data": {"agents": [{"id": "a1", "computerName": "FS01"}]}}
+        return response
+
+    provider.client.get.side_effect = get
+
+    result = await provider.notify({"action": "get_endpoint_by_threat_id", "threat_ids": ["t1"]})
+    assert result["hostname"] == "FS01"
+    assert requests == ["/v2/threats", "/v2/agents"]
+
+    requests.clear()
+    result = await provider.notify({"action": "get_endpoint_by_threat_id", "threat_ids": ["t1"], "agent_ids": ["a1"]})
+    assert result["hostname"] == "FS01"
+    assert requests == ["/v2/agents"]
@@ -0,0 +1,96 @@
+"""
+Tests for the SentinelOne asset sync.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.models.asset import AssetType
+from app.services.bulk_upsert import BulkUpsertResult
+from keep_integration.state import watermark_store
+from keep_integration.sync.sentinelone import SentinelOneAssetSync, map_agent
+
+AGENT = {
+    "id": "1001",
+    "siteId": "900",
+    "computerName": "FS01",
+    "machineType": "server",
+    "osName": "Windows Server 2022",
+    "osRevision": "20348",
+    "lastIpToMgmt": "10.0.0.5",
+    "lastActiveDate": "2024-01-01T09:55:00Z",
+    "updatedAt": "2024-01-01T10:00:00Z",
+    "networkInterfaces": [
+        {"inet": ["192.168.1.5"], "physical": "AA:BB:CC:00:00:01"},
+        {"inet": ["10.0.0.5"], "physical": "AA:BB:CC:00:00:02"}
+    ]
+}
+
+class FakeUpsertService:
+    """Upsert service recording the asset rows it receives."""
+
+    def __init__(self):
+        self.rows = []
+
+    async def upsert_assets(self, rows):
+        self.rows.extend(rows)
+        return BulkUpsertResult(created=len(rows))
+
+def test_maps_agents_to_assets():
+    """Test mapping SentinelOne agents to asset columns."""
+    row = map_agent(AGENT)
+
+    assert row["external_id"] == "1001"
+    assert row["site_external_id"] == "900"
+    assert row["hostname"] == "FS01"
+    assert row["ip_address"] == "10.0.0.5"
+    assert row["mac_address"] == "aa:bb:cc:00:00:02"
+    assert row["asset_type"] == AssetType.SERVER
+    assert row["os_version"] == "Windows Server 2022 20348"
+    assert row["last_seen"].isoformat() == "2024-01-01T09:55:00+00:00"
+    assert map_agent({"id": "1002"}) is None
+
+@pytest.mark.asyncio
+async def test_sync_reads_agents_changed_since_watermark():
+    """Test that a second sync only reads agents updated after the watermark."""
+    queries = []
+
+    async def query_stream(query_params):
+        queries.append(query_params)
+        yield AGENT
+
+    provider = MagicMock()
+    provider.provider_id = "test-s1-sync"
+    provider.query_stream = query_stream
+
+    upserts = FakeUpsertService()
+    sync = SentinelOneAssetSync(provider, upsert_service=upserts)
+
+    result = await sync.sync()
+    await sync.sync()
+
+    assert result.created == 1
+    assert "updatedAt__gt" not in queries[0]["filters"]
+    assert queries[1]["filters"]["updatedAt__gt"] == "2024-01-01T09:58:00+00:00"
+    assert queries[1]["filters"]["sortBy"] == "updatedAt"
+    assert await watermark_store.get("sentinelone:test-s1-sync:agents") == "2024-01-01T10:00:00+00:00"
+
+@pytest.mark.asyncio
+async def test_failed_full_sync_is_not_recorded():
+    """Test that a full sync interrupted by an API error is retried on the next run."""
+    async def query_stream(query_params):
+        assert query_params["raise_errors"] is True
+        yield AGENT
+        raise ConnectionError("SentinelOne unavailable")
+
+    provider = MagicMock()
+    provider.provider_id = "test-s1-failed-sync"
+    provider.query_stream = query_stream
+
+    upserts = FakeUpsertService()
+    sync = SentinelOneAssetSync(provider, upsert_service=upserts)
+
+    with pytest.raises(ConnectionError):
+        await sync.sync()
+
+    assert await watermark_store.get("sentinelone:test-s1-failed-sync:agents-full") is None
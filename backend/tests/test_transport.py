@@ -0,0 +1,63 @@
+"""
+Tests for the shared MSP provider HTTP transport.
+"""
+
+import asyncio
+import pytest
+import httpx
+
+from keep_integration.transport import RateLimitedTransport, TokenBucket, TransportProfile, get_bucket
+
+# Retry quickly in tests
+TEST_PROFILE = TransportProfile(rate=1000.0, burst=1000, max_retries=2, backoff_base=0.0)
+
+def make_client(handler):
+    """Create a client sending requests to a mock handler through the transport."""
+    bucket = TokenBucket(1000.0, 1000)
+    transport = RateLimitedTransport(httpx.MockTransport(handler), lambda: bucket, TEST_PROFILE)
+    return httpx.AsyncClient(base_url="https://api.example.com", transport=transport)
+
+@pytest.mark.asyncio
+async def test_retries_rate_limited_requests():
+    """Test that 429 responses are retried for every method."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(201, json={"id": 1})
+
+    async with make_client(handler) as client:
+        response = await client.post("/service/tickets", json={"summary": "Test"})
+
+    assert response.status_code == 201
+    assert calls == ["POST", "POST"]
+
+@pytest.mark.asyncio
+async def test_does_not_retry_server_errors_for_post():
+    """Test that 5xx responses are only retried for idempotent methods."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    async with make_client(handler) as client:
+        post_response = await client.post("/service/tickets", json={"summary": "Test"})
+        get_response = await client.get("/service/tickets")
+
+    assert post_response.status_code == 503
+    assert get_response.status_code == 503
+    assert calls == ["POST", "GET", "GET", "GET"]
+
+def test_buckets_are_shared_within_an_event_loop():
+    """Test that clients share a vendor bucket within a loop, and each loop gets its own."""
+    async def buckets():
+        return get_bucket("itglue", "api.itglue.com"), get_bucket("itglue", "api.itglue.com")
+
+    first, second = asyncio.run(buckets())
+    other, _ = asyncio.run(buckets())
+
+    assert first is second
+    assert other is not first
@@ -0,0 +1,190 @@
+"""
+Tests for the Veeam provider.
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+import httpx
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs
+
+from keep.providers.models.provider_config import ProviderConfig
+from keep_integration.providers.veeam_provider import VeeamProvider, VeeamTokenAuth
+
+# Test data
+TEST_PROVIDER_ID = "test-veeam-provider"
+TEST_CONFIG = {
+    "authentication": {
+        "username": "test_user",
+        "password": "test_password",
+        "base_url": "https://veeam.test:9419"
+    }
+}
+
+class FakeVeeam:
+    """Veeam API answering 401 to requests without the current token."""
+
+    def __init__(self, reject_refresh: bool = False):
+        self.reject_refresh = reject_refresh
+        self.token_requests = []
+        self.token = None
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == VeeamProvider.TOKEN_ENDPOINT:
+            form = parse_qs(request.content.decode())
+            self.token_requests.append(form.get("grant_type", [""])[0])
+            # Let concurrent requests pile up behind the token request
+            await asyncio.sleep(0.01)
+            if self.reject_refresh and form.get("grant_type") == ["refresh_token"]:
+                return httpx.Response(400, json={"error": "invalid_grant"})
+            self.token = f"token-{len(self.token_requests)}"
+            return httpx.Response(200, json={
+                "access_token": self.token,
+                "refresh_token": f"refresh-{len(self.token_requests)}",
+                "expires_in": 900
+            })
+
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return httpx.Response(401)
+        return httpx.Response(200, json={"data": []})
+
+@pytest_asyncio.fixture
+async def provider():
+    """Create a Veeam provider whose client talks to a fake Veeam API."""
+    provider = VeeamProvider(TEST_PROVIDER_ID, ProviderConfig(provider_id=TEST_PROVIDER_ID, **TEST_CONFIG))
+    provider.veeam = FakeVeeam()
+    provider.client = httpx.AsyncClient(
+        base_url=TEST_CONFIG["authentication"]["base_url"],
+        transport=httpx.MockTransport(provider.veeam.handle),
+        auth=VeeamTokenAuth(provider)
+    )
+    yield provider
+    await provider.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_unauthorized_requests_share_one_token_request(provider):
+    """Test that concurrent 401s on an expired token trigger exactly one token request."""
+    provider.token = "revoked"
+    provider.token_expiry = datetime.now() + timedelta(minutes=10)
+
+    responses = await asyncio.gather(*(provider.client.get("/api/v1/jobs") for _ in range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert provider.veeam.token_requests == ["password"]
+
+@pytest.mark.asyncio
+async def test_token_renewal_uses_refresh_token(provider):
+    """Test that a token is renewed with the refresh token once one is known."""
+    assert await provider._get_token() is True
+    provider.token_expiry = datetime.now() - timedelta(seconds=1)
+    assert await provider._get_token() is True
+
+    assert provider.veeam.token_requests == ["password", "refresh_token"]
+    assert provider.token == "token-2"
+    assert provider.refresh_token == "refresh-2"
+
+@pytest.mark.asyncio
+async def test_rejected_refresh_token_falls_back_to_password(provider):
+    """Test that a rejected refresh token is replaced by a password login."""
+    provider.veeam.reject_refresh = True
+    provider.refresh_token = "expired"
+
+    assert await provider._get_token() is True
+    assert provider.veeam.token_requests == ["refresh_token", "password"]
+
+@pytest.mark.asyncio
+async def test_close_cancels_token_renewal(provider):
+    """Test that closing the provider cancels the scheduled token renewal."""
+    assert await provider._get_token() is True
+    renewal_task = provider._renewal_task
+    assert not renewal_task.done()
+
+    await provider.close()
+
+    assert renewal_task.cancelled()
+    assert provider.client is None
+
+def sessions_provider(provider_id: str, pages):
+    """Create a Veeam provider with a valid token whose client serves session pages by offset."""
+    provider = VeeamProvider(provider_id, ProviderConfig(provider_id=provider_id, **TEST_CONFIG))
+    provider.token = "token"
+    provider.token_expiry = datetime.now() + timedelta(minutes=10)
+    provider.requests = []
+
+    async def get(endpoint, params=None):
+        provider.requests.append(params)
+        items, total = pages(params)
+        return httpx.Response(
+            200,
+            json={"data": items, "pagination": {"total": total}},
+            request=httpx.Request("GET", f"{TEST_CONFIG['authentication']['base_url']}{endpoint}")
+        )
+
+    provider.client = MagicMock()
+    provider.client.get = get
+    return provider
+
+def session(session_id: str, creation_time: str):
+    """Create a Veeam session."""
+    return {"id": session_id, "name": f"Job {session_id}", "creationTime": creation_time, "result": "Failed"}
+
+@pytest.mark.asyncio
+async def test_stream_reads_all_offsets_in_order():
+    """Test that the stream reads every page by offset and yields in order."""
+    sessions = [session(f"s{index}", f"2024-01-01T10:0{index}:00Z") for index in range(5)]
+    provider = sessions_provider(
+        "test-veeam-offsets",
+        lambda params: (sessions[params["offset"]:params["offset"] + params["limit"]], len(sessions))
+    )
+
+    alerts = [alert async for alert in provider.query_stream({"query_type": "sessions", "limit": 2})]
+
+    assert [alert["id"] for alert in alerts] == ["s0", "s1", "s2", "s3", "s4"]
+    assert sorted(params["offset"] for params in provider.requests) == [0, 2, 4]
+
+@pytest.mark.asyncio
+async def test_watermarked_stream_keeps_sessions_created_at_the_watermark():
+    """Test that sessions sharing the watermark's creation time are returned exactly once."""
+    responses = [
+        [session("s1", "2024-01-01T10:00:00Z"), session("s2", "2024-01-01T10:05:00Z")],
+        # s3 was created in the same second as s2, after the first stream
+        [session("s2", "2024-01-01T10:05:00Z"), session("s3", "2024-01-01T10:05:00Z")],
+    ]
+    provider = sessions_provider("test-veeam-watermark", lambda params: (responses[0], len(responses[0])))
+    query = {"query_type": "sessions", "since_watermark": True}
+
+    first = [alert["id"] async for alert in provider.query_stream(query)]
+    responses.pop(0)
+    second = [alert["id"] async for alert in provider.query_stream(query)]
+    third = [alert["id"] async for alert in provider.query_stream(query)]
+
+    assert first == ["s1", "s2"]
+    assert second == ["s3"]
+    assert third == []
+    # Later streams re-read the overlap window before the watermark
+    assert provider.requests[1]["createdAfterFilter"] == "2024-01-01T10:03:00+00:00"
+
+@pytest.mark.asyncio
+async def test_sessions_created_during_a_stream_are_not_skipped():
+    """Test that sessions created mid-stream do not shift unread pages, and every session is read once."""
+    sessions = [session(f"s{index}", f"2024-01-01T10:0{index}:00Z") for index in range(4)]
+
+    def pages(params):
+        # The server orders as requested; newest first otherwise
+        ordered = sessions if params.get("orderAsc") == "true" else sessions[::-1]
+        page = ordered[params["offset"]:params["offset"] + params["limit"]]
+        if len(provider.requests) == 1:
+            sessions.append(session("s4", "2024-01-01T10:04:00Z"))
+        return page, len(ordered)
+
+    provider = sessions_provider("test-veeam-order", pages)
+    query = {"query_type": "sessions", "limit": 2, "prefetch": 1, "since_watermark": True}
+
+    first = [alert["id"] async for alert in provider.query_stream(query)]
+    second = [alert["id"] async for alert in provider.query_stream(query)]
+
+    assert provider.requests[0]["orderColumn"] == "CreationTime"
+    assert first[:4] == ["s0", "s1", "s2", "s3"]
+    assert first + second == ["s0", "s1", "s2", "s3", "s4"]
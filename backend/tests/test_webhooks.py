@@ -0,0 +1,141 @@
+"""
+Tests for the webhook receivers.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+
+from keep_integration import webhooks
+from keep_integration.ingestion import InMemoryIngestionQueue
+from keep_integration.webhooks import (
+    _accept,
+    transform_connectwise,
+    transform_sentinelone,
+    transform_veeam,
+    verify_signature,
+)
+
+SECRET = "webhook-secret"
+
+@pytest.fixture(autouse=True)
+def webhook_secrets(monkeypatch):
+    """Configure the webhook secrets."""
+    monkeypatch.setattr(webhooks.settings, "CONNECTWISE_WEBHOOK_SECRET", SECRET, raising=False)
+    monkeypatch.setattr(webhooks.settings, "SENTINELONE_WEBHOOK_SECRET", SECRET, raising=False)
+    monkeypatch.setattr(webhooks.settings, "VEEAM_WEBHOOK_SECRET", "", raising=False)
+
+@pytest.fixture
+def ingestion_queue():
+    """Publish webhook alerts to an empty in-memory ingestion queue."""
+    queue = InMemoryIngestionQueue()
+    with patch("keep_integration.webhooks.get_ingestion_queue", return_value=queue):
+        yield queue
+
+def sign(body: bytes, encoding: str = "hex") -> str:
+    """Sign a body with the test secret."""
+    digest = hmac.new(SECRET.encode(), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode() if encoding == "base64" else digest.hex()
+
+def make_request(body: bytes, headers: dict):
+    """Create a request with a body and headers."""
+    request = MagicMock()
+    request.body = AsyncMock(return_value=body)
+    request.headers = headers
+    return request
+
+def test_verify_signature():
+    """Test HMAC verification of valid, invalid and missing signatures."""
+    body = b'{"id": "1"}'
+
+    assert verify_signature("sentinelone", body, sign(body)) is True
+    assert verify_signature("sentinelone", body, f"sha256={sign(body)}") is True
+    assert verify_signature("connectwise", body, sign(body, "base64")) is True
+    assert verify_signature("sentinelone", body, sign(b'{"id": "2"}')) is False
+    assert verify_signature("sentinelone", body, None) is False
+
+def test_verify_signature_requires_secret():
+    """Test that requests are rejected when no secret is configured."""
+    body = b'{"session": {}}'
+
+    assert verify_signature("veeam", body, sign(body)) is False
+
+@pytest.mark.asyncio
+async def test_accept_rejects_invalid_signature():
+    """Test that unsigned requests are rejected with 401."""
+    request = make_request(b'{"id": "1"}', {"x-s1-signature": "invalid"})
+
+    with pytest.raises(HTTPException) as error:
+        await _accept("sentinelone", request)
+
+    assert error.value.status_code == 401
+
+@pytest.mark.asyncio
+async def test_accept_rejects_non_object_body(ingestion_queue):
+    """Test that a signed JSON array is rejected with 400 instead of published."""
+    body = json.dumps([{"id": "1"}]).encode()
+    request = make_request(body, {"x-s1-signature": sign(body)})
+
+    with pytest.raises(HTTPException) as error:
+        await _accept("sentinelone", request)
+
+    assert error.value.status_code == 400
+    assert await ingestion_queue.backlog() == 0
+
+@pytest.mark.asyncio
+async def test_accept_publishes_alerts_before_acknowledging(ingestion_queue):
+    """Test that a signed payload is transformed and published to the ingestion queue before it is acknowledged."""
+    body = json.dumps({"id": "1"}).encode()
+    request = make_request(body, {"x-s1-signature": sign(body)})
+
+    assert await _accept("sentinelone", request) == {"status": "accepted"}
+
+    messages = await ingestion_queue.read("worker-1", block_ms=10)
+    assert [message.alert["fingerprint"] for message in messages] == ["sentinelone-1"]
+
+@pytest.mark.asyncio
+async def test_accept_asks_for_redelivery_when_publishing_fails():
+    """Test that a payload is not acknowledged when its alerts cannot be published."""
+    body = json.dumps({"id": "1"}).encode()
+    request = make_request(body, {"x-s1-signature": sign(body)})
+    queue = MagicMock()
+    queue.publish = AsyncMock(side_effect=ConnectionError("Redis unavailable"))
+
+    with patch("keep_integration.webhooks.get_ingestion_queue", return_value=queue):
+        with pytest.raises(HTTPException) as error:
+            await _accept("sentinelone", request)
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "30"}
+
+def test_transform_connectwise():
+    """Test transforming ticket callbacks, with the entity as an object or a JSON string."""
+    ticket = {"id": 42, "summary": "Server down"}
+
+    assert transform_connectwise({"Type": "ticket", "Action": "added", "Entity": ticket})[0]["fingerprint"] == "connectwise-manage-42"
+    assert transform_connectwise({"Type": "ticket", "Action": "updated", "Entity": json.dumps(ticket)})[0]["id"] == "42"
+    assert transform_connectwise({"Type": "ticket", "Action": "deleted", "Entity": ticket}) == []
+    assert transform_connectwise({"Type": "company", "Action": "added", "Entity": ticket}) == []
+    assert transform_connectwise({"Type": "ticket", "Action": "added", "Entity": "[]"}) == []
+
+def test_transform_sentinelone():
+    """Test transforming single threats and data envelopes."""
+    single = transform_sentinelone({"id": "1", "threatInfo": {"threatName": "Trojan"}})
+    envelope = transform_sentinelone({"data": [{"id": "2"}, {"id": "3"}, "invalid", {}]})
+
+    assert [alert["fingerprint"] for alert in single] == ["sentinelone-1"]
+    assert [alert["fingerprint"] for alert in envelope] == ["sentinelone-2", "sentinelone-3"]
+    assert transform_sentinelone({"data": {"threats": [{"id": "4"}]}})[0]["id"] == "4"
+    assert transform_sentinelone({"data": "invalid"}) == []
+
+def test_transform_veeam():
+    """Test transforming alarms holding a session and a job."""
+    alerts = transform_veeam({"session": {"id": "s1"}, "job": {"id": "j1"}})
+
+    assert [alert["fingerprint"] for alert in alerts] == ["veeam-session-s1", "veeam-job-j1"]
+    assert transform_veeam({}) == []
@@ -0,0 +1,91 @@
+"""
+Tests for the workflow executor.
+"""
+
+import asyncio
+
+import pytest
+
+from keep_integration.workflows.executor import WorkflowExecutor, WorkflowPlan
+from keep_integration.workflows.loader import Workflow
+
+def make_workflow(timeout=60):
+    """Create a workflow shaped like the security incident response workflow."""
+    definition = {
+        "id": "security-incident-response",
+        "steps": [
+            {"name": "get-endpoint-details", "provider": {"type": "sentinelone", "with": {"query": "{{ alert.id }}"}}},
+        ],
+        "actions": [
+            {"name": "isolate-endpoint", "timeout": timeout, "provider": {
+                "type": "sentinelone", "with": {"endpoint_id": "{{ steps.get-endpoint-details.results.endpoint_id }}"}}},
+            {"name": "create-ticket", "provider": {
+                "type": "connectwise-manage", "with": {"summary": "{{ steps.get-endpoint-details.results.hostname }}"}}},
+            {"name": "send-notification", "provider": {
+                "type": "teams", "with": {"message": "Ticket {{ actions.create-ticket.ticket_id }}"}}},
+        ],
+    }
+    return Workflow.from_definition({"workflow": definition}, "security_incident_response.yml")
+
+class FakeProvider:
+    """Provider recording calls, with optional delay and failure."""
+
+    def __init__(self, calls, result=None, delay=0.0, fail=False):
+        self.calls = calls
+        self.result = result or {}
+        self.delay = delay
+        self.fail = fail
+
+    async def query(self, params):
+        self.calls.append(("query", params))
+        return {"endpoint_id": "agent-1", "hostname": "FS01"}
+
+    async def notify(self, params):
+        self.calls.append(("notify", params))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider error")
+        return self.result
+
+def test_infers_dependencies():
+    """Test that dependencies are inferred from template references."""
+    plan = WorkflowPlan(make_workflow())
+
+    assert plan.nodes[("actions", "isolate-endpoint")].dependencies == {("steps", "get-endpoint-details")}
+    assert plan.nodes[("actions", "send-notification")].dependencies == {("actions", "create-ticket")}
+    assert plan.order[0] == ("steps", "get-endpoint-details")
+
+@pytest.mark.asyncio
+async def test_runs_independent_actions_concurrently():
+    """Test that actions sharing a dependency run concurrently and results flow to dependents."""
+    calls = []
+    providers = {
+        "sentinelone": FakeProvider(calls, {"success": True}, delay=0.1),
+        "connectwise-manage": FakeProvider(calls, {"ticket_id": 42}, delay=0.1),
+        "teams": FakeProvider(calls),
+    }
+    executor = WorkflowExecutor(lambda provider_type, config: providers[provider_type])
+
+    start = asyncio.get_running_loop().time()
+    results = await executor.execute(make_workflow(), {"id": "threat-1"})
+
+    assert asyncio.get_running_loop().time() - start < 0.19
+    assert all(result.status == "success" for result in results.values())
+    assert ("notify", {"message": "Ticket 42"}) in calls
+
+@pytest.mark.asyncio
+async def test_skips_dependents_of_failed_actions():
+    """Test that failures and timeouts skip dependent actions only."""
+    calls = []
+    providers = {
+        "sentinelone": FakeProvider(calls, delay=1.0),
+        "connectwise-manage": FakeProvider(calls, fail=True),
+        "teams": FakeProvider(calls),
+    }
+    executor = WorkflowExecutor(lambda provider_type, config: providers[provider_type])
+
+    results = await executor.execute(make_workflow(timeout=0.05), {"id": "threat-1"})
+
+    assert results["actions.isolate-endpoint"].status == "timeout"
+    assert results["actions.create-ticket"].status == "failed"
+    assert results["actions.send-notification"].status == "skipped"
@@ -0,0 +1,59 @@
+"""
+Tests for the workflow loader and trigger index.
+"""
+
+import os
+
+from keep_integration.workflows.loader import TriggerIndex, Workflow, WorkflowLoader
+
+WORKFLOW = """
+workflow:
+  id: {id}
+  triggers:
+    - type: alert
+      filters:
+        - key: source
+          value: {source}
+        - key: severity
+          value: critical
+"""
+
+def test_matches_and_reloads_workflows(tmp_path):
+    """Test that alerts match only workflows whose filters all match, and changes are reloaded."""
+    path = tmp_path / "s1.yml"
+    path.write_text(WORKFLOW.format(id="s1", source="sentinelone"))
+    (tmp_path / "veeam.yml").write_text(WORKFLOW.format(id="veeam", source="veeam"))
+
+    loader = WorkflowLoader(str(tmp_path))
+    assert loader.reload() is True
+    assert [w.id for w in loader.match({"source": "sentinelone", "severity": "critical"})] == ["s1"]
+    assert loader.match({"source": "sentinelone", "severity": "info"}) == []
+    assert loader.reload() is False
+
+    path.write_text(WORKFLOW.format(id="s1", source="veeam"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    assert loader.reload() is True
+    assert sorted(w.id for w in loader.match({"source": "veeam", "severity": "critical"})) == ["s1", "veeam"]
+
+def test_filter_values_match_literally_unless_marked_as_regex():
+    """Test that filter values match literally, and only r"..." values are regexes."""
+    workflows = [
+        Workflow.from_definition({"id": "literal", "triggers": [
+            {"type": "alert", "filters": [{"key": "client", "value": "Acme (NY)"}]}
+        ]}, "literal.yml"),
+        Workflow.from_definition({"id": "plus", "triggers": [
+            {"type": "alert", "filters": [{"key": "client", "value": "C++"}]}
+        ]}, "plus.yml"),
+        Workflow.from_definition({"id": "regex", "triggers": [
+            {"type": "alert", "filters": [{"key": "severity", "value": 'r"(critical|high)"'}]}
+        ]}, "regex.yml")
+    ]
+    index = TriggerIndex(workflows)
+
+    assert [w.id for w in index.match({"client": "Acme (NY)"})] == ["literal"]
+    assert [w.id for w in index.match({"client": "C++"})] == ["plus"]
+    assert index.match({"client": "Acme NY"}) == []
+    assert [w.id for w in index.match({"severity": "high"})] == ["regex"]
+    assert index.match({"severity": "(critical|high)"}) == []
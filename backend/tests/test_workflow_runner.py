@@ -0,0 +1,57 @@
+"""
+Tests for running triggered workflows on ingested alerts.
+"""
+
+import pytest
+
+from keep_integration.workflows.executor import NodeResult
+from keep_integration.workflows.loader import Workflow
+from keep_integration.workflows.runner import WorkflowRunner
+
+WORKFLOW = Workflow.from_definition({
+    "id": "isolate",
+    "triggers": [{"type": "alert", "filters": [{"key": "source", "value": "sentinelone"}]}],
+    "steps": []
+}, "isolate.yml")
+
+class FakeLoader:
+    """Loader matching alerts from SentinelOne to the workflow."""
+
+    def match(self, alert):
+        return [WORKFLOW] if alert.get("source") == "sentinelone" else []
+
+class FakeExecutor:
+    """Executor recording the runs it is asked for."""
+
+    def __init__(self, fail=False):
+        self.runs = []
+        self.fail = fail
+
+    async def execute(self, workflow, alert, providers=None):
+        self.runs.append((workflow.id, alert["fingerprint"]))
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return {"steps.isolate": NodeResult(status="success")}
+
+@pytest.mark.asyncio
+async def test_runs_triggered_workflows():
+    """Test that only alerts matching a trigger run the workflow."""
+    executor = FakeExecutor()
+    runner = WorkflowRunner(FakeLoader(), executor)
+
+    await runner.handle([
+        {"fingerprint": "s1-1", "source": "sentinelone"},
+        {"fingerprint": "veeam-1", "source": "veeam"}
+    ])
+
+    assert executor.runs == [("isolate", "s1-1")]
+
+@pytest.mark.asyncio
+async def test_failed_runs_do_not_fail_the_batch():
+    """Test that a failing run is logged instead of failing the ingestion batch."""
+    executor = FakeExecutor(fail=True)
+    runner = WorkflowRunner(FakeLoader(), executor)
+
+    await runner.handle([{"fingerprint": "s1-1", "source": "sentinelone"}])
+
+    assert executor.runs == [("isolate", "s1-1")]
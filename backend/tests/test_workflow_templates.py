@@ -0,0 +1,28 @@
+"""
+Tests for workflow templates.
+"""
+
+from keep_integration.workflows.templates import CompiledParameters, compile_template
+
+def test_renders_parameters_with_hyphenated_paths():
+    """Test that workflow parameters render with hyphenated step names and defaults."""
+    parameters = CompiledParameters({
+        "summary": "Critical Alert: {{ alert.name }}",
+        "company_id": "{{ alert.labels.company_id | default('1') }}",
+        "hostname": "{{ steps.get-endpoint-details.results.hostname }}",
+        "board_id": 1,
+    })
+
+    rendered = parameters.render({
+        "alert": {"name": "Ransomware", "labels": {}},
+        "steps": {"get-endpoint-details": {"results": {"hostname": "FS01"}}},
+        "incident": lambda: 1 / 0,
+    })
+
+    assert rendered == {"summary": "Critical Alert: Ransomware", "company_id": "1", "hostname": "FS01", "board_id": 1}
+    assert parameters.variables == {"alert", "steps"}
+    assert ("steps", "get-endpoint-details", "results", "hostname") in parameters.paths
+
+def test_caches_compiled_templates():
+    """Test that identical template sources are compiled once."""
+    assert compile_template("{{ alert.name }}") is compile_template("{{ alert.name }}")
@@ -1,14 +1,20 @@
 import React, { useState, useEffect } from 'react';
-import { Select, SelectItem } from '@tremor/react';
-import { useClientStore } from '../lib/stores/clientStore';
+import axios from 'axios';
+import { Select, SelectItem, TextInput } from '@tremor/react';
+import { Client, useClientStore } from '../lib/stores/clientStore';
+
+// Wait for typing to pause before searching
+const SEARCH_DEBOUNCE_MS = 200;
 
 interface ClientSelectorProps {
   onChange?: (clientId: string) => void;
 }
 
 export default function ClientSelector({ onChange }: ClientSelectorProps) {
-  const { clients, selectedClientId, setSelectedClientId, fetchClients } = useClientStore();
+  const { clients, selectedClientId, setSelectedClientId, fetchClients, searchClients } = useClientStore();
   const [isLoading, setIsLoading] = useState(false);
+  const [query, setQuery] = useState('');
+  const [searchResults, setSearchResults] = useState<Client[] | null>(null);
 
   useEffect(() => {
     const loadClients = async () => {
@@ -25,6 +31,31 @@ export default function ClientSelector({ onChange }: ClientSelectorProps) {
     loadClients();
   }, [fetchClients]);
 
+  useEffect(() => {
+    const term = query.trim();
+    if (!term) {
+      setSearchResults(null);
+      return;
+    }
+
+    // Cancel the pending search when the query changes
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        setSearchResults(await searchClients(term, controller.signal));
+      } catch (error) {
+        if (!axios.isCancel(error)) {
+          console.error('Error searching clients:', error);
+        }
+      }
+    }, SEARCH_DEBOUNCE_MS);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query, searchClients]);
+
   const handleChange = (value: string) => {
     setSelectedClientId(value);
     if (onChange) {
@@ -32,8 +63,15 @@ export default function ClientSelector({ onChange }: ClientSelectorProps) {
     }
   };
 
+  const options = searchResults ?? clients;
+
   return (
-    <div className="w-full max-w-xs">
+    <div className="w-full max-w-xs space-y-2">
+      <TextInput
+        value={query}
+        onValueChange={setQuery}
+        placeholder="Search clients"
+      />
       <Select
         value={selectedClientId}
         onValueChange={handleChange}
@@ -41,7 +79,7 @@ export default function ClientSelector({ onChange }: ClientSelectorProps) {
         disabled={isLoading}
       >
         <SelectItem value="all">All Clients</SelectItem>
-        {clients.map((client) => (
+        {options.map((client) => (
           <SelectItem key={client.id} value={client.id.toString()}>
             {client.name}
           </SelectItem>
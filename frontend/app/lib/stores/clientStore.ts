@@ -9,12 +9,23 @@ export interface Client {
   is_active: boolean;
 }
 
+export interface ClientPage {
+  items: Client[];
+  next_cursor: string | null;
+  estimated_total: number | null;
+}
+
+export interface ClientSearchResult extends Client {
+  score: number;
+}
+
 interface ClientState {
   clients: Client[];
   selectedClientId: string;
   isLoading: boolean;
   error: string | null;
   fetchClients: () => Promise<void>;
+  searchClients: (query: string, signal?: AbortSignal) => Promise<ClientSearchResult[]>;
   setSelectedClientId: (clientId: string) => void;
 }
 
@@ -27,8 +38,19 @@ export const useClientStore = create<ClientState>((set, get) => ({
   fetchClients: async () => {
     set({ isLoading: true, error: null });
     try {
-      const response = await axios.get('/api/v1/msp/clients');
-      set({ clients: response.data, isLoading: false });
+      const clients: Client[] = [];
+      let cursor: string | null = null;
+
+      // Follow next_cursor until the last page
+      do {
+        const response: { data: ClientPage } = await axios.get<ClientPage>('/api/v1/msp/clients', {
+          params: cursor ? { limit: 1000, cursor } : { limit: 1000 }
+        });
+        clients.push(...response.data.items);
+        cursor = response.data.next_cursor;
+      } while (cursor);
+
+      set({ clients, isLoading: false });
     } catch (error) {
       console.error('Error fetching clients:', error);
       set({ 
@@ -38,6 +60,14 @@ export const useClientStore = create<ClientState>((set, get) => ({
     }
   },
   
+  searchClients: async (query: string, signal?: AbortSignal) => {
+    const response = await axios.get<ClientSearchResult[]>('/api/v1/msp/clients/search', {
+      params: { q: query, limit: 20 },
+      signal
+    });
+    return response.data;
+  },
+  
   setSelectedClientId: (clientId: string) => {
     set({ selectedClientId: clientId });
   }